@@ -1,13 +1,18 @@
 """Synse Server caches and cache utilities."""
 
+import asyncio
+import time
+
 import aiocache
 import grpc
 
 from synse import config, errors, utils
 from synse.i18n import _
 from synse.log import logger
-from synse.plugin import Plugin, get_plugins, register_plugins
+from synse.plugin import Plugin, get_plugin, get_plugins, register_plugins
 from synse.proto import util as putil
+from synse.response import EncodedJson, Validator
+from synse.scheme.read import compile_formatters
 
 # The aiocache configuration
 AIOCACHE = {
@@ -21,24 +26,568 @@ AIOCACHE = {
 
 # Synse Server cache namespaces
 NS_TRANSACTION = 'transaction'
-NS_META = 'meta'
-NS_PLUGINS = 'plugins'
-NS_SCAN = 'scan'
-NS_INFO = 'info'
-
-# Internal keys into the caches for the data (e.g. dictionaries)
-# being cached.
-META_CACHE_KEY = 'meta_cache_key'
-PLUGINS_CACHE_KEY = 'plugins_cache_key'
-SCAN_CACHE_KEY = 'scan_cache_key'
-INFO_CACHE_KEY = 'info_cache_key'
+NS_READ = 'read'
+
+# The key used to coalesce rebuilds of the metainfo snapshot.
+SNAPSHOT_KEY = 'snapshot'
+
+# The device fields which the metainfo snapshot is indexed by, mapped to
+# a function which gets the indexed value from a MetainfoResponse. The
+# type, model, and protocol are matched case-insensitively.
+DEVICE_SELECTORS = {
+    'rack': lambda d: d.location.rack,
+    'board': lambda d: d.location.board,
+    'type': lambda d: d.type.lower(),
+    'model': lambda d: d.model.lower(),
+    'protocol': lambda d: d.protocol.lower(),
+}
+
+# The transaction fields which the transaction store is indexed by, mapped
+# to a function which gets the indexed value from a transaction record.
+TRANSACTION_FILTERS = {
+    'plugin': lambda t: t['plugin'],
+    'rack': lambda t: t['device'][0] if t['device'] else None,
+    'board': lambda t: t['device'][1] if t['device'] else None,
+    'device': lambda t: t['device'][2] if t['device'] else None,
+    'state': lambda t: t['state'],
+    'status': lambda t: t['status'],
+}
 
 # Create caches
-transaction_cache = aiocache.SimpleMemoryCache(namespace=NS_TRANSACTION)
-_meta_cache = aiocache.SimpleMemoryCache(namespace=NS_META)
-_plugins_cache = aiocache.SimpleMemoryCache(namespace=NS_PLUGINS)
-_scan_cache = aiocache.SimpleMemoryCache(namespace=NS_SCAN)
-_info_cache = aiocache.SimpleMemoryCache(namespace=NS_INFO)
+read_cache = aiocache.SimpleMemoryCache(namespace=NS_READ)
+
+# Reads of the same device are coalesced when the read cache is enabled for
+# the device, so concurrent cache misses for a device result in a single read
+# request to the plugin which manages it.
+device_reads = utils.SingleFlight()
+
+# Rebuilds of the metainfo snapshot are coalesced, so when the snapshot expires,
+# only the first caller issues Metainfo requests to the plugins. Everyone else
+# that misses the snapshot while that rebuild is in flight waits on its result.
+# The `calls` and `coalesced` counts of this serve as the rebuild metrics.
+metainfo_rebuilds = utils.SingleFlight()
+
+# The current metainfo snapshot. The snapshot is never modified once it is
+# built; a refresh builds a new snapshot and replaces this reference to it.
+_snapshot = None
+
+# The version of the most recently built snapshot.
+_snapshot_version = 0
+
+
+class ResolvedDevice(object):
+    """A device which has been resolved to its meta-information and the
+    plugin which manages it.
+
+    A resolved device is built for each device once, when the meta-information
+    for its plugin is collected, and is held in the device index of the
+    metainfo snapshot (see `MetainfoSnapshot.devices`). Resolving a device for
+    a request is then a single lookup in that index. The resolved device is
+    passed along to anything else in the request which needs the device's
+    meta-information or plugin (e.g. device type validation and the read or
+    write command), so that they do not need to look it up again. A resolved
+    device should be treated as read-only.
+
+    Args:
+        rack (str): The rack which the device resides on.
+        board (str): The board which the device resides on.
+        device (str): The ID of the device.
+        plugin_name (str): The name of the plugin that manages the device.
+        meta (MetainfoResponse): The meta-information for the device.
+
+    Attributes:
+        formatters (dict): The compiled formatters for the device's outputs,
+            keyed by the reading type of the output. These are used to format
+            the device's readings (see `ReadResponse`).
+    """
+
+    __slots__ = ('rack', 'board', 'device', 'plugin_name', 'meta', 'formatters')
+
+    def __init__(self, rack, board, device, plugin_name, meta):
+        self.rack = rack
+        self.board = board
+        self.device = device
+        self.plugin_name = plugin_name
+        self.meta = meta
+
+        self.formatters = compile_formatters(meta.output)
+
+    def __str__(self):
+        return '<ResolvedDevice: {}/{}/{} (plugin: {})>'.format(
+            self.rack, self.board, self.device, self.plugin_name)
+
+    @property
+    def plugin(self):
+        """Plugin: The plugin that manages the device. This is None if there
+        is no registered plugin with the plugin name.
+
+        The plugin is looked up when it is needed rather than held, since
+        a resolved device may outlive the registration of its plugin.
+        """
+        return get_plugin(self.plugin_name)
+
+
+class MetainfoPartition(object):
+    """The device meta-information for the devices managed by a single plugin.
+
+    The metainfo snapshot is partitioned by plugin, so the devices of one
+    plugin can be refreshed or expire without touching the devices of any
+    other plugin. A partition should be treated as read-only.
+
+    Args:
+        plugin (str): The name of the plugin which manages the devices.
+        metainfo (dict): The metainfo dictionary for the plugin, in which
+            the key is the device id composite and the value is its
+            MetainfoResponse.
+
+    Attributes:
+        info (dict): The dictionary representation of each device's
+            MetainfoResponse, keyed by device id composite. These are
+            used to build the resource info data of a snapshot, so they
+            only need to be converted once per partition.
+        devices (dict): The ResolvedDevice for each device, keyed by the
+            rack, board, and device IDs of the device.
+    """
+
+    def __init__(self, plugin, metainfo):
+        self.plugin = plugin
+        self.metainfo = metainfo
+        self.info = {cid: putil.metainfo_to_dict(m) for cid, m in metainfo.items()}
+
+        self.devices = {}
+        for m in metainfo.values():
+            key = (m.location.rack, m.location.board, m.uid)
+            self.devices[key] = ResolvedDevice(*key, plugin, m)
+
+        self._built = time.monotonic()
+
+    def __str__(self):
+        return '<MetainfoPartition: plugin: {}, devices: {}>'.format(
+            self.plugin, len(self.metainfo))
+
+    def age(self):
+        """Get the age of the partition.
+
+        Returns:
+            float: The number of seconds since the partition was built or
+                last confirmed to be current (see `touch`).
+        """
+        return time.monotonic() - self._built
+
+    def touch(self):
+        """Mark the partition as current.
+
+        This is used when a refresh of the plugin's meta-information finds
+        that nothing has changed, so the partition can continue to be used
+        without being rebuilt.
+        """
+        self._built = time.monotonic()
+
+    def diff(self, metainfo):
+        """Compare the partition against newly collected meta-information
+        for its plugin.
+
+        Devices are compared by their id composite.
+
+        Args:
+            metainfo (dict): The newly collected metainfo dictionary.
+
+        Returns:
+            tuple(set, set, set): The id composites of the devices which
+                were added, removed, and changed, respectively.
+        """
+        current = set(self.metainfo)
+        new = set(metainfo)
+
+        added = new - current
+        removed = current - new
+        changed = {
+            cid for cid in new & current
+            if not putil.metainfo_equal(self.metainfo[cid], metainfo[cid])
+        }
+        return added, removed, changed
+
+    def is_expired(self):
+        """Check whether the partition has surpassed the metainfo TTL.
+
+        Returns:
+            bool: True if the partition is expired; False otherwise.
+        """
+        ttl = config.options.get('cache.meta.ttl', None)
+        if not ttl:
+            return False
+        return self.age() > ttl
+
+
+class MetainfoSnapshot(object):
+    """A snapshot of the device meta-information aggregated from the gRPC
+    Metainfo request across all plugins, along with the data derived from it.
+
+    The snapshot is made up of a partition per plugin. The metainfo, plugins,
+    scan, and info data are built from the partitions once per refresh and
+    held together, so the derived scan and info data never need to be rebuilt
+    on request and are always consistent with the metainfo. A snapshot should
+    be treated as read-only.
+
+    Args:
+        partitions (dict): The partitions which make up the snapshot, in
+            which the key is the plugin name and the value is the
+            MetainfoPartition for that plugin.
+        version (int): The version of the snapshot. Each snapshot that is
+            built has a higher version than the one before it.
+
+    Attributes:
+        metainfo (dict): The metainfo dictionary, in which the key is the
+            device id composite and the value is its MetainfoResponse.
+        plugins (dict): The plugins dictionary, in which the key is the
+            device id composite and the value is the name of the plugin
+            that manages it.
+        scan (dict): The scan data built from the metainfo. See
+            `get_scan_cache` for its structure.
+        info (dict): The resource info data built from the metainfo. See
+            `get_resource_info_cache` for its structure.
+        index (dict): The secondary indexes of the metainfo. There is an
+            index for each of the `DEVICE_SELECTORS`, which maps each value
+            of that field to the set of id composites of the devices which
+            have that value. See `select`.
+        devices (dict): The device index, in which the key is the rack,
+            board, and device IDs of a device and the value is its
+            ResolvedDevice. Unlike the id composite, the key is unambiguous
+            and does not need to be built for each lookup.
+        created (float): The time (in seconds since the epoch) that the
+            snapshot was built.
+        encoded (dict): The response bodies encoded from the snapshot's
+            data, keyed by the response they are for. See `encode`.
+        validator (Validator): The validator of the responses made from
+            the snapshot's data, derived from its version. A snapshot is
+            only rebuilt when its data changes, so clients can use this to
+            check whether the data they have is current.
+    """
+
+    def __init__(self, partitions, version):
+        self.partitions = partitions
+        self.version = version
+
+        self.metainfo, self.plugins, self.devices, device_info = {}, {}, {}, {}
+        for name, partition in partitions.items():
+            self.metainfo.update(partition.metainfo)
+            self.plugins.update(dict.fromkeys(partition.metainfo, name))
+            self.devices.update(partition.devices)
+            device_info.update(partition.info)
+
+        self.scan = _build_scan_cache(self.metainfo)
+        self.info = _build_resource_info_cache(self.metainfo, device_info)
+        self.index = _build_device_index(self.metainfo)
+
+        self.created = time.time()
+        self.encoded = {}
+        self.validator = Validator(version, self.created)
+
+    def __str__(self):
+        return '<MetainfoSnapshot: version: {}, plugins: {}, devices: {}>'.format(
+            self.version, len(self.partitions), len(self.metainfo))
+
+    def encode(self, key, data):
+        """Get the encoded response body for data from the snapshot.
+
+        The data from a snapshot never changes, so the response body for it
+        is encoded the first time it is needed and then held for the life of
+        the snapshot.
+
+        Args:
+            key (tuple): The key identifying the response, e.g. the endpoint
+                and the resource it is for. This should only identify known
+                resources, so the number of held bodies stays bounded.
+            data (dict): The response data for the key.
+
+        Returns:
+            EncodedJson: The encoded response body.
+        """
+        encoded = self.encoded.get(key)
+        if encoded is None:
+            encoded = self.encoded[key] = EncodedJson(data)
+        return encoded
+
+    def select(self, **selectors):
+        """Select the devices in the snapshot which match all of the given
+        selectors.
+
+        The selectors are resolved using the snapshot's secondary indexes,
+        so this does not need to look at every device in the snapshot.
+
+        Args:
+            **selectors: The device fields to select by, mapped to the
+                value to match. The supported fields are defined by
+                `DEVICE_SELECTORS`. Selectors with a value of None are
+                ignored. If no selectors are given, all devices match.
+
+        Returns:
+            list[MetainfoResponse]: The matching devices, sorted by rack,
+                board, and device id.
+
+        Raises:
+            errors.InvalidArgumentsError: An unsupported selector was given.
+        """
+        matches = None
+        for field, value in selectors.items():
+            if value is None:
+                continue
+
+            if field not in self.index:
+                raise errors.InvalidArgumentsError(
+                    _('Invalid device selector: {} (valid selectors: {})').format(
+                        field, sorted(DEVICE_SELECTORS))
+                )
+            if field in ('type', 'model', 'protocol'):
+                value = value.lower()
+
+            cids = self.index[field].get(value, set())
+            matches = cids if matches is None else matches & cids
+            if not matches:
+                return []
+
+        if matches is None:
+            matches = self.metainfo
+
+        return sorted(
+            (self.metainfo[cid] for cid in matches),
+            key=lambda d: (d.location.rack, d.location.board, d.uid)
+        )
+
+    def age(self):
+        """Get the age of the snapshot.
+
+        Returns:
+            float: The age, in seconds, of the oldest partition in the snapshot.
+        """
+        return max((p.age() for p in self.partitions.values()), default=0)
+
+    def touch(self):
+        """Mark all partitions of the snapshot as current."""
+        for partition in self.partitions.values():
+            partition.touch()
+
+    def expired(self):
+        """Get the plugins whose partitions have surpassed the metainfo TTL.
+
+        Returns:
+            list[str]: The names of the plugins with expired partitions.
+        """
+        return [name for name, p in self.partitions.items() if p.is_expired()]
+
+    def is_expired(self):
+        """Check whether any partition of the snapshot has surpassed the
+        metainfo TTL.
+
+        Returns:
+            bool: True if the snapshot is expired; False otherwise.
+        """
+        return any(p.is_expired() for p in self.partitions.values())
+
+    def can_serve_stale(self):
+        """Check whether the snapshot can still be served after it expires.
+
+        Returns:
+            bool: True if the expired snapshot can be served while it is
+                refreshed; False otherwise.
+        """
+        if not config.options.get('cache.meta.serve_stale', False):
+            return False
+
+        ttl = config.options.get('cache.meta.ttl', None) or 0
+        max_stale = config.options.get('cache.meta.max_stale', None) or 0
+        return self.age() <= ttl + max_stale
+
+
+class TransactionStore(object):
+    """The store of write transactions that Synse Server is tracking.
+
+    Each transaction maps to the plugin which manages it, the context of the
+    write, the device written to, and the last known state and status of the
+    transaction. Transactions are indexed by each of the `TRANSACTION_FILTERS`,
+    so they can be listed by those fields without scanning the whole store.
+
+    Transactions expire a TTL after they are added. Expiry is tracked on a
+    timer wheel, which is advanced on each access to the store, so there is
+    no timer per transaction.
+
+    Attributes:
+        transactions (dict): The transaction records, keyed by transaction ID.
+        indexes (dict): For each of the `TRANSACTION_FILTERS`, the IDs of
+            the transactions with each value of the field.
+        wheel (utils.TimerWheel): The timer wheel tracking expiry.
+    """
+
+    def __init__(self):
+        self.transactions = {}
+        self.indexes = {f: {} for f in TRANSACTION_FILTERS}
+        self.wheel = utils.TimerWheel()
+        # the order that transactions were added in, for listing them
+        self._order = {}
+        self._added = 0
+
+    def __str__(self):
+        return '<TransactionStore: transactions: {}>'.format(len(self.transactions))
+
+    def expire(self):
+        """Remove the transactions which have expired."""
+        for transaction_id in self.wheel.advance():
+            logger.debug(_('Expiring transaction: {}').format(transaction_id))
+            self.remove(transaction_id)
+
+    def add(self, transaction_id, context, plugin_name, device=None, ttl=None):
+        """Add a transaction to the store, replacing any existing transaction
+        with the same ID.
+
+        A new transaction is considered to be pending until it is checked.
+
+        Args:
+            transaction_id (str): The ID of the transaction.
+            context (dict): The action/raw data of the write transaction.
+            plugin_name (str): The name of the plugin which manages the
+                transaction.
+            device (tuple(str, str, str)): The rack, board, and device IDs
+                of the device which was written to.
+            ttl (int): The time, in seconds, to keep the transaction for.
+                If not set, the transaction does not expire.
+        """
+        self.expire()
+        self.remove(transaction_id)
+
+        self.transactions[transaction_id] = {
+            'plugin': plugin_name,
+            'context': context,
+            'device': device,
+            'state': 'ok',
+            'status': 'pending',
+        }
+        self._index(transaction_id)
+
+        self._added += 1
+        self._order[transaction_id] = self._added
+
+        if ttl:
+            self.wheel.schedule(transaction_id, ttl)
+
+    def get(self, transaction_id):
+        """Get a transaction from the store.
+
+        Args:
+            transaction_id (str): The ID of the transaction.
+
+        Returns:
+            dict: The transaction record, or None if the transaction is not
+                in the store.
+        """
+        self.expire()
+        return self.transactions.get(transaction_id)
+
+    def update(self, transaction_id, state, status):
+        """Update the last known state and status of a transaction.
+
+        Args:
+            transaction_id (str): The ID of the transaction.
+            state (str): The state of the transaction.
+            status (str): The status of the transaction.
+        """
+        self.expire()
+        if transaction_id not in self.transactions:
+            return
+
+        self._unindex(transaction_id)
+        self.transactions[transaction_id]['state'] = state
+        self.transactions[transaction_id]['status'] = status
+        self._index(transaction_id)
+
+    def remove(self, transaction_id):
+        """Remove a transaction from the store, if it is there.
+
+        Args:
+            transaction_id (str): The ID of the transaction.
+        """
+        if transaction_id in self.transactions:
+            self._unindex(transaction_id)
+            del self.transactions[transaction_id]
+            del self._order[transaction_id]
+            self.wheel.cancel(transaction_id)
+
+    def clear(self):
+        """Remove all transactions from the store."""
+        self.transactions.clear()
+        self._order.clear()
+        for index in self.indexes.values():
+            index.clear()
+        self.wheel.clear()
+
+    def select(self, offset=0, limit=None, **filters):
+        """Get the IDs of the transactions matching all of the given filters.
+
+        Args:
+            offset (int): The number of matching transactions to skip.
+            limit (int): The maximum number of transaction IDs to return.
+                If not set, all matching transactions are returned.
+            **filters: The transaction fields to filter by, mapped to the
+                value to match. See `TRANSACTION_FILTERS` for the supported
+                fields. Filters with a value of None are ignored.
+
+        Returns:
+            list[str]: The IDs of the matching transactions, in the order
+                that the transactions were added.
+
+        Raises:
+            errors.InvalidArgumentsError: An unsupported filter was given.
+        """
+        self.expire()
+
+        matches = None
+        for field, value in filters.items():
+            if value is None:
+                continue
+            if field not in self.indexes:
+                raise errors.InvalidArgumentsError(
+                    _('Unsupported transaction filter: {} (supported: {})').format(
+                        field, sorted(TRANSACTION_FILTERS))
+                )
+            ids = self.indexes[field].get(value, set())
+            matches = set(ids) if matches is None else matches & ids
+
+        if matches is None:
+            matches = self.transactions
+
+        ids = sorted(matches, key=self._order.__getitem__)
+        stop = None if limit is None else offset + limit
+        return ids[offset:stop]
+
+    def _index(self, transaction_id):
+        """Add a transaction to the indexes.
+
+        Args:
+            transaction_id (str): The ID of the transaction.
+        """
+        transaction = self.transactions[transaction_id]
+        for field, fn in TRANSACTION_FILTERS.items():
+            value = fn(transaction)
+            if value is not None:
+                self.indexes[field].setdefault(value, set()).add(transaction_id)
+
+    def _unindex(self, transaction_id):
+        """Remove a transaction from the indexes.
+
+        Args:
+            transaction_id (str): The ID of the transaction.
+        """
+        transaction = self.transactions[transaction_id]
+        for field, fn in TRANSACTION_FILTERS.items():
+            value = fn(transaction)
+            ids = self.indexes[field].get(value)
+            if ids is not None:
+                ids.discard(transaction_id)
+                if not ids:
+                    del self.indexes[field][value]
+
+
+# The write transactions being tracked.
+transaction_store = TransactionStore()
 
 
 def configure_cache():
@@ -57,6 +606,10 @@ async def clear_cache(namespace):
         namespace (str): The namespace of the cache to clear.
     """
     logger.debug(_('Invalidating cache: {}').format(namespace))
+    if namespace == NS_TRANSACTION:
+        transaction_store.clear()
+        return True
+
     _cache = aiocache.caches.get('default')
     return await _cache.clear(namespace=namespace)
 
@@ -64,16 +617,21 @@ async def clear_cache(namespace):
 async def clear_all_meta_caches():
     """Clear all caches which contain or are derived from meta-information
     collected from gRPC Metainfo requests.
+
+    This drops the current metainfo snapshot, so the next request for it will
+    rebuild it. The dropped snapshot is not served as stale data.
     """
-    for ns in [NS_META, NS_PLUGINS, NS_INFO, NS_SCAN]:
-        await clear_cache(ns)
+    global _snapshot  # pylint: disable=global-statement
+    logger.debug(_('Invalidating metainfo snapshot'))
+    _snapshot = None
 
 
 async def get_transaction(transaction_id):
     """Get the cached information relating to the given transaction.
 
-    The cached info should include the name of the plugin from which the given
-    transaction originated, and the context of the transaction.
+    The cached info includes the name of the plugin from which the given
+    transaction originated, the context of the transaction, the device it
+    was written to, and its last known state and status.
 
     Args:
         transaction_id (str): The ID of the transaction.
@@ -81,10 +639,40 @@ async def get_transaction(transaction_id):
     Returns:
         dict: The information associated with a transaction.
     """
-    return await transaction_cache.get(transaction_id)
+    return transaction_store.get(transaction_id)
+
+
+async def get_transactions(transaction_ids):
+    """Get the cached information relating to each of the given transactions.
+
+    Args:
+        transaction_ids (list[str]): The IDs of the transactions.
+
+    Returns:
+        list[dict]: The information associated with each transaction, in the
+            same order as the given IDs. This is None for each transaction
+            that is not in the cache.
+    """
+    return [transaction_store.get(t) for t in transaction_ids]
+
+
+async def list_transactions(offset=0, limit=None, **filters):
+    """Get the IDs of the cached transactions matching the given filters.
+
+    Args:
+        offset (int): The number of matching transactions to skip.
+        limit (int): The maximum number of transaction IDs to get.
+        **filters: The transaction fields to filter by. See
+            `TRANSACTION_FILTERS` for the supported fields.
+
+    Returns:
+        list[str]: The IDs of the matching transactions, in the order that
+            they were added.
+    """
+    return transaction_store.select(offset=offset, limit=limit, **filters)
 
 
-async def add_transaction(transaction_id, context, plugin_name):
+async def add_transaction(transaction_id, context, plugin_name, device=None):
     """Add a new transaction to the transaction cache.
 
     This cache tracks transactions and maps them to the plugin from which they
@@ -96,6 +684,8 @@ async def add_transaction(transaction_id, context, plugin_name):
             can be used to help identify the transaction.
         plugin_name (str): The name of the plugin to associate with the
             transaction.
+        device (tuple(str, str, str)): The rack, board, and device IDs of
+            the device which was written to.
 
     Returns:
         bool: True if successful; False otherwise.
@@ -105,16 +695,96 @@ async def add_transaction(transaction_id, context, plugin_name):
         _('Caching transaction {} from plugin {} ({})').format(
             transaction_id, plugin_name, context)
     )
-    return await transaction_cache.set(
+    transaction_store.add(transaction_id, context, plugin_name, device, ttl)
+    return True
+
+
+async def add_transactions(transactions):
+    """Add many new transactions to the transaction cache at once.
+
+    Args:
+        transactions (list[tuple]): The transaction ID, context, plugin name,
+            and device of each transaction to add (see `add_transaction`).
+
+    Returns:
+        bool: True if successful; False otherwise.
+    """
+    ttl = config.options.get('cache.transaction.ttl', None)
+    logger.debug(_('Caching {} transactions').format(len(transactions)))
+    for transaction_id, context, plugin_name, device in transactions:
+        transaction_store.add(transaction_id, context, plugin_name, device, ttl)
+    return True
+
+
+async def update_transaction(transaction_id, write_response):
+    """Update the last known state and status of a cached transaction.
+
+    Args:
+        transaction_id (str): The ID of the transaction.
+        write_response (WriteResponse): The WriteResponse from a gRPC
+            transaction check.
+    """
+    transaction_store.update(
         transaction_id,
-        {
-            'plugin': plugin_name,
-            'context': context
-        },
-        ttl=ttl
+        putil.write_state_name(write_response.state),
+        putil.write_status_name(write_response.status)
     )
 
 
+def get_read_ttl(device_type):
+    """Get the TTL for cached readings of devices of the given type.
+
+    The TTL for a device type can be configured via 'cache.read.types'.
+    Otherwise, the default TTL ('cache.read.ttl') is used.
+
+    Args:
+        device_type (str): The type of the device.
+
+    Returns:
+        int: The TTL, in seconds, for the device's cached readings. If
+            this is falsy, readings for the device should not be cached.
+    """
+    ttls = config.options.get('cache.read.types', None) or {}
+    if device_type in ttls:
+        return ttls[device_type]
+    return config.options.get('cache.read.ttl', None)
+
+
+async def get_reading(device_id):
+    """Get the cached readings for a device.
+
+    Args:
+        device_id (str): The id composite of the device.
+
+    Returns:
+        dict: The cached readings for the device, along with the (monotonic)
+            time that they were read at. None if there are no readings cached
+            for the device.
+    """
+    return await read_cache.get(device_id)
+
+
+async def add_reading(device_id, readings, ttl):
+    """Add the readings for a device to the read cache.
+
+    Args:
+        device_id (str): The id composite of the device.
+        readings (list[ReadResponse]): The readings returned from the plugin
+            for the device.
+        ttl (int): The time, in seconds, to cache the readings for.
+
+    Returns:
+        dict: The cached readings for the device, along with the (monotonic)
+            time that they were read at.
+    """
+    reading = {
+        'readings': readings,
+        'time': time.monotonic()
+    }
+    await read_cache.set(device_id, reading, ttl=ttl)
+    return reading
+
+
 async def get_device_meta(rack, board, device):
     """Get the meta-information for a device.
 
@@ -132,30 +802,122 @@ async def get_device_meta(rack, board, device):
         errors.DeviceNotFoundError: The given rack-board-device combination
             does not correspond to a known device.
     """
-    cid = utils.composite(rack, board, device)
+    resolved = await resolve_device(rack, board, device)
+    return resolved.plugin_name, resolved.meta
+
+
+async def resolve_device(rack, board, device):
+    """Resolve a device to its meta-information and the plugin which
+    manages it.
+
+    This is a single lookup in the device index of the metainfo snapshot.
+    The snapshot is only awaited if it needs to be built or refreshed.
+
+    Args:
+        rack (str): The rack which the device resides on.
+        board (str): The board which the device resides on.
+        device (str): The ID of the device to resolve.
 
-    # This also builds the plugins cache
-    _cache = await get_metainfo_cache()
-    dev = _cache.get(cid)
+    Returns:
+        ResolvedDevice: The resolved device.
+
+    Raises:
+        errors.DeviceNotFoundError: The given rack-board-device combination
+            does not correspond to a known device.
+    """
+    snapshot = current_snapshot() or await get_snapshot()
 
-    if dev is None:
+    resolved = snapshot.devices.get((rack, board, device))
+    if resolved is None:
         raise errors.DeviceNotFoundError(
             _('{} does not correspond with a known device').format(
                 '/'.join([rack, board, device]))
         )
+    return resolved
+
 
-    # If the device exists, it will have come from a plugin, so we should
-    # always have the plugin name here.
-    pcache = await _plugins_cache.get(PLUGINS_CACHE_KEY)
-    return pcache.get(cid), dev
+def current_snapshot():
+    """Get the current metainfo snapshot, if it can be used as it is.
+
+    Unlike `get_snapshot`, this never builds or refreshes the snapshot, so
+    it does not need to be awaited.
+
+    Returns:
+        MetainfoSnapshot: The current metainfo snapshot, or None if there
+            is no snapshot or it has expired.
+    """
+    snapshot = _snapshot
+    if snapshot is None or snapshot.is_expired():
+        return None
+    return snapshot
+
+
+async def get_snapshot():
+    """Get the current metainfo snapshot.
+
+    If there is no snapshot, it will be built. If any of the plugin partitions
+    of the snapshot have surpassed their TTL, only those partitions will be
+    refreshed, along with any registered plugins which do not have a
+    partition (e.g. plugins registered since the snapshot was built, or whose
+    partition was dropped when they failed to respond). If serving stale
+    data is enabled ('cache.meta.serve_stale'), an expired snapshot which
+    has not surpassed its max staleness is returned right away and
+    refreshed in the background.
+
+    Returns:
+        MetainfoSnapshot: The current metainfo snapshot.
+    """
+    snapshot = _snapshot
+    names = None
+    if snapshot is not None:
+        expired = snapshot.expired()
+        if not expired:
+            return snapshot
+
+        # If only some plugins' partitions have expired, only those plugins
+        # need to be refreshed. Plugins without a partition are always
+        # refreshed, so that they are picked up once they respond.
+        if len(expired) < len(snapshot.partitions):
+            names = expired + [
+                name for name in Plugin.manager.plugins if name not in snapshot.partitions
+            ]
+
+        # The snapshot has expired. If it is not too stale, serve it and
+        # refresh it in the background.
+        if snapshot.can_serve_stale():
+            if not metainfo_rebuilds.in_flight(SNAPSHOT_KEY):
+                logger.debug(_('Serving stale metainfo - refreshing in the background'))
+                asyncio.ensure_future(_refresh_snapshot(names))
+            return snapshot
+
+    if metainfo_rebuilds.in_flight(SNAPSHOT_KEY):
+        logger.debug(_('Metainfo snapshot rebuild in flight - waiting on result'))
+    return await metainfo_rebuilds.do(SNAPSHOT_KEY, _rebuild_snapshot, names)
+
+
+async def refresh_plugin_metainfo(name):
+    """Refresh the meta-information for the devices of a single plugin.
+
+    Only the given plugin is issued a Metainfo request. The partitions of
+    all other plugins are carried over to the new snapshot as they are.
+
+    Args:
+        name (str): The name of the plugin to refresh.
+
+    Returns:
+        MetainfoSnapshot: The snapshot containing the refreshed partition.
+    """
+    logger.debug(_('Refreshing metainfo for plugin: {}').format(name))
+    return await metainfo_rebuilds.do(
+        '{}:{}'.format(SNAPSHOT_KEY, name), _rebuild_snapshot, [name]
+    )
 
 
 async def get_metainfo_cache():
     """Get the cached meta-information aggregated from the gRPC Metainfo
     request across all plugins.
 
-    If the cache does not exist or has surpassed its TTL, it will be
-    rebuilt.
+    This is the metainfo of the current metainfo snapshot (see `get_snapshot`).
 
     If there are no registered plugins, it attempts to (re-)register them.
 
@@ -173,32 +935,141 @@ async def get_metainfo_cache():
         dict: The metainfo dictionary in which the key is the device id
             and the value is the data associated with that device.
     """
-    # Get the cache and return it if it exists, otherwise, rebuild.
-    value = await _meta_cache.get(META_CACHE_KEY)
-    if value is not None:
-        return value
+    snapshot = await get_snapshot()
+    return snapshot.metainfo
+
+
+async def _refresh_snapshot(names=None):
+    """Rebuild the metainfo snapshot in the background.
+
+    Since nothing waits on the result of a background refresh, any errors
+    are logged here rather than raised. The stale snapshot will continue to
+    be served until it surpasses the max staleness.
+
+    Args:
+        names (list[str]): The names of the plugins to refresh. If not
+            given, all plugins are refreshed.
+    """
+    try:
+        await metainfo_rebuilds.do(SNAPSHOT_KEY, _rebuild_snapshot, names)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning(_('Failed background refresh of metainfo snapshot: {}').format(e))
+
 
-    metainfo, plugins = await _build_metainfo_cache()
+async def _rebuild_snapshot(names=None):
+    """Rebuild the metainfo snapshot and make it the current snapshot.
 
-    # If the metainfo data is empty when built, we don't want to cache an
-    # empty dictionary, so we will set it to None. Future calls to get_metainfo_cache
-    # will then attempt to rebuild the cache.
-    meta_value = metainfo or None
-    plugins_value = plugins or None
+    This should not be called directly; rather, it should be called via
+    the `metainfo_rebuilds` single flight so that concurrent misses
+    result in a single rebuild.
 
-    # Get meta cache's ttl and update the cache. Use the same ttl for the plugins.
-    ttl = config.options.get('cache.meta.ttl', None)
-    await _meta_cache.set(META_CACHE_KEY, meta_value, ttl=ttl)
-    await _plugins_cache.set(PLUGINS_CACHE_KEY, plugins_value, ttl=ttl)
+    Only the partitions of the plugins which are refreshed are rebuilt, and
+    only if their devices have changed. If nothing has changed, the current
+    snapshot is kept.
+
+    Args:
+        names (list[str]): The names of the plugins to refresh. The
+            partitions of all other plugins are kept as they are. If not
+            given, all plugins are refreshed and any partition belonging
+            to a plugin that did not provide meta-information is dropped.
+
+    Returns:
+        MetainfoSnapshot: The rebuilt (or current) snapshot.
+    """
+    global _snapshot, _snapshot_version  # pylint: disable=global-statement
+
+    started = time.monotonic()
+    metainfo, plugins = await _build_metainfo_cache(names)
+
+    # Group the collected devices by the plugin which manages them.
+    collected = {}
+    for cid, device in metainfo.items():
+        collected.setdefault(plugins[cid], {})[cid] = device
+
+    current = _snapshot
+    old = current.partitions if current is not None else {}
+
+    # A refresh of a single plugin may run concurrently with this rebuild. Any
+    # partition which was built (or confirmed current) after this rebuild
+    # started is newer than the meta-information collected here, so it is
+    # kept rather than replaced.
+    newer = {k: v for k, v in old.items() if v.age() < time.monotonic() - started}
+
+    # When only some plugins are refreshed, the partitions for all other
+    # plugins are carried over untouched.
+    if names is None:
+        partitions = dict(newer)
+    else:
+        partitions = {k: v for k, v in old.items() if k not in names or k in newer}
+
+    # If a plugin's devices have not changed since its partition was built,
+    # there is no need to rebuild the partition; it is only marked as current.
+    rebuilt = []
+    for name, devices in collected.items():
+        if name in newer:
+            continue
+
+        partition = old.get(name)
+        if partition is not None:
+            added, removed, changed = partition.diff(devices)
+            if not any((added, removed, changed)):
+                partition.touch()
+                partitions[name] = partition
+                continue
+
+            logger.info(
+                _('Metainfo changed for plugin {} (added: {}, removed: {}, changed: {})')
+                .format(name, len(added), len(removed), len(changed))
+            )
+
+        partitions[name] = MetainfoPartition(name, devices)
+        rebuilt.append(name)
+
+    dropped = [name for name in old if name not in partitions]
+
+    if current is not None and not rebuilt and not dropped:
+        logger.debug(_('Metainfo unchanged - keeping snapshot: {}').format(current))
+        return current
+
+    _snapshot_version += 1
+    snapshot = MetainfoSnapshot(partitions, _snapshot_version)
+
+    # If the metainfo data is empty when built, we don't want to keep an
+    # empty snapshot. Future calls to get_snapshot will then attempt to
+    # rebuild it.
+    _snapshot = snapshot if snapshot.metainfo else None
 
-    return metainfo
+    logger.debug(
+        _('Metainfo snapshot rebuilt: {} (rebuilt: {}, dropped: {}, {})').format(
+            snapshot, rebuilt, dropped, metainfo_rebuilds)
+    )
+    return snapshot
+
+
+async def metainfo_refresher():
+    """Periodically refresh the metainfo snapshot in the background.
+
+    This runs for as long as 'cache.meta.refresh_interval' is configured. On
+    each refresh, all plugins are asked for their meta-information, which is
+    compared against the current snapshot; the snapshot is only rebuilt if
+    devices were added, removed, or changed. Keeping the snapshot refreshed
+    here means requests do not need to rebuild it when it expires.
+    """
+    logger.info(_('Starting background metainfo refresher'))
+    while True:
+        interval = config.options.get('cache.meta.refresh_interval', None)
+        if not interval:
+            logger.info(_('Metainfo refresh interval not set - stopping refresher'))
+            return
+
+        await _refresh_snapshot()
+        await asyncio.sleep(interval)
 
 
 async def get_scan_cache():
     """Get the cached scan results.
 
-    If the scan result cache does not exist or the TTL has expired, the cache
-    will be rebuilt.
+    This is the scan data of the current metainfo snapshot (see `get_snapshot`).
 
     An example of the scan cache structure:
         {
@@ -229,32 +1100,14 @@ async def get_scan_cache():
     Returns:
         dict: A dictionary containing the scan command result.
     """
-    value = await _scan_cache.get(SCAN_CACHE_KEY)
-    if value is not None:
-        return value
-
-    # If the cache is not found, we will (re)build it from metainfo cache.
-    _metainfo = await get_metainfo_cache()
-    scan_cache = _build_scan_cache(_metainfo)
-
-    # If the scan data is empty when built, we don't want to cache an empty
-    # dictionary, so we will set it to None. Future calls to get_scan_cache
-    # will then attempt to rebuild the cache.
-    value = scan_cache or None
-
-    # Get the scan cache's ttl and update the cache. This should be the same
-    # ttl that is used by the metainfo cache.
-    ttl = config.options.get('cache.meta.ttl', None)
-    await _meta_cache.set(SCAN_CACHE_KEY, value, ttl=ttl)
-
-    return scan_cache
+    snapshot = await get_snapshot()
+    return snapshot.scan
 
 
 async def get_resource_info_cache():
     """Get the cached resource info.
 
-    If the resource info cache does not exist or the TTL has expired, the
-    cache will be rebuilt.
+    This is the info data of the current metainfo snapshot (see `get_snapshot`).
 
     An example of the info cache structure:
         {
@@ -302,30 +1155,17 @@ async def get_resource_info_cache():
     Returns:
         dict: A dictionary containing the info command result.
     """
-    value = await _info_cache.get(INFO_CACHE_KEY)
-    if value is not None:
-        return value
+    snapshot = await get_snapshot()
+    return snapshot.info
 
-    # If the cache is not found, we will (re)build it from metainfo cache.
-    _metainfo = await get_metainfo_cache()
-    info_cache = _build_resource_info_cache(_metainfo)
 
-    # If the info data is empty when built, we don't want to cache an empty
-    # dictionary, so we will set it to None. Future calls to get_info_cache
-    # will then attempt to rebuild the cache.
-    value = info_cache or None
-
-    # Get the info cache's ttl and update the cache. This should be the same
-    # ttl that is used by the metainfo cache.
-    ttl = config.options.get('cache.meta.ttl', None)
-    await _meta_cache.set(INFO_CACHE_KEY, value, ttl=ttl)
-
-    return info_cache
-
-
-async def _build_metainfo_cache():
+async def _build_metainfo_cache(names=None):
     """Construct the dictionary that will become the metainfo cache.
 
+    Args:
+        names (list[str]): The names of the plugins to get meta-information
+            from. If not given, all registered plugins are used.
+
     Returns:
         tuple(dict, dict): A tuple where the first dictionary is the metainfo
             dictionary (in which the key is the device id and the value is the
@@ -334,7 +1174,8 @@ async def _build_metainfo_cache():
             the plugin which manages it).
 
     Raises:
-        errors.InternalApiError: All plugins failed the metainfo scan.
+        errors.InternalApiError: All plugins failed the metainfo scan. This
+            is only raised when scanning all plugins.
     """
     logger.debug(_('Building the metainfo cache'))
     metainfo, plugins = {}, {}
@@ -342,25 +1183,28 @@ async def _build_metainfo_cache():
     # First, we want to iterate through all of the known plugins and
     # use the associated client to get the meta information provided by
     # that backend.
-    plugin_count = len(Plugin.manager.plugins)
-    if plugin_count == 0:
+    if len(Plugin.manager.plugins) == 0:
         logger.debug(_('Manager has no plugins - registering plugins'))
         register_plugins()
-        plugin_count = len(Plugin.manager.plugins)
-
-    logger.debug(_('Plugins to scan: {}').format(plugin_count))
 
     # Track which plugins failed to provide metainfo for any reason.
     failures = {}
 
-    async for name, plugin in get_plugins():
-        logger.debug('{} -- {}'.format(name, plugin))
+    # Issue the metainfo request to all plugins concurrently, so the time it
+    # takes to build the cache is bound by the slowest plugin rather than the
+    # sum of all of them. Results are merged in as each plugin responds.
+    timeout = config.options.get('grpc.timeout', None)
+    requests = [
+        _get_plugin_metainfo(name, plugin, timeout)
+        async for name, plugin in get_plugins()
+        if names is None or name in names
+    ]
+
+    plugin_count = len(requests)
+    logger.debug(_('Plugins to scan: {}').format(plugin_count))
 
-        try:
-            for device in plugin.client.metainfo():
-                _id = utils.composite(device.location.rack, device.location.board, device.uid)
-                metainfo[_id] = device
-                plugins[_id] = name
+    for future in asyncio.as_completed(requests):
+        name, devices, ex = await future
 
         # We do not want to fail the scan if a single plugin fails to provide
         # meta-information.
@@ -371,14 +1215,22 @@ async def _build_metainfo_cache():
         #   - update the API to add a url to check the currently configured plugins
         #     and their 'health'/'state'.
         #   - both
-        except grpc.RpcError as ex:
+        if ex is not None:
             failures[name] = ex
             logger.warning(_('Failed to get metainfo for plugin: {}').format(name))
             logger.warning(ex)
+            continue
+
+        for device in devices:
+            _id = utils.composite(device.location.rack, device.location.board, device.uid)
+            metainfo[_id] = device
+            plugins[_id] = name
 
     # If we fail to read from all plugins (assuming there were any), then we
-    # can raise an error since it is likely something is mis-configured.
-    if plugin_count != 0 and plugin_count == len(failures):
+    # can raise an error since it is likely something is mis-configured. When
+    # only some plugins are scanned, the failures are not fatal; the failed
+    # plugins' devices are dropped, as they are when scanning all plugins.
+    if names is None and plugin_count != 0 and plugin_count == len(failures):
         raise errors.InternalApiError(
             _('Failed to scan all plugins: {}').format(failures)
         )
@@ -386,6 +1238,55 @@ async def _build_metainfo_cache():
     return metainfo, plugins
 
 
+async def _get_plugin_metainfo(name, plugin, timeout=None):
+    """Get the meta-information for all devices managed by a single plugin.
+
+    Any error in getting the meta-information is returned rather than
+    raised so that a single failing plugin does not interrupt the metainfo
+    requests being made to other plugins.
+
+    Args:
+        name (str): The name of the plugin.
+        plugin (Plugin): The plugin to get meta-information from.
+        timeout (int): The deadline for the plugin to respond, in seconds.
+            This bounds the total time of the request, including any time
+            spent waiting for the request to be issued.
+
+    Returns:
+        tuple(str, list, Exception): A tuple where the first item is the name
+            of the plugin, the second is the list of MetainfoResponse for its
+            devices, and the third is the error that occurred getting the
+            meta-information, if any.
+    """
+    logger.debug('{} -- {}'.format(name, plugin))
+    try:
+        devices = await asyncio.wait_for(plugin.client.metainfo(), timeout)
+    except (grpc.RpcError, asyncio.TimeoutError) as ex:
+        return name, [], ex
+    return name, devices, None
+
+
+def _build_device_index(metainfo):
+    """Build the secondary indexes for the meta-info cache.
+
+    Args:
+        metainfo (dict): The meta-info cache dictionary.
+
+    Returns:
+        dict: The indexes, in which the key is the name of the indexed field
+            (see `DEVICE_SELECTORS`) and the value is a dictionary mapping each
+            value of the field to the set of id composites of the devices with
+            that value.
+    """
+    index = {field: {} for field in DEVICE_SELECTORS}
+
+    for cid, source in metainfo.items():
+        for field, getter in DEVICE_SELECTORS.items():
+            index[field].setdefault(getter(source), set()).add(cid)
+
+    return index
+
+
 def _build_scan_cache(metainfo):
     """Build the scan cache.
 
@@ -497,7 +1398,7 @@ def _build_scan_cache(metainfo):
     return scan_cache
 
 
-def _build_resource_info_cache(metainfo):
+def _build_resource_info_cache(metainfo, device_info=None):
     """Build the resource info cache.
 
     This builds the info cache, adhering to the Info response scheme,
@@ -505,6 +1406,9 @@ def _build_resource_info_cache(metainfo):
 
     Args:
         metainfo (dict): The meta-info cache dictionary.
+        device_info (dict): The dictionary representations of the devices
+            in the meta-info cache, keyed by device id composite. Any device
+            found here is not converted again.
 
     Returns:
         dict: The constructed info cache.
@@ -512,9 +1416,13 @@ def _build_resource_info_cache(metainfo):
     logger.debug(_('Building the info cache'))
     info_cache = {}
 
-    for source in metainfo.values():
+    device_info = device_info or {}
+
+    for cid, source in metainfo.items():
 
-        src = putil.metainfo_to_dict(source)
+        src = device_info.get(cid)
+        if src is None:
+            src = putil.metainfo_to_dict(source)
 
         rack = source.location.rack
         board = source.location.board
@@ -13,10 +13,11 @@ from .config import config
 # FIXME (etd) - temporary for autofan support
 from .fan_sensors import fan_sensors
 from .info import info
-from .plugins import get_plugins
-from .read import read
+from .plugins import get_plugins, plugins_validator
+from .read import batch_read, read
 from .scan import scan
 from .test import test
-from .transaction import check_transaction
+from .transaction import (check_transaction, check_transactions,
+                          list_transactions)
 from .version import version
-from .write import write
+from .write import batch_write, write
@@ -4,8 +4,16 @@ import datetime
 from collections import OrderedDict
 
 from synse import cache
-from synse.commands.read import read
+from synse.commands.read import batch_read
 from synse.log import logger
+from synse.scheme import ReadResponse
+
+# The selectors for the devices that auto fan uses: the MAX11610 thermistors
+# and SDP610 differential pressure sensors.
+FAN_SENSOR_SELECTORS = [
+    {'type': 'temperature', 'model': 'max11610'},
+    {'type': 'pressure', 'model': 'sdp610'},
+]
 
 
 # TODO: Need a note in the configuration files about auto_fan relying on
@@ -53,7 +61,7 @@ def _translate_device_info(device_info):
     if device_info == 'Rack Differential Pressure Top':
         return 'differential_pressure_2'
 
-    logger.error('Unknown device_info: {}').format(device_info)
+    logger.error('Unknown device_info: {}'.format(device_info))
     return None
 
 
@@ -64,116 +72,73 @@ async def fan_sensors():
         dict: A dictionary of device readings for all fan sensors.
     """
     # Auto fan uses the MAX11610 thermistors and SDP619 differential pressure
-    # sensors. This isn't a *great* way of doing things since its hardcoded,
-    # but this should be enough to get things in place and working in the short
-    # term.
-    #
-    # In the long term, it would be good to expand read functionality in some
-    # way such that we can do something like:
-    #
-    #   GET synse/2.0/read?type=temperature
-    #
-    # to read all the devices of a given type or model.
-
+    # sensors. These are selected using the device index of the metainfo
+    # snapshot and read concurrently via the batch read command.
     start_time = datetime.datetime.now()
-    _cache = await cache.get_metainfo_cache()
-    scan_cache = await cache.get_scan_cache()
+    snapshot = await cache.get_snapshot()
+
+    devices = []
+    for selectors in FAN_SENSOR_SELECTORS:
+        devices.extend(
+            (d.location.rack, d.location.board, d.uid) for d in snapshot.select(**selectors)
+        )
+
+    batch = await batch_read(devices=devices)
 
-    readings = []
     new_readings = dict()
     new_readings['racks'] = OrderedDict()
 
+    # The time, in seconds from the start of the batch, that the last read
+    # of a device on each rack completed.
+    rack_read_times = dict()
+
     logger.debug('--- FAN SENSORS start ---')
-    for _, v in _cache.items():
-
-        logger.debug('FAN SENSORS')
-        logger.debug('fan_sensors cache item: {}'.format(v))
-
-        is_temp = v.type.lower() == 'temperature' and v.model.lower() == 'max11610'
-        is_pressure = v.type.lower() == 'pressure' and v.model.lower() == 'sdp610'
-
-        if is_temp or is_pressure:
-            rack = v.location.rack # string (vec1-c1-wrigley for example)
-            board = v.location.board # string (vec for example)
-            device = v.uid # string (uuid - only unique to one rack)
-
-            # Find the device in the scan_cache.
-            scan_cache_board = None
-            scan_cache_device = None
-            scan_cache_rack = next((r for r in scan_cache['racks'] if r['id'] == rack), None)
-            if scan_cache_rack is not None:
-                scan_cache_board = next(
-                    (b for b in scan_cache_rack['boards'] if b['id'] == board), None)
-                if scan_cache_board is not None:
-                    scan_cache_device = next(
-                        (d for d in scan_cache_board['devices'] if d['id'] == device), None)
-            logger.debug('scan_cache_rack_id, board_id, device_info: {}, {}, {}'.format(
-                scan_cache_rack.get('id', None),
-                scan_cache_board.get('id', None),
-                scan_cache_device.get('info', None)))
-
-            try:
-                resp = await read(rack, board, device)
-            except Exception as e:
-                logger.warning('Failed to get reading for {}-{}-{} for fan_sensors {}.'.format(
-                    rack, board, device, e))
-            else:
-                single_reading = resp.data # Single sensor reading.
-                logger.debug('fan_sensors data: {}.'.format(single_reading))
-                # Wedge in the VEC name that we received this data from.
-                # That way auto_fan can map the data to a VEC.
-                single_reading['location'] = {
-                    'rack': rack,
-                    'board': board,
-                    'device': device,
-                }
-                single_reading['scan_cache_device'] = scan_cache_device
-                logger.debug('fan_sensors data with vec: {}.'.format(single_reading))
-                readings.append(single_reading)
-
-                # If the rack is not a key in new readings, add it.
-                if rack not in new_readings['racks']:
-                    new_readings['racks'][rack] = dict()
-
-                # Translate single_reading['scan_cache_device']['info']
-                # and add it under the rack key which is:
-                # new_readings['racks'][rack][translation] \
-                #     = single_reading['data'][single_reading['type']]['value']
-                logger.debug(
-                    'single_reading[scan_cache_device][info]: {}'.format(
-                        single_reading['scan_cache_device']['info']))
-                logger.debug(
-                    'single_reading[data][single_reading[type]][value]: {}'.format(
-                        single_reading['data'][single_reading['type']]['value']))
-
-                # Add sensor reading to result set.
-                fan_sensor_key = _translate_device_info(single_reading['scan_cache_device']['info'])
-                reading_value = single_reading['data'][single_reading['type']]['value']
-                if fan_sensor_key is not None and reading_value is not None:
-                    # Be sure not to overwrite any existing reading in the current result set.
-                    # That would imply a mapping issue or some other bug.
-                    if fan_sensor_key in new_readings['racks'][rack]:
-                        message = 'fan_sensors avoiding overwrite of existing reading [{}] at ' \
-                                  'new_readings[racks][{}][{}] with [{}]'.format(
-                                      new_readings['racks'][rack][fan_sensor_key],
-                                      rack, fan_sensor_key, reading_value)
-                        logger.error(message)
-                        raise ValueError(message)
-                    # No existing reading in the result set, safe to add it.
-                    new_readings['racks'][rack][fan_sensor_key] = reading_value
+    results = zip(batch.devices, batch.results, batch.read_times)
+    for (rack, board, device), resp, read_time in results:
+        if not isinstance(resp, ReadResponse):
+            logger.warning('Failed to get reading for {}-{}-{} for fan_sensors {}.'.format(
+                rack, board, device, resp))
+            continue
+
+        dev = resp.device
+        logger.debug('fan_sensors data for {}-{}-{} ({}): {}.'.format(
+            rack, board, device, dev.info, resp.data))
+
+        # If the rack is not a key in new readings, add it.
+        if rack not in new_readings['racks']:
+            new_readings['racks'][rack] = dict()
+        rack_read_times[rack] = max(rack_read_times.get(rack, 0), read_time)
+
+        # Add sensor reading to result set, keyed by the translation of the
+        # device info.
+        fan_sensor_key = _translate_device_info(dev.info)
+        reading_value = resp.data['data'][resp.data['type']]['value']
+        if fan_sensor_key is not None and reading_value is not None:
+            # Be sure not to overwrite any existing reading in the current result set.
+            # That would imply a mapping issue or some other bug.
+            if fan_sensor_key in new_readings['racks'][rack]:
+                message = 'fan_sensors avoiding overwrite of existing reading [{}] at ' \
+                          'new_readings[racks][{}][{}] with [{}]'.format(
+                              new_readings['racks'][rack][fan_sensor_key],
+                              rack, fan_sensor_key, reading_value)
+                logger.error(message)
+                raise ValueError(message)
+            # No existing reading in the result set, safe to add it.
+            new_readings['racks'][rack][fan_sensor_key] = reading_value
 
     logger.debug('--- FAN SENSORS end ---')
     # Sort the new_readings racks by racks['id']
     new_readings['racks'] = OrderedDict(sorted(new_readings['racks'].items()))
-    end_time = datetime.datetime.now()
-    read_time = (end_time - start_time).total_seconds() * 1000
 
-    # Shim in the start, end, read times into each response now that we have them.
-    # Even though they are all the same, they didn't used to be and auto fan wants
-    # each for logging purposes.
+    # Shim in the start, end, read times into each response. The devices for all
+    # racks are read concurrently, so each rack's end time is when the last read
+    # of a device on that rack completed. Auto fan wants these for logging purposes.
     for rack in new_readings['racks']:
+        read_time = rack_read_times[rack]
+        end_time = start_time + datetime.timedelta(seconds=read_time)
+
         new_readings['racks'][rack]['start_time'] = str(start_time)
         new_readings['racks'][rack]['end_time'] = str(end_time)
-        new_readings['racks'][rack]['read_time'] = read_time
+        new_readings['racks'][rack]['read_time'] = (end_time - start_time).total_seconds() * 1000
 
     return new_readings
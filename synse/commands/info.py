@@ -24,8 +24,8 @@ async def info(rack, board=None, device=None):
             _('No rack specified when issuing info command')
         )
 
-    _cache = await cache.get_resource_info_cache()
-    r, b, d = get_resources(_cache, rack, board, device)
+    snapshot = await cache.get_snapshot()
+    r, b, d = get_resources(snapshot.info, rack, board, device)
 
     if board is not None:
         # We have: rack, board, device
@@ -47,7 +47,13 @@ async def info(rack, board=None, device=None):
             'boards': list(r['boards'].keys())
         }
 
-    return InfoResponse(response)
+    # The info data is encoded once per snapshot, since it does not change
+    # until the snapshot is rebuilt.
+    return InfoResponse(
+        response,
+        encoded=snapshot.encode(('info', rack, board, device), response),
+        validator=snapshot.validator
+    )
 
 
 def get_resources(info_cache, rack=None, board=None, device=None):
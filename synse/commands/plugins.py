@@ -3,12 +3,27 @@
 from synse import plugin
 from synse.i18n import _
 from synse.log import logger
+from synse.response import Validator
 from synse.scheme.plugins import PluginsResponse
 
 
-async def get_plugins():
+def plugins_validator():
+    """Get the validator of the currently registered plugins.
+
+    Returns:
+        Validator: The validator of the registered plugins.
+    """
+    manager = plugin.Plugin.manager
+    return Validator('plugins-{}'.format(manager.version), manager.modified)
+
+
+async def get_plugins(register=True):
     """The handler for the Synse Server "plugins" API command.
 
+    Args:
+        register (bool): Whether to register the plugins before getting
+            them. This can be skipped if they were just registered.
+
     Returns:
         PluginsResponse: The "plugins" response scheme model.
     """
@@ -17,7 +32,8 @@ async def get_plugins():
     # Register plugins. If no plugins exist, this will attempt to register
     # new ones. If plugins already exist, this will just ensure that all of
     # the tracked plugins are up to date.
-    plugin.register_plugins()
+    if register:
+        plugin.register_plugins()
 
     # Build a view of all the plugins registered with the plugin manager.
     # Here we take the element at index 1 because get_plugins returns a tuple
@@ -28,4 +44,4 @@ async def get_plugins():
         'address': p[1].addr
     } async for p in plugin.get_plugins()]
 
-    return PluginsResponse(data=plugins)
+    return PluginsResponse(data=plugins, validator=plugins_validator())
@@ -1,44 +1,251 @@
 """Command handler for the `read` route."""
 # pylint: disable=line-too-long
 
+import asyncio
+import time
+
 import grpc
 from synse_plugin import api
 
-from synse import cache, errors, plugin, utils
+from synse import cache, config, errors, plugin, utils
 from synse.i18n import _
 from synse.log import logger
-from synse.scheme import ReadResponse
+from synse.scheme import BatchReadResponse, ReadResponse
 
 
-async def read(rack, board, device):
+async def read(rack, board, device, resolved=None):
     """The handler for the Synse Server "read" API command.
 
     Args:
         rack (str): The rack which the device resides on.
         board (str): The board which the device resides on.
         device (str): The device to read.
+        resolved (cache.ResolvedDevice): The device, if it has already been
+            resolved earlier in the request (e.g. by device type validation).
+            If not given, the device is resolved here.
 
     Returns:
         ReadResponse: The "read" response scheme model.
     """
     logger.debug(_('Read Command (args: {}, {}, {})').format(rack, board, device))
 
-    # Lookup the known info for the specified device.
-    plugin_name, dev = await cache.get_device_meta(rack, board, device)
-    logger.debug(_('Device {} is managed by plugin {}').format(device, plugin_name))
+    # Lookup the known info for the specified device and the plugin context
+    # for the device's specified protocol.
+    if resolved is None:
+        resolved = await cache.resolve_device(rack, board, device)
+    logger.debug(_('Device {} is managed by plugin {}').format(device, resolved.plugin_name))
 
-    # Get the plugin context for the device's specified protocol.
-    _plugin = plugin.get_plugin(plugin_name)
+    _plugin = resolved.plugin
     logger.debug(_('Got plugin: {}').format(_plugin))
     if not _plugin:
         raise errors.PluginNotFoundError(
-            _('Unable to find plugin named "{}" to read').format(plugin_name)
+            _('Unable to find plugin named "{}" to read').format(resolved.plugin_name)
+        )
+
+    return await _read(_plugin, resolved.meta, resolved.formatters)
+
+
+async def batch_read(devices=None, selectors=None):
+    """The handler for the Synse Server "batch read" API command.
+
+    The devices to read can either be given explicitly, or be selected from
+    all known devices by rack, board, type, model, and/or protocol. The
+    devices are grouped by the plugin which manages them and read concurrently,
+    with at most 'grpc.max_concurrent_reads' reads in flight to any one plugin.
+    A failure to read any one device does not fail the command; the error is
+    instead reported for that device in the response.
+
+    Args:
+        devices (list[tuple(str, str, str)]): The rack, board, and device
+            IDs of the devices to read. If not specified, the devices are
+            selected by the given selectors.
+        selectors (dict): The device fields to select the devices to read by,
+            mapped to the value to match. See `cache.DEVICE_SELECTORS` for
+            the supported fields. If neither devices nor selectors are
+            specified, all devices are read.
+
+    Returns:
+        BatchReadResponse: The "batch read" response scheme model.
+
+    Raises:
+        errors.InvalidArgumentsError: An unsupported selector was given.
+    """
+    logger.debug(_('Batch Read Command (devices: {}, selectors: {})').format(
+        devices, selectors))
+
+    # Resolve all devices against the same snapshot, rather than looking
+    # up each device's meta-information individually.
+    snapshot = await cache.get_snapshot()
+
+    if devices is None:
+        devices = [
+            (d.location.rack, d.location.board, d.uid)
+            for d in snapshot.select(**(selectors or {}))
+        ]
+
+    # The result for each device, in the order that they were given. This
+    # is either a ReadResponse or the error which occurred reading the device.
+    results = [None] * len(devices)
+
+    # The time, in seconds since the start of the batch, that each device's
+    # read completed.
+    read_times = [None] * len(devices)
+    start = time.monotonic()
+
+    # Group the devices by the plugin which manages them.
+    groups = {}
+    for i, device in enumerate(devices):
+        resolved = snapshot.devices.get(tuple(device))
+        if resolved is None:
+            results[i] = errors.DeviceNotFoundError(
+                _('{} does not correspond with a known device').format('/'.join(device))
+            )
+            continue
+        groups.setdefault(resolved.plugin_name, []).append((i, resolved))
+
+    max_concurrent = config.options.get('grpc.max_concurrent_reads', None)
+
+    reads = []
+    for plugin_name, group in groups.items():
+        _plugin = plugin.get_plugin(plugin_name)
+        logger.debug(_('Reading {} devices from plugin {}').format(len(group), plugin_name))
+
+        # Bound the number of reads in flight to each plugin, so a large
+        # batch does not flood any one plugin with requests.
+        limit = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+
+        for i, resolved in group:
+            if not _plugin:
+                results[i] = errors.PluginNotFoundError(
+                    _('Unable to find plugin named "{}" to read').format(plugin_name)
+                )
+                continue
+            reads.append(
+                _batch_read_device(i, _plugin, resolved.meta, limit, resolved.formatters)
+            )
+
+    for i, result, completed in await asyncio.gather(*reads):
+        results[i] = result
+        read_times[i] = completed - start
+
+    return BatchReadResponse(
+        devices=devices,
+        results=results,
+        read_times=read_times
+    )
+
+
+async def _batch_read_device(index, _plugin, dev, limit=None, formatters=None):
+    """Read a single device as part of a batch read.
+
+    An error reading the device is returned as its result (see
+    `utils.bounded_call`).
+
+    Args:
+        index (int): The index of the device in the batch.
+        _plugin (Plugin): The plugin which manages the device.
+        dev (MetainfoResponse): The meta-information for the device.
+        limit (asyncio.Semaphore): The semaphore bounding the number of
+            concurrent reads to the plugin, if any.
+        formatters (dict): The compiled formatters for the device's outputs.
+
+    Returns:
+        tuple(int, ReadResponse | errors.SynseError, float): The index of the
+            device, the result of reading it, and the (monotonic) time that
+            the read completed.
+    """
+    result = await utils.bounded_call(
+        _read, _plugin, dev, formatters,
+        limit=limit,
+        error=errors.FailedReadCommandError,
+        failure=_('Failed to read device {} in batch read').format(dev.uid),
+    )
+    return index, result, time.monotonic()
+
+
+async def _read(_plugin, dev, formatters=None):
+    """Read a device.
+
+    If the read cache is enabled for the device's type (see 'cache.read'),
+    the device's readings are served from the cache while they are fresh.
+    Otherwise, the readings are read from the plugin which manages the
+    device and cached. Concurrent reads of a device which miss the cache
+    result in a single read from the plugin.
+
+    Args:
+        _plugin (Plugin): The plugin which manages the device.
+        dev (MetainfoResponse): The meta-information for the device.
+        formatters (dict): The compiled formatters for the device's outputs
+            (see `ResolvedDevice`). If not given, they are compiled from the
+            device's outputs.
+
+    Returns:
+        ReadResponse: The "read" response scheme model.
+
+    Raises:
+        errors.FailedReadCommandError: The plugin failed to read the device.
+    """
+    ttl = cache.get_read_ttl(dev.type)
+    if not ttl:
+        return ReadResponse(
+            device=dev,
+            readings=await _read_plugin(_plugin, dev),
+            formatters=formatters
         )
 
+    cid = utils.composite(dev.location.rack, dev.location.board, dev.uid)
+
+    cached = True
+    reading = await cache.get_reading(cid)
+    if reading is None:
+        cached = False
+        reading = await cache.device_reads.do(cid, _read_and_cache, _plugin, dev, cid, ttl)
+
+    return ReadResponse(
+        device=dev,
+        readings=reading['readings'],
+        cached=cached,
+        age=time.monotonic() - reading['time'],
+        formatters=formatters
+    )
+
+
+async def _read_and_cache(_plugin, dev, device_id, ttl):
+    """Read a device from the plugin which manages it and cache its readings.
+
+    Args:
+        _plugin (Plugin): The plugin which manages the device.
+        dev (MetainfoResponse): The meta-information for the device.
+        device_id (str): The id composite of the device.
+        ttl (int): The time, in seconds, to cache the readings for.
+
+    Returns:
+        dict: The cached readings for the device, along with the (monotonic)
+            time that they were read at.
+    """
+    readings = await _read_plugin(_plugin, dev)
+    return await cache.add_reading(device_id, readings, ttl)
+
+
+async def _read_plugin(_plugin, dev):
+    """Read a device from the plugin which manages it.
+
+    Args:
+        _plugin (Plugin): The plugin which manages the device.
+        dev (MetainfoResponse): The meta-information for the device.
+
+    Returns:
+        list[api.ReadResponse]: The readings for the device.
+
+    Raises:
+        errors.FailedReadCommandError: The plugin failed to read the device.
+    """
+    rack, board, device = dev.location.rack, dev.location.board, dev.uid
+
     read_data = []
     try:
         # Perform a gRPC read on the device's managing plugin
-        read_data = _plugin.client.read(rack, board, device)
+        read_data = await _plugin.client.read(rack, board, device)
     except grpc.RpcError as ex:
 
         # FIXME (etd) - this isn't the nicest way of doing this check.
@@ -95,7 +302,4 @@ async def read(rack, board, device):
         else:
             raise errors.FailedReadCommandError(str(ex)) from ex
 
-    return ReadResponse(
-        device=dev,
-        readings=read_data
-    )
+    return read_data
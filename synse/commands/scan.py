@@ -6,20 +6,28 @@ from synse.log import logger
 from synse.scheme.scan import ScanResponse
 
 
-async def scan(rack=None, board=None, force=False):
+async def scan(rack=None, board=None, force=False, plugin_name=None):
     """The handler for the Synse Server "scan" API command.
 
     Args:
         rack (str): The rack to filter the scan results by.
         board (str): The board to filter the scan results by.
         force (bool): Force a re-scan of the meta-information.
+        plugin_name (str): The name of the plugin to re-scan when forcing
+            a re-scan. If specified, only the meta-information for that
+            plugin's devices is re-scanned; the meta-information for all
+            other plugins is left as it is.
 
     Returns:
         ScanResponse: The "scan" response scheme model.
+
+    Raises:
+        errors.PluginNotFoundError: The plugin to re-scan is not known.
     """
-    logger.debug(_('Scan Command (args: {}, {}, force: {})').format(rack, board, force))
+    logger.debug(_('Scan Command (args: {}, {}, force: {}, plugin: {})').format(
+        rack, board, force, plugin_name))
 
-    if force:
+    if force and plugin_name is None:
         await cache.clear_all_meta_caches()
 
     # Plugins are registered on scan. If no plugins exist and a scan is
@@ -31,7 +39,15 @@ async def scan(rack=None, board=None, force=False):
         logger.debug(_('Re-registering plugins'))
         plugin.register_plugins()
 
-    cache_data = await cache.get_scan_cache()
+    if force and plugin_name is not None:
+        if plugin.get_plugin(plugin_name) is None:
+            raise errors.PluginNotFoundError(
+                _('Unable to find plugin named "{}" to re-scan').format(plugin_name)
+            )
+        await cache.refresh_plugin_metainfo(plugin_name)
+
+    snapshot = await cache.get_snapshot()
+    cache_data = snapshot.scan
 
     # Filter the scan results by rack.
     if rack is not None:
@@ -60,6 +76,10 @@ async def scan(rack=None, board=None, force=False):
                     _('Board "{}" not found in scan results').format(board)
                 )
 
+    # The scan data is encoded once per snapshot, since it does not change
+    # until the snapshot is rebuilt.
     return ScanResponse(
-        data=cache_data
+        data=cache_data,
+        encoded=snapshot.encode(('scan', rack, board), cache_data),
+        validator=snapshot.validator
     )
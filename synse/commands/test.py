@@ -1,12 +1,22 @@
 """Command handler for the `test` route."""
 
+from synse import cache
 from synse.scheme import TestResponse
 
 
 async def test():
     """The handler for the Synse Server "test" API command.
 
+    The response includes the number of calls made and coalesced for the
+    operations which the caches coalesce (see `utils.SingleFlight`).
+
     Returns:
         TestResponse: The "test" response scheme model.
     """
-    return TestResponse()
+    return TestResponse(cache={
+        name: {'calls': flight.calls, 'coalesced': flight.coalesced}
+        for name, flight in (
+            ('metainfo_rebuilds', cache.metainfo_rebuilds),
+            ('device_reads', cache.device_reads),
+        )
+    })
@@ -1,45 +1,146 @@
 """Command handler for the `transaction` route."""
 
+import asyncio
+
 import grpc
 
-from synse import cache, errors, plugin
+from synse import cache, config, errors, plugin, utils, watcher
 from synse.i18n import _
 from synse.log import logger
 from synse.scheme import transaction as scheme
 
 
-async def check_transaction(transaction_id):
+async def check_transaction(transaction_id, wait=None):
     """The handler for the Synse Server "transaction" API command.
 
     Args:
         transaction_id (str|None): The id of the transaction to check. If
             the ID is None, a list of all transactions currently in the
             cache is returned.
+        wait (float): The maximum time, in seconds, to wait for the
+            transaction to complete before returning its state. If not
+            given, the current state is returned right away.
 
     Returns:
         TransactionResponse: The "transaction" response scheme model.
         TransactionListResponse: The list of all transactions.
     """
-    logger.debug(_('Transaction Command (args: {})').format(transaction_id))
+    logger.debug(_('Transaction Command (args: {}, wait: {})').format(transaction_id, wait))
 
     # If we are not given a transaction ID, then we want to return
     # the list of all actively tracked transactions.
     if transaction_id is None:
-        all_keys = cache.transaction_cache._cache.keys()
-        # Keys in the cache are prepended with 'transaction', so here we get all
-        # keys with that prefix and strip the prefix.
-        transaction_ids = [k[11:] for k in all_keys if k.startswith('transaction')]
-        return scheme.TransactionListResponse(transaction_ids)
+        return await list_transactions()
 
     # Otherwise, get the specified transaction.
     transaction = await cache.get_transaction(transaction_id)
+    _plugin = _get_plugin(transaction_id, transaction)
+    return await _check(_plugin, transaction_id, transaction.get('context'), wait)
+
+
+async def list_transactions(offset=0, limit=None, **filters):
+    """The handler for the Synse Server "list transactions" API command.
+
+    Args:
+        offset (int): The number of matching transactions to skip.
+        limit (int): The maximum number of transactions to list. If not
+            given, all matching transactions are listed.
+        **filters: The transaction fields to filter by, mapped to the
+            value to match. See `cache.TRANSACTION_FILTERS` for the
+            supported fields.
+
+    Returns:
+        TransactionListResponse: The IDs of the matching transactions, in
+            the order that they were created.
+
+    Raises:
+        errors.InvalidArgumentsError: An unsupported filter was given.
+    """
+    logger.debug(_('List Transactions Command (offset: {}, limit: {}, filters: {})').format(
+        offset, limit, filters))
+
+    transaction_ids = await cache.list_transactions(offset=offset, limit=limit, **filters)
+    return scheme.TransactionListResponse(transaction_ids)
+
+
+async def check_transactions(transaction_ids, wait=None):
+    """The handler for the Synse Server "batch transaction" API command.
+
+    The transactions are grouped by the plugin which manages them and checked
+    concurrently, with at most 'grpc.max_concurrent_reads' checks in flight to
+    any one plugin. A failure to check any one transaction (e.g. because it is
+    unknown) does not fail the command; the error is instead reported for that
+    transaction in the response.
+
+    Args:
+        transaction_ids (list[str]): The ids of the transactions to check.
+        wait (float): The maximum time, in seconds, to wait for the
+            transactions to complete before returning their states. If not
+            given, the current states are returned right away.
+
+    Returns:
+        BatchTransactionResponse: The "batch transaction" response scheme model.
+    """
+    logger.debug(_('Batch Transaction Command (args: {}, wait: {})').format(
+        transaction_ids, wait))
+
+    # The result for each transaction, in the order that they were given. This
+    # is either a TransactionResponse or the error which occurred checking it.
+    results = [None] * len(transaction_ids)
+
+    # Group the transactions by the plugin which manages them.
+    groups = {}
+    transactions = await cache.get_transactions(transaction_ids)
+    for i, (transaction_id, transaction) in enumerate(zip(transaction_ids, transactions)):
+        try:
+            _plugin = _get_plugin(transaction_id, transaction)
+        except errors.SynseError as e:
+            results[i] = e
+            continue
+        groups.setdefault(_plugin, []).append((i, transaction_id, transaction.get('context')))
+
+    # When waiting, the transactions are checked by the plugin's watcher,
+    # which bounds its own checks, so they are not bounded here.
+    max_concurrent = None if wait else config.options.get('grpc.max_concurrent_reads', None)
+
+    checks = []
+    for _plugin, group in groups.items():
+        logger.debug(_('Checking {} transactions from plugin {}').format(
+            len(group), _plugin.name))
+
+        # Bound the number of checks in flight to each plugin.
+        limit = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+
+        for i, transaction_id, context in group:
+            checks.append(_batch_check(i, _plugin, transaction_id, context, wait, limit))
+
+    for i, result in await asyncio.gather(*checks):
+        results[i] = result
+
+    return scheme.BatchTransactionResponse(transaction_ids, results)
+
+
+def _get_plugin(transaction_id, transaction):
+    """Get the plugin which manages a transaction.
+
+    Args:
+        transaction_id (str): The ID of the transaction.
+        transaction (dict): The cached information for the transaction.
+
+    Returns:
+        Plugin: The plugin which manages the transaction.
+
+    Raises:
+        errors.TransactionNotFoundError: The transaction is not known, or
+            its managing plugin can not be determined.
+        errors.PluginNotFoundError: The managing plugin is not registered.
+    """
     if not transaction:
         raise errors.TransactionNotFoundError(
             _('Transaction with id "{}" not found').format(transaction_id)
         )
 
     plugin_name = transaction.get('plugin')
-    context = transaction.get('context')
 
     if not plugin_name:
         # TODO - in the future, what we could do is attempt sending the transaction
@@ -59,10 +160,63 @@ async def check_transaction(transaction_id):
         raise errors.PluginNotFoundError(
             _('Unable to find plugin "{}"').format(plugin_name)
         )
+    return _plugin
+
+
+async def _check(_plugin, transaction_id, context, wait=None):
+    """Check the state of a transaction with the plugin which manages it.
 
-    try:
-        resp = _plugin.client.check_transaction(transaction_id)
-    except grpc.RpcError as ex:
-        raise errors.FailedTransactionCommandError(str(ex)) from ex
+    Args:
+        _plugin (Plugin): The plugin which manages the transaction.
+        transaction_id (str): The ID of the transaction.
+        context (dict): The write context of the transaction.
+        wait (float): The maximum time, in seconds, to wait for the
+            transaction to complete.
+
+    Returns:
+        TransactionResponse: The "transaction" response scheme model.
+    """
+    resp = None
+    if wait:
+        resp = await watcher.wait(_plugin, transaction_id, wait)
+
+    # Not waiting, or the wait timed out before the watcher checked the
+    # transaction, so check it now.
+    if resp is None:
+        try:
+            resp = await _plugin.client.check_transaction(transaction_id)
+        except grpc.RpcError as ex:
+            raise errors.FailedTransactionCommandError(str(ex)) from ex
+
+    await cache.update_transaction(transaction_id, resp)
 
     return scheme.TransactionResponse(transaction_id, context, resp)
+
+
+async def _batch_check(index, _plugin, transaction_id, context, wait=None, limit=None):
+    """Check a single transaction as part of a batch.
+
+    An error checking the transaction is returned as its result (see
+    `utils.bounded_call`).
+
+    Args:
+        index (int): The index of the transaction in the batch.
+        _plugin (Plugin): The plugin which manages the transaction.
+        transaction_id (str): The ID of the transaction.
+        context (dict): The write context of the transaction.
+        wait (float): The maximum time, in seconds, to wait for the
+            transaction to complete.
+        limit (asyncio.Semaphore): The semaphore bounding the number of
+            concurrent checks to the plugin, if any.
+
+    Returns:
+        tuple(int, TransactionResponse | errors.SynseError): The index of
+            the transaction and the result of checking it.
+    """
+    result = await utils.bounded_call(
+        _check, _plugin, transaction_id, context, wait,
+        limit=limit,
+        error=errors.FailedTransactionCommandError,
+        failure=_('Failed to check transaction {} in batch').format(transaction_id),
+    )
+    return index, result
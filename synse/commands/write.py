@@ -1,22 +1,33 @@
 """Command handler for the `write` route."""
 
+import asyncio
+
 import grpc
 
-from synse import cache, errors, plugin
+from synse import cache, config, errors, plugin, utils
 from synse.i18n import _
 from synse.log import logger
 from synse.proto.client import WriteData
-from synse.scheme.write import WriteResponse
+from synse.scheme.write import BatchWriteResponse, WriteResponse
 
 
-async def write(rack, board, device, data):
+async def write(rack, board, device, data, resolved=None):
     """The handler for the Synse Server "write" API command.
 
+    Many actions can be written to the device at once. They are all sent to
+    the device's plugin in a single write request, and the transactions for
+    all of them are returned together.
+
     Args:
         rack (str): The rack which the device resides on.
         board (str): The board which the device resides on.
         device (str): The device to write to.
-        data (dict): The data to write to the device.
+        data (dict | list[dict]): The data to write to the device. Either a
+            single action (a dict with an 'action' field and an optional
+            'raw' field), or a list of actions.
+        resolved (cache.ResolvedDevice): The device, if it has already been
+            resolved earlier in the request (e.g. by device type validation).
+            If not given, the device is resolved here.
 
     Returns:
         WriteResponse: The "write" response scheme model.
@@ -26,40 +37,34 @@ async def write(rack, board, device, data):
         .format(rack, board, device, data)
     )
 
-    # Lookup the known info for the specified device
-    plugin_name, __ = await cache.get_device_meta(rack, board, device)  # pylint: disable=unused-variable
+    # Lookup the known info for the specified device and the plugin context
+    # for the device's specified protocol
+    if resolved is None:
+        resolved = await cache.resolve_device(rack, board, device)
 
-    # Get the plugin context for the device's specified protocol
-    _plugin = plugin.get_plugin(plugin_name)
+    _plugin = resolved.plugin
     if not _plugin:
         raise errors.PluginNotFoundError(
-            _('Unable to find plugin named "{}"').format(plugin_name)
+            _('Unable to find plugin named "{}"').format(resolved.plugin_name)
         )
 
-    # The data comes in as the POSTed dictionary which includes an 'action'
-    # and/or 'raw' field. Here, we convert it to the appropriate modeling for
-    # transport to the plugin.
-    action = data.get('action')
-    if not isinstance(action, str):
+    if isinstance(data, dict):
+        data = [data]
+
+    if not data:
         raise errors.InvalidArgumentsError(
-            _('"action" value must be a string, but was {}').format(type(action))
+            _('No actions given to write')
         )
 
-    raw = data.get('raw')
-    if raw is not None:
-        # Raw should be a string - we need to convert to bytes.
-        if not isinstance(raw, str):
-            raise errors.InvalidArgumentsError(
-                _('"raw" value must be a string, but was {}').format(type(raw))
-            )
-        raw = [str.encode(raw)]
-
-    wd = WriteData(action=action, raw=raw)
-    logger.info(_('Writing to {}: {}').format('/'.join((rack, board, device)), wd))
+    # Convert all of the actions before writing any of them, so that an
+    # invalid action does not leave the device partially written to.
+    wd = [make_write_data(d) for d in data]
+    logger.info(_('Writing to {}: {}').format(
+        '/'.join((rack, board, device)), ', '.join(str(w) for w in wd)))
 
     # Perform a gRPC write on the device's managing plugin
     try:
-        t = _plugin.client.write(rack, board, device, [wd])
+        t = await _plugin.client.write(rack, board, device, wd)
     except grpc.RpcError as ex:
         raise errors.FailedWriteCommandError(str(ex)) from ex
 
@@ -70,10 +75,223 @@ async def write(rack, board, device, data):
             'action': ctx.action,
             'raw': ctx.raw
         }
-        ok = await cache.add_transaction(_id, context, _plugin.name)
+        ok = await cache.add_transaction(_id, context, _plugin.name, (rack, board, device))
         if not ok:
             logger.error(_('Failed to add transaction {} to the cache').format(_id))
 
     return WriteResponse(
         transactions=t.transactions
     )
+
+
+async def batch_write(writes=None, selectors=None, data=None):
+    """The handler for the Synse Server "batch write" API command.
+
+    The writes can either be given explicitly, each with the device to write
+    to, or be the same data written to all devices matching the selectors.
+    All writes to the same device are sent to it in a single write request,
+    in the order given. The writes are grouped by the plugin which manages
+    the device and sent concurrently, with at most 'grpc.max_concurrent_writes'
+    write requests in flight to any one plugin. A failure to write to any one
+    device does not fail the command; the error is instead reported for that
+    device in the response.
+
+    The transactions from all of the writes are added to the transaction
+    cache together once all writes have completed.
+
+    Args:
+        writes (list[dict]): The writes to make. Each is a dict with a 'rack',
+            'board', and 'device' field identifying the device to write to,
+            and the 'action' and 'raw' fields to write.
+        selectors (dict): The device fields to select the devices to write to
+            by, mapped to the value to match. See `cache.DEVICE_SELECTORS` for
+            the supported fields. Only used if no writes are given, in which
+            case at least one selector must have a value, so that the data
+            is never written to every device.
+        data (dict | list[dict]): The data to write to each selected device.
+            Only used if no writes are given.
+
+    Returns:
+        BatchWriteResponse: The "batch write" response scheme model.
+
+    Raises:
+        errors.InvalidArgumentsError: An unsupported selector was given, or
+            no selector with a value was given.
+    """
+    logger.debug(_('Batch Write Command (writes: {}, selectors: {}, data: {})').format(
+        writes, selectors, data))
+
+    if writes is None and not any((selectors or {}).values()):
+        raise errors.InvalidArgumentsError(
+            _('No selectors given to select the devices to write to')
+        )
+
+    # Resolve all devices against the same snapshot, rather than looking
+    # up each device's meta-information individually.
+    snapshot = await cache.get_snapshot()
+
+    # The data to write to each device, in the order the devices were
+    # first given.
+    actions = {}
+    if writes is None:
+        if isinstance(data, dict):
+            data = [data]
+        for d in snapshot.select(**(selectors or {})):
+            actions[(d.location.rack, d.location.board, d.uid)] = list(data or [])
+    else:
+        for w in writes:
+            device = (w['rack'], w['board'], w['device'])
+            actions.setdefault(device, []).append(
+                {k: v for k, v in w.items() if k in ('action', 'raw')}
+            )
+
+    devices = list(actions)
+
+    # The result for each device. This is either the transactions from
+    # writing to the device or the error which occurred writing to it.
+    results = [None] * len(devices)
+
+    # Group the devices by the plugin which manages them.
+    groups = {}
+    for i, device in enumerate(devices):
+        resolved = snapshot.devices.get(device)
+        if resolved is None:
+            results[i] = errors.DeviceNotFoundError(
+                _('{} does not correspond with a known device').format('/'.join(device))
+            )
+            continue
+        groups.setdefault(resolved.plugin_name, []).append(i)
+
+    max_concurrent = config.options.get('grpc.max_concurrent_writes', None)
+
+    requests = []
+    for plugin_name, group in groups.items():
+        _plugin = plugin.get_plugin(plugin_name)
+        logger.debug(_('Writing to {} devices of plugin {}').format(len(group), plugin_name))
+
+        # Bound the number of writes in flight to each plugin, so a large
+        # batch does not flood any one plugin with requests.
+        limit = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+
+        for i in group:
+            if not _plugin:
+                results[i] = errors.PluginNotFoundError(
+                    _('Unable to find plugin named "{}"').format(plugin_name)
+                )
+                continue
+            requests.append(
+                _batch_write_device(i, _plugin, devices[i], actions[devices[i]], limit)
+            )
+
+    for i, result in await asyncio.gather(*requests):
+        results[i] = result
+
+    # Track all of the new transactions at once.
+    await cache.add_transactions([
+        (_id, {'action': ctx.action, 'raw': ctx.raw}, snapshot.devices[device].plugin_name,
+         device)
+        for device, result in zip(devices, results)
+        if not isinstance(result, errors.SynseError)
+        for _id, ctx in result.items()
+    ])
+
+    return BatchWriteResponse(devices, results)
+
+
+async def _batch_write_device(index, _plugin, device, data, limit=None):
+    """Write to a single device as part of a batch write.
+
+    An error writing to the device is returned as its result (see
+    `utils.bounded_call`).
+
+    Args:
+        index (int): The index of the device in the batch.
+        _plugin (Plugin): The plugin which manages the device.
+        device (tuple(str, str, str)): The rack, board, and device IDs of
+            the device to write to.
+        data (list[dict]): The actions to write to the device.
+        limit (asyncio.Semaphore): The semaphore bounding the number of
+            concurrent writes to the plugin, if any.
+
+    Returns:
+        tuple(int, Transactions | errors.SynseError): The index of the device
+            and the result of writing to it.
+    """
+    result = await utils.bounded_call(
+        _write_device, _plugin, device, data,
+        limit=limit,
+        error=errors.FailedWriteCommandError,
+        failure=_('Failed to write to device {} in batch write').format('/'.join(device)),
+    )
+    return index, result
+
+
+async def _write_device(_plugin, device, data):
+    """Write actions to a device.
+
+    Args:
+        _plugin (Plugin): The plugin which manages the device.
+        device (tuple(str, str, str)): The rack, board, and device IDs of
+            the device to write to.
+        data (list[dict]): The actions to write to the device.
+
+    Returns:
+        Transactions: The transactions for the write, keyed by transaction ID.
+
+    Raises:
+        errors.InvalidArgumentsError: No actions were given, or an action
+            is not valid.
+        errors.FailedWriteCommandError: The write to the plugin failed.
+    """
+    if not data:
+        raise errors.InvalidArgumentsError(_('No actions given to write'))
+
+    wd = [make_write_data(d) for d in data]
+    logger.info(_('Writing to {}: {}').format(
+        '/'.join(device), ', '.join(str(w) for w in wd)))
+
+    try:
+        t = await _plugin.client.write(*device, wd)
+    except grpc.RpcError as ex:
+        raise errors.FailedWriteCommandError(str(ex)) from ex
+    return t.transactions
+
+
+def make_write_data(data):
+    """Convert a single action to write to the modeling for transport to
+    the plugin.
+
+    Args:
+        data (dict): The action to write, which includes an 'action' and
+            optionally a 'raw' field.
+
+    Returns:
+        WriteData: The data to write.
+
+    Raises:
+        errors.InvalidArgumentsError: The action is not valid.
+    """
+    if not isinstance(data, dict):
+        raise errors.InvalidArgumentsError(
+            _('Write data must be an object, but was {}').format(type(data))
+        )
+
+    # The data comes in as the POSTed dictionary which includes an 'action'
+    # and/or 'raw' field. Here, we convert it to the appropriate modeling for
+    # transport to the plugin.
+    action = data.get('action')
+    if not isinstance(action, str):
+        raise errors.InvalidArgumentsError(
+            _('"action" value must be a string, but was {}').format(type(action))
+        )
+
+    raw = data.get('raw')
+    if raw is not None:
+        # Raw should be a string - we need to convert to bytes.
+        if not isinstance(raw, str):
+            raise errors.InvalidArgumentsError(
+                _('"raw" value must be a string, but was {}').format(type(raw))
+            )
+        raw = [str.encode(raw)]
+
+    return WriteData(action=action, raw=raw)
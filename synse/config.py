@@ -5,7 +5,7 @@ from bison import Bison, DictOption, Option, Scheme
 # The Synse Server configuration scheme
 scheme = Scheme(
     Option('logging', default='info', choices=['debug', 'info', 'warning', 'error', 'critical']),
-    Option('pretty_json', default=True, field_type=bool),
+    Option('pretty_json', default=False, field_type=bool),
     Option('locale', default='en_US', field_type=str),
     DictOption('plugin', default={}, scheme=Scheme(
         DictOption('tcp', default={}, scheme=None, bind_env=True),
@@ -13,14 +13,37 @@ scheme = Scheme(
     )),
     DictOption('cache', default=None, scheme=Scheme(
         DictOption('meta', scheme=Scheme(
-            Option('ttl', default=20, field_type=int)
+            Option('ttl', default=20, field_type=int),
+            Option('serve_stale', default=False, field_type=bool),
+            Option('max_stale', default=60, field_type=int),
+            Option('refresh_interval', default=0, field_type=int)
         )),
         DictOption('transaction', scheme=Scheme(
             Option('ttl', default=300, field_type=int)  # five minutes
+        )),
+        DictOption('read', scheme=Scheme(
+            Option('ttl', default=0, field_type=int),
+            DictOption('types', default={}, scheme=None)
         ))
     )),
     DictOption('grpc', scheme=Scheme(
-        Option('timeout', default=3, field_type=int)
+        Option('timeout', default=3, field_type=int),
+        Option('max_workers', default=100, field_type=int),
+        Option('max_concurrent_reads', default=25, field_type=int),
+        Option('max_concurrent_writes', default=25, field_type=int)
+    )),
+    DictOption('stream', scheme=Scheme(
+        Option('interval', default=1, field_type=int),
+        Option('buffer_size', default=100, field_type=int)
+    )),
+    DictOption('transaction', scheme=Scheme(
+        Option('watch_interval', default=1, field_type=int),
+        Option('max_wait', default=30, field_type=int)
+    )),
+    DictOption('compression', scheme=Scheme(
+        Option('enabled', default=True, field_type=bool),
+        Option('min_size', default=1024, field_type=int),
+        Option('level', default=6, field_type=int)
     )),
 )
 
@@ -8,9 +8,10 @@ from sanic.exceptions import InvalidUsage, NotFound, ServerError
 from sanic.response import text
 
 from synse import config, errors, utils
-from synse.cache import configure_cache
+from synse.cache import configure_cache, metainfo_refresher
 from synse.log import LOGGING, logger, setup_logger
-from synse.response import json
+from synse.response import (compress_response, configure_compression,
+                            configure_json, format_json, json)
 from synse.routes import aliases, base, core
 
 
@@ -58,8 +59,12 @@ def make_app():
 
     _disable_favicon(app)
     _register_error_handling(app)
+    _register_background_tasks(app)
+    _register_response_middleware(app)
 
     configure_cache()
+    configure_json()
+    configure_compression()
 
     logger.info('Synse Configuration: {}'.format(config.options.config))
     return app
@@ -77,6 +82,35 @@ def _disable_favicon(app):
         return text('')
 
 
+def _register_background_tasks(app):
+    """Register the tasks which Synse Server runs in the background.
+
+    Args:
+        app (sanic.Sanic): The Sanic application to add the tasks to.
+    """
+    if config.options.get('cache.meta.refresh_interval'):
+        logger.info('Registering background metainfo refresher')
+        app.add_task(metainfo_refresher)
+
+
+def _register_response_middleware(app):
+    """Register the middleware which finishes each response.
+
+    JSON responses are re-encoded for clients which ask for a different JSON
+    format than the default, and then responses are compressed for clients
+    which accept a compressed response.
+
+    Args:
+        app (sanic.Sanic): The Sanic application to add the middleware to.
+    """
+
+    @app.middleware('response')
+    async def finish_response(request, response):
+        """Format and compress the response for the client."""
+        format_json(request, response)
+        compress_response(request, response)
+
+
 def _register_error_handling(app):
     """Register the 400, 404 and 500 error JSON responses for Synse Server.
 
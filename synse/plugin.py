@@ -2,6 +2,7 @@
 
 import os
 import stat
+import time
 
 from synse import config, const, errors
 from synse.i18n import _
@@ -15,10 +16,24 @@ class PluginManager(object):
     Only a single instance of the PluginManager should be used. It is
     accessible from the `manager` class member of any instance of the
     `Plugin` class.
+
+    Attributes:
+        plugins (dict): The registered plugins, keyed by plugin name.
+        version (int): The version of the registered plugins. This is
+            incremented whenever a plugin is added or removed.
+        modified (float): The time (in seconds since the epoch) that a
+            plugin was last added or removed.
     """
 
     def __init__(self):
         self.plugins = {}
+        self.version = 0
+        self.modified = time.time()
+
+    def _changed(self):
+        """Mark the registered plugins as changed."""
+        self.version += 1
+        self.modified = time.time()
 
     def get(self, name):
         """Get a Plugin instance by name.
@@ -60,6 +75,7 @@ class PluginManager(object):
             )
 
         self.plugins[name] = plugin
+        self._changed()
 
     def remove(self, name):
         """Remove the plugin from the manager.
@@ -77,6 +93,7 @@ class PluginManager(object):
             )
         else:
             del self.plugins[name]
+            self._changed()
 
     def purge(self, names):
         """Remove all of the specified Plugins from the manager.
@@ -87,6 +104,7 @@ class PluginManager(object):
         for name in names:
             if name in self.plugins:
                 del self.plugins[name]
+                self._changed()
         logger.debug(_('PluginManager purged plugins: {}').format(names))
 
 
@@ -1,6 +1,8 @@
 """Synse Server Python client for communicating to plugins via the gRPC API."""
 
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import grpc
 from synse_plugin import api as synse_api
@@ -11,6 +13,29 @@ from synse.const import SOCKET_DIR
 from synse.i18n import _
 from synse.log import logger
 
+# The executor which all blocking gRPC calls are run in. This is created
+# lazily so that its size can be taken from the Synse Server configuration.
+_executor = None
+
+
+def get_executor():
+    """Get the executor used to issue gRPC requests to the plugins.
+
+    The gRPC stubs are synchronous, so calling them directly from within
+    a coroutine would block the event loop (and every other in-flight
+    request) until the plugin responds. Instead, all stub calls are run
+    in this dedicated thread pool and awaited by the caller.
+
+    Returns:
+        ThreadPoolExecutor: The executor for gRPC requests.
+    """
+    global _executor  # pylint: disable=global-statement
+    if _executor is None:
+        workers = config.options.get('grpc.max_workers', None)
+        logger.debug(_('Creating gRPC executor (max workers: {})').format(workers))
+        _executor = ThreadPoolExecutor(max_workers=workers)
+    return _executor
+
 
 class WriteData(object):
     """The WriteData object is a convenient way to group together
@@ -133,7 +158,34 @@ class SynseInternalClient(object):
         )
         return cli
 
-    def read(self, rack, board, device):
+    async def _call(self, method, request, stream=False):
+        """Issue a gRPC request to the plugin without blocking the event loop.
+
+        The request is run in the gRPC executor (see `get_executor`). For
+        response-streaming methods, the stream is consumed within the executor
+        as well, since iterating over it blocks on the plugin.
+
+        Args:
+            method: The stub method to call.
+            request: The gRPC request message to pass to the stub method.
+            stream (bool): Whether the stub method returns a stream of
+                responses which should be collected into a list.
+
+        Returns:
+            The response(s) of the gRPC call.
+        """
+        timeout = config.options.get('grpc.timeout', None)
+
+        def call():  # pylint: disable=missing-docstring
+            resp = method(request, timeout=timeout)
+            if stream:
+                return [r for r in resp]
+            return resp
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(get_executor(), call)
+
+    async def read(self, rack, board, device):
         """Get a reading from the specified device.
 
         Args:
@@ -153,12 +205,9 @@ class SynseInternalClient(object):
             rack=rack
         )
 
-        timeout = config.options.get('grpc.timeout', None)
-        resp = [r for r in self.stub.Read(req, timeout=timeout)]
+        return await self._call(self.stub.Read, req, stream=True)
 
-        return resp
-
-    def metainfo(self, rack=None, board=None):
+    async def metainfo(self, rack=None, board=None):
         """Get all meta-information from a plugin.
 
         Args:
@@ -181,12 +230,9 @@ class SynseInternalClient(object):
             board=board
         )
 
-        timeout = config.options.get('grpc.timeout', None)
-        resp = [r for r in self.stub.Metainfo(req, timeout=timeout)]
-
-        return resp
+        return await self._call(self.stub.Metainfo, req, stream=True)
 
-    def write(self, rack, board, device, data):
+    async def write(self, rack, board, device, data):
         """Write data to the specified device.
 
         Args:
@@ -208,11 +254,9 @@ class SynseInternalClient(object):
             data=[d.to_grpc() for d in data]
         )
 
-        timeout = config.options.get('grpc.timeout', None)
-        resp = self.stub.Write(req, timeout=timeout)
-        return resp
+        return await self._call(self.stub.Write, req)
 
-    def check_transaction(self, transaction_id):
+    async def check_transaction(self, transaction_id):
         """Check the state of a write transaction.
 
         Args:
@@ -228,9 +272,7 @@ class SynseInternalClient(object):
             id=transaction_id
         )
 
-        timeout = config.options.get('grpc.timeout', None)
-        resp = self.stub.TransactionCheck(req, timeout=timeout)
-        return resp
+        return await self._call(self.stub.TransactionCheck, req)
 
 
 def get_client(name):
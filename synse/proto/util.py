@@ -55,6 +55,32 @@ def metainfo_to_dict(meta):
     }
 
 
+def metainfo_equal(meta, other):
+    """Check whether two MetainfoResponses describe the same device.
+
+    The timestamp of the responses is not compared, as it reflects when
+    the response was generated rather than anything about the device.
+
+    Args:
+        meta (MetainfoResponse): The first MetainfoResponse to compare.
+        other (MetainfoResponse): The second MetainfoResponse to compare.
+
+    Returns:
+        bool: True if the responses describe the same device; False otherwise.
+    """
+    return (
+        meta.uid == other.uid and
+        meta.type == other.type and
+        meta.model == other.model and
+        meta.manufacturer == other.manufacturer and
+        meta.protocol == other.protocol and
+        meta.info == other.info and
+        meta.comment == other.comment and
+        meta.location == other.location and
+        meta.output == other.output
+    )
+
+
 def metaoutput_to_dict(meta):
     """Convert a MetaOutput to a dictionary that can be serialized out to JSON.
 
@@ -1,10 +1,22 @@
 """Utilities and helpers for application endpoint responses."""
 
+import gzip
+import time
+import zlib
+from email.utils import formatdate, mktime_tz, parsedate_tz
+from urllib.parse import parse_qsl
+
 import ujson
+from sanic.response import HTTPResponse
 from sanic.response import json as sjson
 
 from synse import config
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 
 def _dumps(*arg, **kwargs):
     """Custom JSON dumps implementation to be used when pretty printing.
@@ -32,6 +44,41 @@ def _dumps(*arg, **kwargs):
     return out
 
 
+def _compact(data):
+    """Encode data as compact JSON.
+
+    Args:
+        data: The data to encode.
+
+    Returns:
+        str: The data encoded as JSON.
+    """
+    return ujson.dumps(data)
+
+
+def _pretty(data):
+    """Encode data as pretty-printed JSON.
+
+    Args:
+        data: The data to encode.
+
+    Returns:
+        str: The data encoded as JSON, indented and ending with a newline.
+    """
+    return _dumps(data, indent=2)
+
+
+def configure_json():
+    """Resolve the JSON encoder to use for responses from the configuration.
+
+    This should be called once on startup, after the configuration is
+    loaded, so that the 'pretty_json' option does not need to be looked up
+    for every response.
+    """
+    global _encoder  # pylint: disable=global-statement
+    _encoder = _pretty if config.options.get('pretty_json') else _compact
+
+
 def json(body, **kwargs):
     """Create a JSON-encoded `HTTPResponse` for an endpoint.
 
@@ -44,6 +91,424 @@ def json(body, **kwargs):
         sanic.HTTPResponse: The Sanic endpoint response with the given body
             encoded as JSON.
     """
-    if config.options.get('pretty_json'):
-        return sjson(body, indent=2, dumps=_dumps, **kwargs)
-    return sjson(body, **kwargs)
+    return sjson(body, dumps=_encoder, **kwargs)
+
+
+def wants_pretty(request):
+    """Get the JSON format that the client making a request asked for.
+
+    A client can ask for pretty-printed JSON with the 'pretty' query
+    parameter (e.g. '?pretty' or '?pretty=true'), or with a 'pretty'
+    parameter on the JSON media type of its Accept header (e.g.
+    'Accept: application/json; pretty'). In either case, a value of
+    'false' or '0' asks for compact JSON instead.
+
+    Args:
+        request (sanic.request.Request): The incoming request.
+
+    Returns:
+        bool: True if the client asked for pretty-printed JSON; False if
+            it asked for compact JSON; None if it did not ask for either.
+    """
+    if request.query_string:
+        for key, value in parse_qsl(request.query_string, keep_blank_values=True):
+            if key == 'pretty':
+                return value.lower() not in ('false', '0')
+
+    accept = request.headers.get('Accept')
+    if accept:
+        for media_range in accept.split(','):
+            media_type, *params = media_range.split(';')
+            if media_type.strip() not in ('application/json', 'application/*', '*/*'):
+                continue
+            for param in params:
+                key, _, value = param.partition('=')
+                if key.strip() == 'pretty':
+                    return value.strip().strip('"').lower() not in ('false', '0')
+    return None
+
+
+def format_json(request, response):
+    """Re-encode a JSON response in the format that the client asked for.
+
+    Responses are encoded with the encoder resolved on startup, which is
+    compact unless 'pretty_json' is set. The few clients which ask for a
+    different format (see `wants_pretty`) are typically people reading
+    the output, so their responses are re-encoded, rather than the format
+    being threaded through every endpoint.
+
+    Since the format can be asked for with the Accept header, JSON responses
+    vary with it whether or not they are re-encoded.
+
+    Args:
+        request (sanic.request.Request): The incoming request.
+        response (sanic.HTTPResponse): The response to the request. This
+            is modified in place.
+    """
+    if not isinstance(response, HTTPResponse) or not response.body:
+        return
+    if response.content_type != 'application/json':
+        return
+
+    add_vary(response, 'Accept')
+    if 'Content-Encoding' in response.headers or wants_default_format(request):
+        return
+
+    encoder = _compact if _encoder is _pretty else _pretty
+    response.body = encoder(ujson.loads(response.body)).encode('utf-8')
+
+
+def wants_default_format(request):
+    """Check whether the client making a request wants JSON in the format
+    of the encoder resolved on startup.
+
+    Args:
+        request (sanic.request.Request): The incoming request.
+
+    Returns:
+        bool: True if the client did not ask for a different format;
+            False otherwise.
+    """
+    pretty = wants_pretty(request)
+    return pretty is None or pretty == (_encoder is _pretty)
+
+
+def add_vary(response, field):
+    """Add a request header field to the Vary header of a response, keeping
+    any fields which are already there.
+
+    Args:
+        response (sanic.HTTPResponse): The response to add the field to.
+            This is modified in place.
+        field (str): The name of the request header field.
+    """
+    vary = response.headers.get('Vary')
+    if not vary:
+        response.headers['Vary'] = field
+        return
+
+    fields = [f.strip().lower() for f in vary.split(',')]
+    if field.lower() not in fields and '*' not in fields:
+        response.headers['Vary'] = '{}, {}'.format(vary, field)
+
+
+def configure_compression():
+    """Resolve the response compression settings from the configuration.
+
+    This should be called once on startup, after the configuration is
+    loaded.
+    """
+    global _compress_min_size, _compress_level  # pylint: disable=global-statement
+    min_size = config.options.get('compression.min_size', None)
+    if config.options.get('compression.enabled', None) is False:
+        _compress_min_size = None
+    else:
+        _compress_min_size = 1024 if min_size is None else min_size
+    _compress_level = config.options.get('compression.level', None) or 6
+
+
+def accepted_encoding(request):
+    """Get the content-coding to compress the response to a request with.
+
+    The coding is negotiated from the Accept-Encoding header of the request.
+    Of the supported codings (see `CODINGS`) which the client accepts, the
+    one with the highest quality value is used. Ties go to the coding which
+    is first in `CODINGS`.
+
+    Args:
+        request (sanic.request.Request): The incoming request.
+
+    Returns:
+        str: The content-coding to use, or None if the response should not
+            be compressed.
+    """
+    if _compress_min_size is None:
+        return None
+
+    header = request.headers.get('Accept-Encoding')
+    if not header:
+        return None
+
+    qvalues = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0
+        qvalues[coding.strip().lower()] = q
+
+    best, best_q = None, 0
+    for coding in CODINGS:
+        q = qvalues.get(coding, qvalues.get('*', 0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body, coding):
+    """Compress a response body.
+
+    Args:
+        body (bytes): The body to compress.
+        coding (str): The content-coding to compress the body with. This
+            must be one of the supported `CODINGS`.
+
+    Returns:
+        bytes: The compressed body.
+    """
+    if coding == 'br':
+        return brotli.compress(body, quality=min(_compress_level, 11))
+    if coding == 'gzip':
+        return gzip.compress(body, compresslevel=_compress_level)
+    return zlib.compress(body, _compress_level)
+
+
+def is_compressible(response):
+    """Check whether a response should be compressed.
+
+    Only JSON and text responses which are at least the configured minimum
+    size ('compression.min_size') are compressed, since compressing small
+    bodies saves little and costs CPU.
+
+    Args:
+        response (sanic.HTTPResponse): The response to check.
+
+    Returns:
+        bool: True if the response should be compressed; False otherwise.
+    """
+    if _compress_min_size is None or not isinstance(response, HTTPResponse):
+        return False
+    if response.status < 200 or response.status in (204, 304):
+        return False
+    if response.body is None or len(response.body) < _compress_min_size:
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+
+    content_type = response.content_type or ''
+    return (
+        content_type.startswith('application/json') or
+        (content_type.startswith('text/') and not content_type.startswith('text/event-stream'))
+    )
+
+
+def compress_response(request, response):
+    """Compress a response with the content-coding that the client accepts.
+
+    Args:
+        request (sanic.request.Request): The incoming request.
+        response (sanic.HTTPResponse): The response to the request. This
+            is modified in place.
+    """
+    if not is_compressible(response):
+        return
+
+    add_vary(response, 'Accept-Encoding')
+    coding = accepted_encoding(request)
+    if coding is not None:
+        response.body = compress(response.body, coding)
+        response.headers['Content-Encoding'] = coding
+
+
+class EncodedJson(object):
+    """A JSON response body which is encoded once, so that it can be served
+    many times without being re-encoded.
+
+    The body is encoded the same way as by `json`. The body is also
+    compressed at most once for each content-coding (see `compressed`).
+
+    Args:
+        data (dict): The data to encode.
+
+    Attributes:
+        body (bytes): The JSON-encoded body.
+    """
+
+    __slots__ = ('body', '_compressed')
+
+    def __init__(self, data):
+        self.body = _encoder(data).encode('utf-8')
+        self._compressed = {}
+
+    def compressed(self, coding):
+        """Get the body compressed with the given content-coding.
+
+        Args:
+            coding (str): The content-coding to compress the body with.
+
+        Returns:
+            bytes: The compressed body.
+        """
+        body = self._compressed.get(coding)
+        if body is None:
+            body = self._compressed[coding] = compress(self.body, coding)
+        return body
+
+    def __str__(self):
+        return '<EncodedJson: {} bytes>'.format(len(self.body))
+
+
+class Validator(object):
+    """The validator of the data behind a response, which is used to make
+    conditional responses (RFC 7232).
+
+    The validator identifies a version of the data, so that a client which
+    already has that version can be sent a '304 Not Modified' response
+    rather than the data itself. This only compares the version against
+    the request headers, so it is cheap to check before any of the data is
+    looked up or encoded.
+
+    The entity tag is weak, since the same version of the data may be
+    encoded in different ways. It includes an identifier of this run of
+    Synse Server, since versions are only increasing within a run.
+
+    Args:
+        version: The version of the data. The version must change whenever
+            the data changes.
+        modified (float): The time (in seconds since the epoch) that the
+            data was last modified.
+
+    Attributes:
+        etag (str): The entity tag, for the HTTP ETag header.
+        last_modified (float): The time that the data was last modified.
+        headers (dict): The validator headers to add to a response.
+    """
+
+    __slots__ = ('etag', 'last_modified', 'headers')
+
+    def __init__(self, version, modified):
+        self.etag = 'W/"{}-{}"'.format(RUN_ID, version)
+        self.last_modified = modified
+        self.headers = {
+            'ETag': self.etag,
+            'Last-Modified': formatdate(modified, usegmt=True),
+        }
+
+    def __str__(self):
+        return '<Validator: {}>'.format(self.etag)
+
+    def matches(self, request):
+        """Check whether the client making a request already has the
+        version of the data identified by the validator.
+
+        If the request has an If-None-Match header, only that is used.
+        Otherwise, the If-Modified-Since header is used, if it is set.
+
+        Args:
+            request (sanic.request.Request): The incoming request.
+
+        Returns:
+            bool: True if the client has the data; False otherwise.
+        """
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag_matches(if_none_match, self.etag)
+
+        if_modified_since = request.headers.get('If-Modified-Since')
+        if if_modified_since is not None:
+            since = parsedate_tz(if_modified_since)
+            if since is not None:
+                # HTTP dates only have a resolution of seconds.
+                return int(self.last_modified) <= mktime_tz(since)
+        return False
+
+
+def etag_matches(if_none_match, etag):
+    """Check whether an If-None-Match request header matches an entity tag.
+
+    Entity tags are compared using the weak comparison, as is done for
+    If-None-Match (RFC 7232, section 3.2).
+
+    Args:
+        if_none_match (str): The value of the If-None-Match header of the
+            request. None if the request does not have the header.
+        etag (str): The entity tag of the current response body.
+
+    Returns:
+        bool: True if the header matches the entity tag; False otherwise.
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    etag = etag[2:] if etag.startswith('W/') else etag
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def not_modified(validator):
+    """Create a '304 Not Modified' `HTTPResponse` for an endpoint.
+
+    Args:
+        validator (Validator): The validator of the data that the client
+            already has.
+
+    Returns:
+        sanic.HTTPResponse: The Sanic endpoint response, without a body.
+    """
+    return HTTPResponse(status=304, headers=dict(validator.headers))
+
+
+def encoded_json(encoded, request=None, **kwargs):
+    """Create an `HTTPResponse` for an endpoint from an encoded JSON body.
+
+    If the client accepts a compressed response, the body is compressed
+    here, so that the compressed body is held with the encoded body and
+    reused for later responses. The response is left uncompressed if the
+    client asked for a different JSON format, since the body will be
+    re-encoded (see `format_json`).
+
+    Args:
+        encoded (EncodedJson): The encoded JSON body.
+        request (sanic.request.Request): The incoming request.
+        **kwargs: Keyword arguments to pass to the response constructor.
+
+    Returns:
+        sanic.HTTPResponse: The Sanic endpoint response.
+    """
+    response = HTTPResponse(
+        body_bytes=encoded.body,
+        content_type='application/json',
+        **kwargs
+    )
+
+    if request is not None and is_compressible(response) and wants_default_format(request):
+        add_vary(response, 'Accept-Encoding')
+        coding = accepted_encoding(request)
+        if coding is not None:
+            response.body = encoded.compressed(coding)
+            response.headers['Content-Encoding'] = coding
+    return response
+
+
+# The encoder used for JSON responses, resolved from the configuration on
+# startup (see `configure_json`).
+_encoder = _compact
+
+# The content-codings supported for response compression, in order of
+# preference. Brotli is only supported if the brotli package is installed.
+CODINGS = ('br', 'gzip', 'deflate') if brotli is not None else ('gzip', 'deflate')
+
+# The minimum size, in bytes, of a response body to compress (None if
+# compression is disabled) and the compression level, resolved from the
+# configuration on startup (see `configure_compression`).
+_compress_min_size = 1024
+_compress_level = 6
+
+# The time that this run of Synse Server started.
+STARTED = time.time()
+
+# The identifier of this run of Synse Server, used in entity tags.
+RUN_ID = '{:x}'.format(int(STARTED * 1000))
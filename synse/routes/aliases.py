@@ -33,7 +33,7 @@ async def led_route(request, rack, board, device):
     Returns:
         sanic.response.HTTPResponse: The endpoint response.
     """
-    await validate.validate_device_type(const.TYPE_LED, rack, board, device)
+    resolved = await validate.validate_device_type(const.TYPE_LED, rack, board, device)
 
     # Get the valid query parameters. If unsupported query parameters
     # are specified, this will raise an error.
@@ -77,20 +77,13 @@ async def led_route(request, rack, board, device):
             })
 
         logger.debug(_('LED data to write: {}').format(data))
-        transactions = None
-        for d in data:
-            t = await commands.write(rack, board, device, d)
-            if not transactions:
-                transactions = t
-            else:
-                transactions.data.extend(t.data)
-
+        transactions = await commands.write(rack, board, device, data, resolved=resolved)
         return transactions.to_json()
 
     # Otherwise, we just read from the device.
     else:
         logger.debug(_('LED alias route: reading'))
-        reading = await commands.read(rack, board, device)
+        reading = await commands.read(rack, board, device, resolved=resolved)
         return reading.to_json()
 
 
@@ -115,7 +108,7 @@ async def fan_route(request, rack, board, device):
     Returns:
         sanic.response.HTTPResponse: The endpoint response.
     """
-    await validate.validate_device_type(const.TYPE_FAN, rack, board, device)
+    resolved = await validate.validate_device_type(const.TYPE_FAN, rack, board, device)
 
     # Get the valid query parameters. If unsupported query parameters
     # are specified, this will raise an error.
@@ -151,7 +144,7 @@ async def fan_route(request, rack, board, device):
                 'action': 'speed',
                 'raw': param_speed_rpm,
             }
-            transaction = await commands.write(rack, board, device, data)
+            transaction = await commands.write(rack, board, device, data, resolved=resolved)
             return transaction.to_json()
 
         # Set the fan speed by percent (duty cycle). No validation on the fan
@@ -164,13 +157,13 @@ async def fan_route(request, rack, board, device):
                 'action': 'speed_percent',
                 'raw': param_speed_percent,
             }
-            transaction = await commands.write(rack, board, device, data)
+            transaction = await commands.write(rack, board, device, data, resolved=resolved)
             return transaction.to_json()
 
     # Otherwise, we just read from the device.
     else:
         logger.debug(_('Fan alias route: reading'))
-        reading = await commands.read(rack, board, device)
+        reading = await commands.read(rack, board, device, resolved=resolved)
         return reading.to_json()
 
 
@@ -194,7 +187,7 @@ async def power_route(request, rack, board, device):
     Returns:
         sanic.response.HTTPResponse: The endpoint response.
     """
-    await validate.validate_device_type(const.TYPE_POWER, rack, board, device)
+    resolved = await validate.validate_device_type(const.TYPE_POWER, rack, board, device)
 
     # Get the valid query parameters. If unsupported query parameters
     # are specified, this will raise an error.
@@ -219,13 +212,13 @@ async def power_route(request, rack, board, device):
             'action': 'state',
             'raw': param_state
         }
-        transaction = await commands.write(rack, board, device, data)
+        transaction = await commands.write(rack, board, device, data, resolved=resolved)
         return transaction.to_json()
 
     # Otherwise, we just read from the device.
     else:
         logger.debug(_('Power alias route: reading'))
-        reading = await commands.read(rack, board, device)
+        reading = await commands.read(rack, board, device, resolved=resolved)
         return reading.to_json()
 
 
@@ -249,7 +242,7 @@ async def boot_target_route(request, rack, board, device):
     Returns:
         sanic.response.HTTPResponse: The endpoint response.
     """
-    await validate.validate_device_type(const.TYPE_SYSTEM, rack, board, device)
+    resolved = await validate.validate_device_type(const.TYPE_SYSTEM, rack, board, device)
 
     # Get the valid query parameters. If unsupported query parameters
     # are specified, this will raise an error.
@@ -274,13 +267,13 @@ async def boot_target_route(request, rack, board, device):
             'action': 'target',
             'raw': param_target
         }
-        transaction = await commands.write(rack, board, device, data)
+        transaction = await commands.write(rack, board, device, data, resolved=resolved)
         return transaction.to_json()
 
     # Otherwise, we just read from the device.
     else:
         logger.debug(_('Boot target alias route: reading'))
-        reading = await commands.read(rack, board, device)
+        reading = await commands.read(rack, board, device, resolved=resolved)
         return reading.to_json()
 
 
@@ -1,16 +1,48 @@
 """The core routes that make up the Synse Server HTTP API."""
 # pylint: disable=unused-argument
 
+import asyncio
+
+import ujson
 from sanic import Blueprint
+from sanic.response import stream as stream_response
 
-from synse import commands, errors, validate
+from synse import cache, commands, config, errors, plugin, stream, validate
 from synse.i18n import _
 from synse.log import logger
-from synse.response import json
+from synse.response import json, not_modified
+from synse.scheme.config import config_validator
 from synse.version import __api_version__
 
 bp = Blueprint(__name__, url_prefix='/synse/' + __api_version__)
 
+# The interval, in seconds, at which a comment is sent to idle Server-Sent
+# Events clients, so that proxies do not close the connection.
+SSE_KEEPALIVE_INTERVAL = 15
+
+
+def _snapshot_not_modified(request):
+    """Check whether the client making a request already has the current
+    version of the data from the metainfo snapshot.
+
+    This is checked before any command is run, so that a client whose data
+    is current gets a '304 Not Modified' response without the snapshot
+    data being looked up or encoded. If the snapshot needs to be built or
+    refreshed, this can not be known yet, so the command is run as usual
+    (its response is still conditional).
+
+    Args:
+        request (sanic.request.Request): The incoming request.
+
+    Returns:
+        sanic.response.HTTPResponse: The '304 Not Modified' response, or
+            None if the client does not have the current data.
+    """
+    snapshot = cache.current_snapshot()
+    if snapshot is not None and snapshot.validator.matches(request):
+        return not_modified(snapshot.validator)
+    return None
+
 
 @bp.route('/scan')
 @bp.route('/scan/<rack>')
@@ -28,6 +60,8 @@ async def scan_route(request, rack=None, board=None):
 
     Supported Query Parameters:
         force: Forces a re-scan if 'true', otherwise does nothing.
+        plugin: The name of the plugin to re-scan when forcing a re-scan.
+            If specified, only that plugin's devices are re-scanned.
 
     Args:
         request (sanic.request.Request): The incoming request.
@@ -42,17 +76,25 @@ async def scan_route(request, rack=None, board=None):
     Returns:
         sanic.response.HTTPResponse: The endpoint response.
     """
-    qparams = validate.validate_query_params(request.raw_args, 'force')
+    qparams = validate.validate_query_params(request.raw_args, 'force', 'plugin')
 
     param_force = qparams.get('force')
+    param_plugin = qparams.get('plugin')
 
     force = False
     if param_force is not None:
         force = param_force.lower() == 'true'
     logger.debug(_('Forcing re-scan? {}').format(force))
 
-    response = await commands.scan(rack=rack, board=board, force=force)
-    return response.to_json()
+    if not force:
+        cached = _snapshot_not_modified(request)
+        if cached is not None:
+            return cached
+
+    response = await commands.scan(
+        rack=rack, board=board, force=force, plugin_name=param_plugin
+    )
+    return response.to_json(request)
 
 
 @bp.route('/read/<rack>/<board>/<device>')
@@ -73,13 +115,208 @@ async def read_route(request, rack, board, device):
     return response.to_json()
 
 
+@bp.route('/read', methods=['GET', 'POST'])
+async def batch_read_route(request):
+    """Read data from many known devices in a single request.
+
+    On GET, the devices to read are selected from all known devices by the
+    query parameters. Omitting all query parameters reads every known device.
+
+    On POST, the devices to read are given as a JSON list of objects, each
+    with a 'rack', 'board', and 'device' field.
+
+    Supported Query Parameters (GET only):
+        rack: The rack to select devices by.
+        board: The board to select devices by.
+        type: The device type to select devices by.
+        model: The device model to select devices by.
+        protocol: The device protocol to select devices by.
+
+    Args:
+        request (sanic.request.Request): The incoming request.
+
+    Returns:
+        sanic.response.HTTPResponse: The endpoint response.
+    """
+    if request.method == 'POST':
+        validate.validate_query_params(request.raw_args)
+
+        try:
+            data = request.json
+        except Exception as e:
+            raise errors.InvalidJsonError(
+                _('Invalid JSON specified: {}').format(request.body)
+            ) from e
+
+        logger.debug(_('Batch read route: POSTed JSON: {}').format(data))
+
+        if not isinstance(data, list):
+            raise errors.InvalidArgumentsError(
+                _('Invalid data POSTed for batch read. Must be a list of devices')
+            )
+
+        devices = []
+        for item in data:
+            if not validate.is_device_location(item):
+                raise errors.InvalidArgumentsError(
+                    _('Invalid device POSTed for batch read. Must contain string "rack", '
+                      '"board", and "device" fields: {}').format(item)
+                )
+            devices.append((item['rack'], item['board'], item['device']))
+
+        response = await commands.batch_read(devices=devices)
+        return response.to_json()
+
+    qparams = validate.validate_query_params(
+        request.raw_args, 'rack', 'board', 'type', 'model', 'protocol'
+    )
+    response = await commands.batch_read(selectors=qparams)
+    return response.to_json()
+
+
+@bp.websocket('/stream')
+async def stream_route(request, ws):
+    """Stream the readings of devices over a WebSocket.
+
+    The client subscribes to devices by sending a JSON message with either
+    a 'devices' field (a list of objects with a 'rack', 'board', and 'device'
+    field), or a 'selectors' field (a non-empty object of device fields to
+    select devices by, e.g. {"type": "temperature"}). Sending another
+    subscription message replaces the current subscription.
+
+    The reading of each subscribed device is sent to the client when the
+    client subscribes and then whenever the reading changes. Each message
+    is a JSON object in the same form as an entry in the batch read response.
+
+    Args:
+        request (sanic.request.Request): The incoming request.
+        ws (websockets.protocol.WebSocketCommonProtocol): The WebSocket
+            for the connection.
+    """
+    subscription = stream.Subscription()
+    sender = asyncio.ensure_future(_stream_send(ws, subscription))
+
+    try:
+        while True:
+            message = await ws.recv()
+            logger.debug(_('Stream route: subscription: {}').format(message))
+
+            try:
+                devices = await stream.parse_subscription(message)
+            except errors.SynseError as e:
+                await ws.send(ujson.dumps({
+                    'error': {
+                        'error_id': e.error_id,
+                        'description': errors.codes[e.error_id],
+                        'context': str(e)
+                    }
+                }))
+                continue
+
+            stream.poller.subscribe(subscription, devices)
+    finally:
+        sender.cancel()
+        stream.poller.unsubscribe(subscription)
+
+
+async def _stream_send(ws, subscription):
+    """Send the reading messages published to a subscription to the client.
+
+    Args:
+        ws (websockets.protocol.WebSocketCommonProtocol): The WebSocket
+            for the connection.
+        subscription (stream.Subscription): The client's subscription.
+    """
+    while True:
+        message = await subscription.next()
+        if message is None:
+            # the subscription was dropped; closing the WebSocket ends the
+            # receive loop of the stream route, which cleans up after it.
+            await ws.close()
+            return
+        await ws.send(ujson.dumps(message))
+
+
+@bp.route('/stream/<rack>')
+@bp.route('/stream/<rack>/<board>')
+@validate.no_query_params()
+async def sse_route(request, rack, board=None):
+    """Stream the readings of the devices on a rack or board as Server-Sent
+    Events.
+
+    The reading of each device is sent when the client connects and then
+    whenever the reading changes. Each event's data is a JSON object in the
+    same form as an entry in the batch read response. The devices streamed
+    are those known when the client connects.
+
+    Args:
+        request (sanic.request.Request): The incoming request.
+        rack (str): The rack to stream the device readings of.
+        board (str): The board to stream the device readings of.
+    """
+    devices = await stream.select_location(rack, board)
+
+    subscription = stream.Subscription()
+    stream.poller.subscribe(subscription, devices)
+
+    async def send(response):  # pylint: disable=missing-docstring
+        try:
+            await _sse_send(response, subscription)
+        finally:
+            stream.poller.unsubscribe(subscription)
+
+    return stream_response(
+        send,
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache'}
+    )
+
+
+async def _sse_send(response, subscription):
+    """Send the reading messages published to a subscription to the client
+    as Server-Sent Events.
+
+    The stream ends when the client disconnects, which is noticed on the
+    next message or keep-alive at the latest. Writes to the client are
+    buffered by the transport. While the transport is buffering more than
+    its high-water mark, no more messages are written, so they back up in
+    the subscription instead. If the subscription's buffer fills up as well,
+    the subscription is dropped and the stream ends.
+
+    Args:
+        response (sanic.response.StreamingHTTPResponse): The response to
+            stream the events to.
+        subscription (stream.Subscription): The client's subscription.
+    """
+    transport = response.transport
+    while not transport.is_closing():
+        try:
+            message = await asyncio.wait_for(subscription.next(), SSE_KEEPALIVE_INTERVAL)
+        except asyncio.TimeoutError:
+            response.write(': keep-alive\n\n')
+            continue
+
+        if message is None:
+            return
+
+        response.write('data: {}\n\n'.format(ujson.dumps(message)))
+
+        _, high = transport.get_write_limits()
+        while transport.get_write_buffer_size() > high:
+            if transport.is_closing() or subscription.dropped:
+                return
+            await asyncio.sleep(0.1)
+
+
 @bp.route('/write/<rack>/<board>/<device>', methods=['POST'])
 @validate.no_query_params()
 async def write_route(request, rack, board, device):
     """Write data to a known device.
 
     The data POSTed here should be JSON with an 'action' field  and 'raw'
-    field, if applicable. If no data is posted, the write will fail.
+    field, if applicable. If no data is posted, the write will fail. A list
+    of such objects can be POSTed to write many actions to the device in a
+    single write.
 
     Args:
         request (sanic.request.Request): The incoming request.
@@ -99,7 +336,9 @@ async def write_route(request, rack, board, device):
 
     logger.debug(_('Write route: POSTed JSON: {}').format(data))
 
-    if not any([x in data for x in ['action', 'raw']]):
+    actions = data if isinstance(data, list) else [data]
+    if not actions or not all(
+            isinstance(d, dict) and any([x in d for x in ['action', 'raw']]) for d in actions):
         raise errors.InvalidArgumentsError(
             _('Invalid data POSTed for write. Must contain "action" and/or "raw"')
         )
@@ -108,12 +347,91 @@ async def write_route(request, rack, board, device):
     return response.to_json()
 
 
-@bp.route('/transaction')
-@bp.route('/transaction/<transaction_id>')
+@bp.route('/write', methods=['POST'])
 @validate.no_query_params()
+async def batch_write_route(request):
+    """Write data to many known devices in a single request.
+
+    The data POSTed here should either be a JSON list of writes, each an
+    object with a 'rack', 'board', and 'device' field identifying the device
+    to write to and an 'action' and/or 'raw' field, or a JSON object with a
+    'selectors' field (an object of device fields to select the devices to
+    write to by, e.g. {"type": "led"}) and the 'action' and/or 'raw' field to
+    write to each selected device.
+
+    Args:
+        request (sanic.request.Request): The incoming request.
+
+    Returns:
+        sanic.response.HTTPResponse: The endpoint response.
+    """
+    try:
+        data = request.json
+    except Exception as e:
+        raise errors.InvalidJsonError(
+            _('Invalid JSON specified: {}').format(request.body)
+        ) from e
+
+    logger.debug(_('Batch write route: POSTed JSON: {}').format(data))
+
+    if isinstance(data, dict) and 'selectors' in data:
+        selectors = data.pop('selectors')
+        if not validate.is_selectors(selectors):
+            raise errors.InvalidArgumentsError(
+                _('Invalid selectors POSTed for batch write. Must be a non-empty object '
+                  'with non-empty string values: {}').format(selectors)
+            )
+        if not validate.is_write_data(data):
+            raise errors.InvalidArgumentsError(
+                _('Invalid data POSTed for batch write. Must contain string "action" '
+                  'and/or "raw" fields')
+            )
+        response = await commands.batch_write(selectors=selectors, data=data)
+        return response.to_json()
+
+    if not isinstance(data, list):
+        raise errors.InvalidArgumentsError(
+            _('Invalid data POSTed for batch write. Must be a list of writes or '
+              'contain "selectors"')
+        )
+
+    for item in data:
+        if not validate.is_device_location(item) or not validate.is_write_data(item):
+            raise errors.InvalidArgumentsError(
+                _('Invalid write POSTed for batch write. Must contain string "rack", '
+                  '"board", "device", and "action" and/or "raw" fields: {}').format(item)
+            )
+
+    response = await commands.batch_write(writes=data)
+    return response.to_json()
+
+
+@bp.route('/transaction', methods=['GET', 'POST'])
+@bp.route('/transaction/<transaction_id>')
 async def transaction_route(request, transaction_id=None):
     """Check the status of a write transaction.
 
+    On POST, the status of many transactions is checked at once. The IDs
+    of the transactions are given as a JSON list.
+
+    On GET with no transaction ID, the IDs of the tracked transactions are
+    listed, in the order that they were created.
+
+    Supported Query Parameters:
+        wait: The maximum time, in seconds, to wait for the transaction(s)
+            to complete before responding. This is not supported when
+            listing transactions.
+
+    Supported Query Parameters (listing only):
+        plugin: The plugin to filter transactions by.
+        rack: The rack of the written device to filter transactions by.
+        board: The board of the written device to filter transactions by.
+        device: The written device to filter transactions by.
+        state: The last known state to filter transactions by.
+        status: The last known status to filter transactions by.
+        offset: The number of matching transactions to skip.
+        limit: The maximum number of transactions to list.
+
     Args:
         request (sanic.request.Request): The incoming request.
         transaction_id (str): The ID of the transaction to check.
@@ -121,10 +439,108 @@ async def transaction_route(request, transaction_id=None):
     Returns:
         sanic.response.HTTPResponse: The endpoint response.
     """
-    response = await commands.check_transaction(transaction_id)
+    if transaction_id is None and request.method != 'POST':
+        qparams = validate.validate_query_params(
+            request.raw_args,
+            'plugin', 'rack', 'board', 'device', 'state', 'status', 'offset', 'limit'
+        )
+        offset = _get_count(qparams, 'offset', 0)
+        limit = _get_count(qparams, 'limit', None)
+        response = await commands.list_transactions(offset=offset, limit=limit, **qparams)
+        return response.to_json()
+
+    wait = _get_wait(validate.validate_query_params(request.raw_args, 'wait'))
+
+    if request.method == 'POST':
+        try:
+            data = request.json
+        except Exception as e:
+            raise errors.InvalidJsonError(
+                _('Invalid JSON specified: {}').format(request.body)
+            ) from e
+
+        logger.debug(_('Transaction route: POSTed JSON: {}').format(data))
+
+        if not isinstance(data, list) or not all(isinstance(t, str) for t in data):
+            raise errors.InvalidArgumentsError(
+                _('Invalid data POSTed for transaction. Must be a list of transaction IDs')
+            )
+
+        response = await commands.check_transactions(data, wait=wait)
+        return response.to_json()
+
+    response = await commands.check_transaction(transaction_id, wait=wait)
     return response.to_json()
 
 
+def _get_count(qparams, param, default):
+    """Get a count (e.g. for pagination) from the query parameters of
+    a request, removing it from the query parameters.
+
+    Args:
+        qparams (dict): The query parameters of the request.
+        param (str): The name of the query parameter.
+        default: The value to use if the parameter was not given.
+
+    Returns:
+        int: The count.
+
+    Raises:
+        errors.InvalidArgumentsError: The count is not a non-negative integer.
+    """
+    if param not in qparams:
+        return default
+
+    value = qparams.pop(param)
+    try:
+        count = int(value)
+    except ValueError:
+        count = -1
+    if count < 0:
+        raise errors.InvalidArgumentsError(
+            _('Invalid value for "{}" query param: {}. Must be a non-negative '
+              'integer').format(param, value)
+        )
+    return count
+
+
+def _get_wait(qparams):
+    """Get the time to wait for transactions to complete from the query
+    parameters of a transaction request.
+
+    The wait time is capped at the 'transaction.max_wait' configuration
+    option, if it is set.
+
+    Args:
+        qparams (dict): The query parameters of the request.
+
+    Returns:
+        float: The time, in seconds, to wait; None if no wait was given.
+
+    Raises:
+        errors.InvalidArgumentsError: The wait time is not a non-negative
+            number.
+    """
+    if 'wait' not in qparams:
+        return None
+
+    try:
+        wait = float(qparams['wait'])
+    except ValueError:
+        wait = -1
+
+    if not 0 <= wait < float('inf'):
+        raise errors.InvalidArgumentsError(
+            _('Invalid value for "wait" query param: {}. Must be a non-negative '
+              'number of seconds').format(qparams['wait'])
+        )
+
+    max_wait = config.options.get('transaction.max_wait', None)
+    if max_wait:
+        wait = min(wait, max_wait)
+    return wait
+
+
 @bp.route('/info/<rack>')
 @bp.route('/info/<rack>/<board>')
 @bp.route('/info/<rack>/<board>/<device>')
@@ -141,8 +557,12 @@ async def info_route(request, rack, board=None, device=None):
     Returns:
         sanic.response.HTTPResponse: The endpoint response.
     """
+    cached = _snapshot_not_modified(request)
+    if cached is not None:
+        return cached
+
     response = await commands.info(rack, board, device)
-    return response.to_json()
+    return response.to_json(request)
 
 
 @bp.route('/config')
@@ -156,8 +576,11 @@ async def config_route(request):
     Returns:
         sanic.response.HTTPResponse: The endpoint response.
     """
+    if config_validator.matches(request):
+        return not_modified(config_validator)
+
     response = await commands.config()
-    return response.to_json()
+    return response.to_json(request)
 
 
 @bp.route('/plugins')
@@ -171,8 +594,15 @@ async def plugins_route(request):
     Returns:
         sanic.response.HTTPResponse: The endpoint response.
     """
-    response = await commands.get_plugins()
-    return response.to_json()
+    # Registering the plugins may change them, so they are registered
+    # before checking whether the client already has the current plugins.
+    plugin.register_plugins()
+    validator = commands.plugins_validator()
+    if validator.matches(request):
+        return not_modified(validator)
+
+    response = await commands.get_plugins(register=False)
+    return response.to_json(request)
 
 
 # FIXME (etd) -- this is a temporary route that is being used for auto-fan for demo/
@@ -7,9 +7,9 @@ response schemes.
 
 from .config import ConfigResponse
 from .info import InfoResponse
-from .read import ReadResponse
+from .read import BatchReadResponse, ReadResponse
 from .scan import ScanResponse
 from .test import TestResponse
-from .transaction import TransactionResponse
+from .transaction import BatchTransactionResponse, TransactionResponse
 from .version import VersionResponse
-from .write import WriteResponse
+from .write import BatchWriteResponse, WriteResponse
@@ -1,6 +1,7 @@
 """Base response model for all Synse Server response schemes."""
 
-from synse.response import json
+from synse import errors
+from synse.response import encoded_json, json, not_modified
 
 
 class SynseResponse(object):
@@ -10,15 +11,58 @@ class SynseResponse(object):
     It defines a `data` member which holds the response data that will
     be returned. Additionally, it provides a `to_json` method which
     converts the data to a JSON response.
+
+    A response scheme may also hold its data already encoded, in the
+    `encoded` member (see `synse.response.EncodedJson`), in which case
+    that is served rather than encoding the data again. If the response
+    has a `validator` (see `synse.response.Validator`), the response is
+    made conditional on it.
     """
 
     data = {}
+    encoded = None
+    validator = None
 
-    def to_json(self):
+    def to_json(self, request=None):
         """Convert the response scheme data to JSON.
 
+        Args:
+            request (sanic.request.Request): The incoming request. If the
+                response has a validator, this is used to make a conditional
+                response, so a client which already has the data gets a '304
+                Not Modified' response without the data being encoded.
+
         Returns:
             sanic.HTTPResponse: The Sanic endpoint response with the given
                 body encoded as JSON.
         """
-        return json(self.data)
+        headers = None
+        if self.validator is not None:
+            if request is not None and self.validator.matches(request):
+                return not_modified(self.validator)
+            headers = dict(self.validator.headers)
+
+        if self.encoded is not None:
+            return encoded_json(self.encoded, request, headers=headers)
+        return json(self.data, headers=headers)
+
+
+def format_error(error):
+    """Format an error for an entry of a batch response.
+
+    Batch responses report the error for each entry that failed, rather than
+    failing the whole request. Each such error has the same fields as the
+    error response for a failed request.
+
+    Args:
+        error (errors.SynseError): The error to format.
+
+    Returns:
+        dict: The formatted error.
+    """
+    return {
+        'http_code': getattr(error, 'status_code', 500),
+        'error_id': error.error_id,
+        'description': errors.codes[error.error_id],
+        'context': str(error)
+    }
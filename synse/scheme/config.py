@@ -1,8 +1,13 @@
 """Response scheme for the `config` endpoint."""
 
 from synse import config
+from synse.response import STARTED, Validator
 from synse.scheme.base_response import SynseResponse
 
+# The configuration is loaded on startup and does not change while Synse
+# Server runs, so it has a single version for the run.
+config_validator = Validator('config', STARTED)
+
 
 class ConfigResponse(SynseResponse):
     """A ConfigResponse is the response data for a Synse 'config' command.
@@ -14,7 +19,7 @@ class ConfigResponse(SynseResponse):
     Response Example:
         {
           "logging": "debug",
-          "pretty_json": true,
+          "pretty_json": false,
           "locale": "en_US",
           "plugin": {
             "unix": {
@@ -35,5 +40,7 @@ class ConfigResponse(SynseResponse):
         }
     """
 
+    validator = config_validator
+
     def __init__(self):
         self.data = {k: v for k, v in config.options.config.items() if not k.startswith('_')}
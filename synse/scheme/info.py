@@ -59,7 +59,14 @@ class InfoResponse(SynseResponse):
             }
           ]
         }
+
+    Args:
+        data (dict): The info data, retrieved from the info cache.
+        encoded (EncodedJson): The info data, already encoded.
+        validator (Validator): The validator of the info data.
     """
 
-    def __init__(self, data):
+    def __init__(self, data, encoded=None, validator=None):
         self.data = data
+        self.encoded = encoded
+        self.validator = validator
@@ -23,7 +23,9 @@ class PluginsResponse(SynseResponse):
     Args:
         data (list): List of dictionaries containing the name, network,
             and address of the registered plugins.
+        validator (Validator): The validator of the registered plugins.
     """
 
-    def __init__(self, data):
+    def __init__(self, data, validator=None):
         self.data = data
+        self.validator = validator
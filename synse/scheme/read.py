@@ -3,7 +3,144 @@
 from synse import utils
 from synse.i18n import _
 from synse.log import logger
-from synse.scheme.base_response import SynseResponse
+from synse.scheme.base_response import SynseResponse, format_error
+
+
+class OutputFormatter(object):
+    """Formats the readings of a single output of a device.
+
+    A formatter is compiled once for each output of a device when the
+    device's meta-information is loaded (see `compile_formatters`), so the
+    constant parts of a formatted reading (the unit, precision, and the cast
+    for the output's data type) are not rebuilt for every reading. The unit
+    is shared by every reading formatted, so it should not be modified.
+
+    Args:
+        output (MetaOutput): The output meta-information for the device.
+
+    Attributes:
+        unit (dict): The unit of the output's readings. None if the output
+            has no unit (e.g. LED state).
+        precision (int): The number of decimal places to round the output's
+            readings to. If this is falsy, readings are not rounded.
+        data_type (str): The data type of the output's readings.
+    """
+
+    __slots__ = ('output', 'unit', 'precision', 'data_type', '_cast', '_cast_rounded')
+
+    _data_types = {
+        'string': str,
+        'float': float,
+        'int': utils.s_to_int,
+        'bool': utils.s_to_bool,
+    }
+
+    # The casts for rounded values of the data types which can take the
+    # rounded float as it is, rather than from its string representation.
+    _rounded_types = {
+        'float': lambda value: value,
+        'int': utils.s_to_int,
+    }
+
+    def __init__(self, output):
+        self.output = output
+
+        # These fields may not be specified, e.g. in cases where it wouldn't
+        # make sense for a reading unit, e.g. LED state (on/off)
+        symbol = output.unit.symbol
+        name = output.unit.name
+        self.unit = {'symbol': symbol, 'name': name} if symbol or name else None
+
+        self.precision = output.precision
+        self.data_type = output.data_type
+
+        cast = self._data_types.get(self.data_type, str)
+        self._cast = cast
+        self._cast_rounded = self._rounded_types.get(
+            self.data_type, lambda value: cast(str(value))
+        )
+
+    def format(self, reading):
+        """Format a reading of the output.
+
+        Args:
+            reading (api.ReadResponse): The reading to format.
+
+        Returns:
+            dict: The formatted reading.
+        """
+        value = reading.value
+
+        # Handle cases where no data was read. Currently, we consider the reading
+        # to have no data if:
+        #   - the ReadResponse value comes back as an empty string (e.g. "")
+        #   - the ReadResponse value comes back as the string "null".
+        if value == '' or value == 'null':
+            logger.info(_('Reading value for {} came back as empty/null').format(reading.type))
+            value = None
+        else:
+            value = self.convert(value)
+
+        return {
+            'value': value,
+            'timestamp': reading.timestamp,
+            'unit': self.unit
+        }
+
+    def convert(self, value):
+        """Round a reading value to the output's precision and cast it to
+        the output's data type.
+
+        If the value can not be rounded or cast, it is left as it is.
+
+        Args:
+            value (str): The reading value.
+
+        Returns:
+            The converted reading value.
+        """
+        # Set the specified precision
+        if self.precision:
+            try:
+                rounded = round(float(value), self.precision)
+            except ValueError:
+                logger.warning(
+                    _('Invalid value for {}: "{}"').format(self.data_type, value)
+                )
+            else:
+                # Cast to the specified type
+                try:
+                    return self._cast_rounded(rounded)
+                except ValueError:
+                    value = str(rounded)
+                    logger.warning(_('Failed to cast "{}" to {}').format(value, self.data_type))
+                    return value
+
+        # Cast to the specified type
+        try:
+            return self._cast(value)
+        except ValueError:
+            logger.warning(_('Failed to cast "{}" to {}').format(value, self.data_type))
+            return value
+
+
+def compile_formatters(outputs):
+    """Compile the formatters for the outputs of a device.
+
+    Args:
+        outputs (list[MetaOutput]): The output meta-information for the
+            device.
+
+    Returns:
+        dict: The OutputFormatter for each output, keyed by the reading
+            type of the output. Where a device has more than one output
+            for a reading type, the first one is used.
+    """
+    formatters = {}
+    for out in outputs:
+        if out.type not in formatters:
+            formatters[out.type] = OutputFormatter(out)
+    return formatters
 
 
 class ReadResponse(SynseResponse):
@@ -32,28 +169,38 @@ class ReadResponse(SynseResponse):
           }
         }
 
+    If the read cache is enabled for the device, the response also includes
+    whether the readings were served from the cache ("cached") and the age
+    of the readings, in seconds ("age").
+
     Args:
         device (MetainfoResponse): The device that is being read.
         readings (list[ReadResponse]): A list of reading values returned
             from the plugin.
+        cached (bool): Whether the readings were served from the read
+            cache. None if the read cache is not enabled for the device.
+        age (float): The time, in seconds, since the readings were read
+            from the plugin. Only used if `cached` is not None.
+        formatters (dict): The compiled formatters for the device's outputs
+            (see `compile_formatters`). If not given, they are compiled
+            from the device's outputs.
     """
 
-    _data_types = {
-        'string': str,
-        'float': float,
-        'int': utils.s_to_int,
-        'bool': utils.s_to_bool,
-    }
-
-    def __init__(self, device, readings):
+    def __init__(self, device, readings, cached=None, age=None, formatters=None):
         self.device = device
         self.readings = readings
+        self.formatters = formatters if formatters is not None else \
+            compile_formatters(device.output)
 
         self.data = {
             'type': device.type,
             'data': self.format_readings()
         }
 
+        if cached is not None:
+            self.data['cached'] = cached
+            self.data['age'] = round(age, 3)
+
     def format_readings(self):
         """Format the instance's readings to the read response scheme.
 
@@ -63,72 +210,117 @@ class ReadResponse(SynseResponse):
         logger.debug(_('Formatting read response'))
         formatted = {}
 
-        dev_output = self.device.output
         for reading in self.readings:
             rt = reading.type
 
-            # These fields may not be specified, e.g. in cases where it wouldn't
-            # make sense for a reading unit, e.g. LED state (on/off)
-            unit = None
-            precision = None
-            data_type = None
-
-            found = False
-            for out in dev_output:
-                if out.type == rt:
-                    symbol = out.unit.symbol
-                    name = out.unit.name
-                    precision = out.precision
-                    data_type = out.data_type
-
-                    if symbol or name:
-                        unit = {
-                            'symbol': symbol,
-                            'name': name
-                        }
-
-                    found = True
-                    break
-
             # If the reading type does not match the supported types, we will not
             # return it, and instead will just just skip over it.
-            if not found:
+            formatter = self.formatters.get(rt)
+            if formatter is None:
                 logger.warning(
                     _('Found unexpected reading type "{}" for device {}')
                     .format(rt, self.device)
                 )
                 continue
 
-            value = reading.value
+            formatted[rt] = formatter.format(reading)
 
-            # Handle cases where no data was read. Currently, we consider the reading
-            # to have no data if:
-            #   - the ReadResponse value comes back as an empty string (e.g. "")
-            #   - the ReadResponse value comes back as the string "null".
-            if value == '' or value == 'null':
-                logger.info(_('Reading value for {} came back as empty/null').format(rt))
-                value = None
+        return formatted
 
-            else:
-                # Set the specified precision
-                if precision:
-                    try:
-                        value = str(round(float(value), precision))
-                    except ValueError:
-                        logger.warning(
-                            _('Invalid value for {}: "{}"').format(data_type, value)
-                        )
 
-                # Cast to the specified type
-                try:
-                    value = self._data_types.get(data_type, str)(value)
-                except ValueError:
-                    logger.warning(_('Failed to cast "{}" to {}').format(value, data_type))
+class BatchReadResponse(SynseResponse):
+    """A BatchReadResponse is the response data for a Synse 'batch read'
+    command.
 
-            formatted[rt] = {
-                'value': value,
-                'timestamp': reading.timestamp,
-                'unit': unit
+    Each entry in the response identifies a device by its location and holds
+    either the device's read response data or the error that occurred while
+    reading it.
+
+    Response Example:
+        {
+          "readings": [
+            {
+              "location": {
+                "rack": "rack-1",
+                "board": "vec",
+                "device": "12345"
+              },
+              "type": "temperature",
+              "data": {
+                "temperature": {
+                  "value": 123,
+                  "unit": {
+                    "symbol": "C",
+                    "name": "degrees celsius"
+                  },
+                  "timestamp": "2017-11-10 09:08:07"
+                }
+              }
+            },
+            {
+              "location": {
+                "rack": "rack-1",
+                "board": "vec",
+                "device": "67890"
+              },
+              "error": {
+                "http_code": 404,
+                "error_id": 4000,
+                "description": "device not found",
+                "context": "rack-1/vec/67890 does not correspond with a known device"
+              }
             }
+          ]
+        }
+
+    Args:
+        devices (list[tuple(str, str, str)]): The rack, board, and device
+            IDs of the devices that were read.
+        results (list): The result of reading each device, in the same
+            order as the devices. Each result is either a ReadResponse
+            or the SynseError that occurred reading the device.
+        read_times (list[float]): The time, in seconds from the start of
+            the batch, that the read of each device completed. This is None
+            for devices which were not read (e.g. the device is unknown).
+            The read times are not included in the response data.
+    """
+
+    def __init__(self, devices, results, read_times=None):
+        self.devices = devices
+        self.results = results
+        self.read_times = read_times or [None] * len(devices)
+
+        self.data = {
+            'readings': [
+                self.format_result(device, result)
+                for device, result in zip(devices, results)
+            ]
+        }
+
+    @staticmethod
+    def format_result(device, result):
+        """Format the result of reading a single device.
+
+        Args:
+            device (tuple(str, str, str)): The rack, board, and device IDs
+                of the device that was read.
+            result (ReadResponse | errors.SynseError): The result of
+                reading the device.
+
+        Returns:
+            dict: The formatted result.
+        """
+        rack, board, dev = device
+        formatted = {
+            'location': {
+                'rack': rack,
+                'board': board,
+                'device': dev
+            }
+        }
 
+        if isinstance(result, ReadResponse):
+            formatted.update(result.data)
+        else:
+            formatted['error'] = format_error(result)
         return formatted
@@ -50,7 +50,11 @@ class ScanResponse(SynseResponse):
 
     Args:
         data (dict): The scan data, retrieved from the scan cache.
+        encoded (EncodedJson): The scan data, already encoded.
+        validator (Validator): The validator of the scan data.
     """
 
-    def __init__(self, data):
+    def __init__(self, data, encoded=None, validator=None):
         self.data = data
+        self.encoded = encoded
+        self.validator = validator
@@ -10,14 +10,28 @@ class TestResponse(SynseResponse):
     Response Example:
         {
           "status": "ok",
-          "timestamp": "2017-09-27 14:33:57.804100"
+          "timestamp": "2017-09-27 14:33:57.804100",
+          "cache": {
+            "metainfo_rebuilds": {
+              "calls": 3,
+              "coalesced": 12
+            },
+            "device_reads": {
+              "calls": 120,
+              "coalesced": 7
+            }
+          }
         }
 
+    Args:
+        cache (dict): The coalescing metrics of the caches, keyed by the
+            name of the coalesced operation.
     """
 
-    data = {
-        'status': 'ok'
-    }
-
-    def __init__(self):
-        self.data['timestamp'] = utils.rfc3339now()
+    def __init__(self, cache=None):
+        self.data = {
+            'status': 'ok',
+            'timestamp': utils.rfc3339now(),
+        }
+        if cache is not None:
+            self.data['cache'] = cache
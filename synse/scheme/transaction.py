@@ -1,7 +1,7 @@
 """Response scheme for the `transaction` endpoint."""
 
 from synse.proto import util as putil
-from synse.scheme.base_response import SynseResponse
+from synse.scheme.base_response import SynseResponse, format_error
 
 
 class TransactionResponse(SynseResponse):
@@ -59,3 +59,76 @@ class TransactionListResponse(SynseResponse):
 
     def __init__(self, transactions):
         self.data = transactions
+
+
+class BatchTransactionResponse(SynseResponse):
+    """A BatchTransactionResponse is the response data for a Synse
+    'batch transaction' command.
+
+    Each entry in the response holds either the transaction's data, as in
+    the TransactionResponse, or the ID of the transaction and the error that
+    occurred while checking it.
+
+    Response Example:
+        {
+          "transactions": [
+            {
+              "id": "b7jl0b2un4a154rn9u4g",
+              "context": {
+                "action": "state",
+                "raw": ["on"]
+              },
+              "state": "ok",
+              "status": "done",
+              "created": "2017-11-08 14:11:46",
+              "updated": "2017-11-08 14:12:04",
+              "message": ""
+            },
+            {
+              "id": "b7jl0b2un4a154rn9u5a",
+              "error": {
+                "http_code": 404,
+                "error_id": 4004,
+                "description": "transaction not found",
+                "context": "Transaction with id \"b7jl0b2un4a154rn9u5a\" not found"
+              }
+            }
+          ]
+        }
+
+    Args:
+        transactions (list[str]): The IDs of the transactions that were
+            checked.
+        results (list): The result of checking each transaction, in the same
+            order as the transactions. Each result is either a
+            TransactionResponse or the SynseError that occurred checking
+            the transaction.
+    """
+
+    def __init__(self, transactions, results):
+        self.data = {
+            'transactions': [
+                self.format_result(transaction, result)
+                for transaction, result in zip(transactions, results)
+            ]
+        }
+
+    @staticmethod
+    def format_result(transaction, result):
+        """Format the result of checking a single transaction.
+
+        Args:
+            transaction (str): The ID of the transaction that was checked.
+            result (TransactionResponse | errors.SynseError): The result
+                of checking the transaction.
+
+        Returns:
+            dict: The formatted result.
+        """
+        if isinstance(result, TransactionResponse):
+            return result.data
+
+        return {
+            'id': transaction,
+            'error': format_error(result)
+        }
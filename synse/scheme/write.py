@@ -1,6 +1,7 @@
 """Response scheme for the `write` endpoint."""
 
-from synse.scheme.base_response import SynseResponse
+from synse import errors
+from synse.scheme.base_response import SynseResponse, format_error
 
 
 class WriteResponse(SynseResponse):
@@ -34,3 +35,92 @@ class WriteResponse(SynseResponse):
                 },
                 'transaction': _id
             })
+
+
+class BatchWriteResponse(SynseResponse):
+    """A BatchWriteResponse is the response data for a Synse 'batch write'
+    command.
+
+    Each entry in the response identifies a device by its location and holds
+    either the transactions of the writes to the device, as in the
+    WriteResponse, or the error that occurred while writing to it.
+
+    Response Example:
+        {
+          "writes": [
+            {
+              "location": {
+                "rack": "rack-1",
+                "board": "vec",
+                "device": "12345"
+              },
+              "transactions": [
+                {
+                  "context": {
+                    "action": "state",
+                    "raw": ["on"]
+                  },
+                  "transaction": "b7jl0b2un4a154rn9u4g"
+                }
+              ]
+            },
+            {
+              "location": {
+                "rack": "rack-1",
+                "board": "vec",
+                "device": "67890"
+              },
+              "error": {
+                "http_code": 404,
+                "error_id": 4000,
+                "description": "device not found",
+                "context": "rack-1/vec/67890 does not correspond with a known device"
+              }
+            }
+          ]
+        }
+
+    Args:
+        devices (list[tuple(str, str, str)]): The rack, board, and device
+            IDs of the devices that were written to.
+        results (list): The result of writing to each device, in the same
+            order as the devices. Each result is either the Transactions
+            returned from the gRPC write request or the SynseError that
+            occurred writing to the device.
+    """
+
+    def __init__(self, devices, results):
+        self.data = {
+            'writes': [
+                self.format_result(device, result)
+                for device, result in zip(devices, results)
+            ]
+        }
+
+    @staticmethod
+    def format_result(device, result):
+        """Format the result of writing to a single device.
+
+        Args:
+            device (tuple(str, str, str)): The rack, board, and device IDs
+                of the device that was written to.
+            result (Transactions | errors.SynseError): The result of
+                writing to the device.
+
+        Returns:
+            dict: The formatted result.
+        """
+        rack, board, dev = device
+        formatted = {
+            'location': {
+                'rack': rack,
+                'board': board,
+                'device': dev
+            }
+        }
+
+        if isinstance(result, errors.SynseError):
+            formatted['error'] = format_error(result)
+        else:
+            formatted['transactions'] = WriteResponse(result).data
+        return formatted
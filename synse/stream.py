@@ -0,0 +1,327 @@
+"""Streaming of device readings to subscribed clients.
+
+Clients subscribe to a set of devices, and are pushed the readings for those
+devices as they change. Devices are polled by a shared poller, so each device
+is read once per polling interval no matter how many clients are subscribed
+to it.
+
+Each subscription buffers a bounded number of messages. A client which does
+not keep up with its readings fills its buffer and is dropped, so a slow
+client can not hold up the poller or grow the server's memory without bound.
+"""
+
+import asyncio
+
+import ujson
+
+from synse import cache, commands, config, errors, validate
+from synse.i18n import _
+from synse.log import logger
+from synse.scheme import BatchReadResponse
+
+
+class Subscription(object):
+    """A client's subscription to the readings of a set of devices.
+
+    Args:
+        buffer_size (int): The maximum number of messages to buffer for the
+            client. If not given, the 'stream.buffer_size' configuration
+            option is used. If that is not set, the buffer is unbounded.
+
+    Attributes:
+        devices (set): The rack, board, and device IDs of the devices
+            that the client is subscribed to.
+        queue (asyncio.Queue): The queue of reading messages to be sent
+            to the client.
+        dropped (bool): Whether the subscription was dropped because its
+            buffer was full.
+    """
+
+    def __init__(self, buffer_size=None):
+        if buffer_size is None:
+            buffer_size = config.options.get('stream.buffer_size', None) or 0
+
+        self.devices = set()
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = False
+
+    def __str__(self):
+        return '<Subscription: devices: {}, pending: {}, dropped: {}>'.format(
+            len(self.devices), self.queue.qsize(), self.dropped)
+
+    def publish(self, message):
+        """Publish a reading message to the subscription.
+
+        If the subscription's buffer is full, the message is not published
+        and the subscription is marked as dropped.
+
+        Args:
+            message (dict): The reading message for a device.
+
+        Returns:
+            bool: True if the message was published; False if the
+                subscription has been dropped.
+        """
+        if self.dropped:
+            return False
+
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning(_('Dropping slow stream subscription: {}').format(self))
+            self.dropped = True
+            return False
+        return True
+
+    async def next(self):
+        """Get the next reading message to send to the client.
+
+        Returns:
+            dict: The reading message for a device, or None if the
+                subscription has been dropped.
+        """
+        if self.dropped:
+            return None
+        return await self.queue.get()
+
+
+class DevicePoller(object):
+    """Polls devices on behalf of all subscriptions to them.
+
+    A polling task is started for a device when the first subscription to
+    it is added, and stopped when the last subscription to it is removed.
+    Each poll reads the device and publishes the reading to all subscriptions
+    to the device, but only if the reading has changed since the last poll.
+    Subscriptions which are dropped while publishing are unsubscribed.
+
+    Attributes:
+        subscriptions (dict): The subscriptions to each device, keyed by the
+            rack, board, and device IDs of the device.
+        tasks (dict): The polling task for each device.
+        last (dict): The last reading message published for each device.
+    """
+
+    def __init__(self):
+        self.subscriptions = {}
+        self.tasks = {}
+        self.last = {}
+
+    def __str__(self):
+        return '<DevicePoller: devices: {}>'.format(len(self.tasks))
+
+    def subscribe(self, subscription, devices):
+        """Set the devices that a subscription is subscribed to.
+
+        This replaces any devices that the subscription was previously
+        subscribed to. The last known reading for each newly subscribed
+        device is published to the subscription right away.
+
+        Args:
+            subscription (Subscription): The subscription to update.
+            devices (list[tuple(str, str, str)]): The rack, board, and device
+                IDs of the devices to subscribe to.
+        """
+        devices = set(devices)
+
+        for device in subscription.devices - devices:
+            self._remove(subscription, device)
+
+        for device in devices - subscription.devices:
+            self.subscriptions.setdefault(device, set()).add(subscription)
+            if device not in self.tasks:
+                logger.debug(_('Starting poller for device: {}').format(device))
+                self.tasks[device] = asyncio.ensure_future(self._poll(device))
+            elif device in self.last:
+                subscription.publish(self.last[device])
+
+        subscription.devices = devices
+
+    def unsubscribe(self, subscription):
+        """Remove a subscription from all of the devices it is subscribed to.
+
+        Args:
+            subscription (Subscription): The subscription to remove.
+        """
+        for device in subscription.devices:
+            self._remove(subscription, device)
+        subscription.devices = set()
+
+    def _remove(self, subscription, device):
+        """Remove a subscription to a device, stopping the polling of the
+        device if there are no subscriptions to it left.
+
+        Args:
+            subscription (Subscription): The subscription to remove.
+            device (tuple(str, str, str)): The rack, board, and device IDs
+                of the device.
+        """
+        subscriptions = self.subscriptions.get(device, set())
+        subscriptions.discard(subscription)
+
+        if not subscriptions:
+            logger.debug(_('Stopping poller for device: {}').format(device))
+            self.subscriptions.pop(device, None)
+            self.last.pop(device, None)
+            task = self.tasks.pop(device, None)
+            if task is not None:
+                task.cancel()
+
+    async def _poll(self, device):
+        """Poll a device, publishing its readings when they change.
+
+        Args:
+            device (tuple(str, str, str)): The rack, board, and device IDs
+                of the device to poll.
+        """
+        while True:
+            try:
+                result = await commands.read(*device)
+            except errors.SynseError as e:
+                result = e
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning(_('Failed to poll device {}: {}').format(device, e))
+                result = errors.FailedReadCommandError(str(e))
+
+            message = BatchReadResponse.format_result(device, result)
+
+            last = self.last.get(device)
+            if last is None or _reading_values(last) != _reading_values(message):
+                self.last[device] = message
+                for subscription in list(self.subscriptions.get(device, ())):
+                    if not subscription.publish(message):
+                        self.unsubscribe(subscription)
+
+            await asyncio.sleep(config.options.get('stream.interval', None) or 1)
+
+
+def _reading_values(message):
+    """Get the parts of a reading message which are used to determine
+    whether a device's reading has changed.
+
+    Reading timestamps (and the read cache info) are not compared, since
+    they change on every read.
+
+    Args:
+        message (dict): The reading message for a device.
+
+    Returns:
+        tuple: The values of the reading, or the error id if the device
+            could not be read.
+    """
+    if 'error' in message:
+        return 'error', message['error']['error_id']
+
+    return message['type'], sorted(
+        (rt, reading['value']) for rt, reading in message['data'].items()
+    )
+
+
+async def parse_subscription(message):
+    """Get the devices to subscribe to from a client's subscription message.
+
+    The subscription message is JSON, and should contain either a 'devices'
+    field, which is a list of objects with a 'rack', 'board', and 'device'
+    field, or a 'selectors' field, which is an object of the device fields
+    to select devices by (see `cache.DEVICE_SELECTORS`). At least one
+    selector must be given, so that a single subscription can not select
+    every device. Selectors are resolved against the devices known at the
+    time of subscription.
+
+    Args:
+        message (str): The subscription message.
+
+    Returns:
+        list[tuple(str, str, str)]: The rack, board, and device IDs of
+            the devices to subscribe to.
+
+    Raises:
+        errors.InvalidJsonError: The message is not valid JSON.
+        errors.InvalidArgumentsError: The message does not specify the
+            devices to subscribe to.
+    """
+    try:
+        data = ujson.loads(message)
+    except ValueError as e:
+        raise errors.InvalidJsonError(
+            _('Invalid JSON specified: {}').format(message)
+        ) from e
+
+    if not isinstance(data, dict) or not any(k in data for k in ['devices', 'selectors']):
+        raise errors.InvalidArgumentsError(
+            _('Invalid subscription. Must contain "devices" or "selectors"')
+        )
+
+    if 'selectors' in data:
+        selectors = data['selectors']
+        if not validate.is_selectors(selectors):
+            raise errors.InvalidArgumentsError(
+                _('Invalid subscription selectors. Must be a non-empty object with '
+                  'non-empty string values: {}').format(selectors)
+            )
+        return await select_devices(**selectors)
+
+    if not isinstance(data['devices'], list):
+        raise errors.InvalidArgumentsError(
+            _('Invalid subscription devices. Must be a list of devices: {}').format(
+                data['devices'])
+        )
+
+    devices = []
+    for item in data['devices']:
+        if not validate.is_device_location(item):
+            raise errors.InvalidArgumentsError(
+                _('Invalid device in subscription. Must contain string "rack", '
+                  '"board", and "device" fields: {}').format(item)
+            )
+        devices.append((item['rack'], item['board'], item['device']))
+    return devices
+
+
+async def select_devices(**selectors):
+    """Get the devices matching the given selectors.
+
+    Args:
+        **selectors: The device fields to select devices by (see
+            `cache.DEVICE_SELECTORS`).
+
+    Returns:
+        list[tuple(str, str, str)]: The rack, board, and device IDs of
+            the selected devices.
+    """
+    snapshot = await cache.get_snapshot()
+    return [
+        (d.location.rack, d.location.board, d.uid)
+        for d in snapshot.select(**selectors)
+    ]
+
+
+async def select_location(rack, board=None):
+    """Get the devices on a rack, or on a board of a rack.
+
+    Args:
+        rack (str): The rack to get the devices of.
+        board (str): The board to get the devices of.
+
+    Returns:
+        list[tuple(str, str, str)]: The rack, board, and device IDs of
+            the devices at the location.
+
+    Raises:
+        errors.RackNotFoundError: The rack has no known devices.
+        errors.BoardNotFoundError: The board has no known devices.
+    """
+    devices = await select_devices(rack=rack, board=board)
+    if devices:
+        return devices
+
+    if board is not None and await select_devices(rack=rack):
+        raise errors.BoardNotFoundError(
+            _('Board "{}" not found in rack "{}"').format(board, rack)
+        )
+    raise errors.RackNotFoundError(
+        _('Rack "{}" not found').format(rack)
+    )
+
+
+# The poller shared by all subscriptions.
+poller = DevicePoller()
@@ -1,8 +1,13 @@
 """Synse Server utility and convenience methods."""
 
+import asyncio
 import datetime
+import math
+import time
 
+from synse import errors
 from synse.i18n import _
+from synse.log import logger
 
 
 def rfc3339now():
@@ -75,3 +80,205 @@ def s_to_int(val):
         return int(float(val))
     except Exception as e:
         raise ValueError from e
+
+
+async def bounded_call(fn, *args, limit=None, error=errors.SynseError, failure=None):
+    """Run a coroutine function, bounded by a semaphore, and return any
+    error which it raises as its result.
+
+    This is used for the individual calls which make up a batch (e.g. the
+    reads of a batch read), so that a failure in one call does not interrupt
+    the others and is instead reported as the result of that call.
+
+    Args:
+        fn: The coroutine function to run.
+        *args: Arguments to pass to the coroutine function.
+        limit (asyncio.Semaphore): The semaphore bounding the number of
+            concurrent calls, if any.
+        error (type): The `errors.SynseError` subclass to convert any
+            other error raised by the call to.
+        failure (str): A description of the call's failure, which is
+            logged along with any error which is converted.
+
+    Returns:
+        The result of the coroutine function, or the `errors.SynseError`
+        which occurred.
+    """
+    try:
+        if limit is None:
+            return await fn(*args)
+        async with limit:
+            return await fn(*args)
+    except errors.SynseError as e:
+        return e
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning('{}: {}'.format(failure or _('Call failed'), e))
+        return error(str(e))
+
+
+class SingleFlight(object):
+    """Coalesce concurrent calls for the same key into a single execution.
+
+    The first caller for a key runs the given coroutine function. Any other
+    callers for that key which arrive while the first call is still in flight
+    do not run it again; they wait on, and get the result (or error) of,
+    the in-flight call.
+
+    Attributes:
+        calls (int): The number of calls which were executed.
+        coalesced (int): The number of calls which were coalesced into an
+            already in-flight call.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._inflight = {}
+
+    def __str__(self):
+        return '<SingleFlight: calls: {}, coalesced: {}, in flight: {}>'.format(
+            self.calls, self.coalesced, len(self._inflight))
+
+    def in_flight(self, key):
+        """Check whether there is a call in flight for the given key.
+
+        Args:
+            key: The key to check.
+
+        Returns:
+            bool: True if there is a call in flight; False otherwise.
+        """
+        return key in self._inflight
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Run the coroutine function for the key, unless it is already in
+        flight, in which case wait for the in-flight result.
+
+        The call runs as its own task, so a caller that is cancelled while
+        waiting does not cancel the call for the other callers.
+
+        Args:
+            key: The key identifying the call.
+            fn: The coroutine function to run.
+            *args: Arguments to pass to the coroutine function.
+            **kwargs: Keyword arguments to pass to the coroutine function.
+
+        Returns:
+            The result of the coroutine function.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            future = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = future
+
+            def done(f):  # pylint: disable=missing-docstring
+                if self._inflight.get(key) is f:
+                    del self._inflight[key]
+            future.add_done_callback(done)
+
+        return await asyncio.shield(future)
+
+
+class TimerWheel(object):
+    """A hashed timer wheel for expiring keys.
+
+    Keys are placed in the slot of the wheel for the tick at which they
+    expire. Advancing the wheel only visits the slots for the ticks that have
+    passed, so expiring keys costs nothing per key until the key's slot comes
+    around, and no timer handle is kept per key. Keys whose expiry is more than
+    a full rotation away stay in their slot until the tick they expire at.
+
+    The wheel is advanced by its user (see `advance`), rather than by a
+    background task.
+
+    Args:
+        resolution (float): The length of a tick, in seconds. Keys expire
+            at most one tick late.
+        size (int): The number of slots in the wheel.
+    """
+
+    def __init__(self, resolution=1, size=512):
+        self.resolution = resolution
+        self.size = size
+        self.slots = [{} for _ in range(size)]
+        self.tick = 0
+        self._start = time.monotonic()
+        self._deadlines = {}
+
+    def __str__(self):
+        return '<TimerWheel: keys: {}, tick: {}>'.format(len(self._deadlines), self.tick)
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def _now(self, now=None):
+        """Get the tick for the given time.
+
+        Args:
+            now (float): The (monotonic) time. Defaults to the current time.
+
+        Returns:
+            int: The tick for the time.
+        """
+        if now is None:
+            now = time.monotonic()
+        return int((now - self._start) / self.resolution)
+
+    def schedule(self, key, delay, now=None):
+        """Schedule a key to expire, replacing any existing expiry for it.
+
+        Args:
+            key: The key to schedule.
+            delay (float): The time, in seconds, until the key expires.
+            now (float): The (monotonic) time to schedule from. Defaults
+                to the current time.
+        """
+        self.cancel(key)
+        deadline = self._now(now) + max(1, math.ceil(delay / self.resolution))
+        self.slots[deadline % self.size][key] = deadline
+        self._deadlines[key] = deadline
+
+    def cancel(self, key):
+        """Cancel the expiry of a key, if it is scheduled.
+
+        Args:
+            key: The key to cancel the expiry of.
+        """
+        deadline = self._deadlines.pop(key, None)
+        if deadline is not None:
+            del self.slots[deadline % self.size][key]
+
+    def clear(self):
+        """Cancel the expiry of all keys."""
+        for slot in self.slots:
+            slot.clear()
+        self._deadlines.clear()
+
+    def advance(self, now=None):
+        """Advance the wheel to the given time, expiring keys along the way.
+
+        Args:
+            now (float): The (monotonic) time to advance to. Defaults to
+                the current time.
+
+        Returns:
+            list: The keys which expired.
+        """
+        tick = self._now(now)
+        if tick <= self.tick:
+            return []
+
+        expired = []
+        for i in range(1, min(tick - self.tick, self.size) + 1):
+            slot = self.slots[(self.tick + i) % self.size]
+            for key, deadline in list(slot.items()):
+                if deadline <= tick:
+                    del slot[key]
+                    del self._deadlines[key]
+                    expired.append(key)
+
+        self.tick = tick
+        return expired
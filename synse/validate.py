@@ -5,26 +5,99 @@ from functools import wraps
 from synse import cache, errors
 from synse.i18n import _
 
+# The query parameters which are supported by all endpoints. These are
+# handled outside of the routes (e.g. the 'pretty' parameter selects the JSON
+# output format, see `response.format_json`), so they are not validated or
+# passed along to the routes.
+GLOBAL_QUERY_PARAMS = ('pretty',)
+
+# The fields which identify the location of a device in request data.
+DEVICE_LOCATION_FIELDS = ('rack', 'board', 'device')
+
 
 async def validate_device_type(device_type, rack, board, device):
     """Validate that the device associated with the given routing info
     (rack, board device) matches the given device type.
 
+    The device is resolved in order to validate it. The resolved device is
+    returned so that it can be passed on to the read or write command,
+    rather than being resolved again.
+
     Args:
         device_type (str): The type of the device, e.g. "led", "fan", etc.
         rack (str): The rack which the device belongs to.
         board (str): The board which the device belongs to.
         device (str): The ID of the device.
 
+    Returns:
+        cache.ResolvedDevice: The resolved device.
+
     Raises:
         errors.InvalidDeviceType: The device does not match the given type.
         errors.DeviceNotFoundError: The specified device is not found.
     """
-    __, device = await cache.get_device_meta(rack, board, device)  # pylint: disable=unused-variable
-    if device.type != device_type.lower():
+    resolved = await cache.resolve_device(rack, board, device)
+    if resolved.meta.type != device_type.lower():
         raise errors.InvalidDeviceType(
-            _('Device ({}) is not of type {}').format(device.type, device_type)
+            _('Device ({}) is not of type {}').format(resolved.meta.type, device_type)
         )
+    return resolved
+
+
+def is_device_location(item):
+    """Check whether the given item, e.g. from POSTed JSON data, is a
+    valid device location.
+
+    A valid device location is an object with a string value for each of
+    its 'rack', 'board', and 'device' fields.
+
+    Args:
+        item: The item to check.
+
+    Returns:
+        bool: True if the item is a valid device location; False otherwise.
+    """
+    return isinstance(item, dict) and \
+        all(isinstance(item.get(k), str) for k in DEVICE_LOCATION_FIELDS)
+
+
+def is_selectors(item):
+    """Check whether the given item, e.g. from POSTed JSON data, is a
+    valid set of device selectors.
+
+    Valid device selectors are a non-empty object mapping device fields to
+    the non-empty string value to select devices by. No selectors would
+    select every device, which is never what is wanted from request data.
+    Whether the device fields themselves are supported is checked when the
+    devices are selected (see `cache.MetainfoSnapshot.select`).
+
+    Args:
+        item: The item to check.
+
+    Returns:
+        bool: True if the item is valid device selectors; False otherwise.
+    """
+    return isinstance(item, dict) and bool(item) and \
+        all(isinstance(v, str) and v for v in item.values())
+
+
+def is_write_data(item):
+    """Check whether the given item, e.g. from POSTed JSON data, is valid
+    data to write to a device.
+
+    Valid write data is an object with an 'action' and/or 'raw' field, each
+    of which must have a string value if it is given.
+
+    Args:
+        item: The item to check.
+
+    Returns:
+        bool: True if the item is valid write data; False otherwise.
+    """
+    if not isinstance(item, dict):
+        return False
+    fields = [k for k in ('action', 'raw') if k in item]
+    return bool(fields) and all(isinstance(item[k], str) for k in fields)
 
 
 def validate_query_params(raw_args, *valid_params):
@@ -33,7 +106,7 @@ def validate_query_params(raw_args, *valid_params):
     Any unsupported query parameter will cause an error to be raised.
     Absence of a supported query parameter will not cause an error. If
     a supported query parameter is found, it is added to the response
-    dictionary.
+    dictionary. The `GLOBAL_QUERY_PARAMS` are ignored.
 
     Args:
         raw_args: An incoming Sanic request's `raw_args`, which contains the
@@ -49,6 +122,8 @@ def validate_query_params(raw_args, *valid_params):
     """
     params = {}
     for k, v in raw_args.items():
+        if k in GLOBAL_QUERY_PARAMS:
+            continue
         if k not in valid_params:
             raise errors.InvalidArgumentsError(
                 _('Invalid query param: {} (valid params: {})').format(k, valid_params)
@@ -70,7 +145,7 @@ def no_query_params():
     def decorator(f):  # pylint: disable=missing-docstring
         @wraps(f)
         async def inner(request, *args, **kwargs):  # pylint: disable=missing-docstring
-            if len(request.raw_args) != 0:
+            if any(k not in GLOBAL_QUERY_PARAMS for k in request.raw_args):
                 raise errors.InvalidArgumentsError(
                     _('Endpoint does not support query parameters but got: {}').format(
                         request.raw_args)
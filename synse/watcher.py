@@ -0,0 +1,212 @@
+"""Server-side watching of write transactions until they complete.
+
+Rather than having each client poll a transaction until it completes, a
+client can wait on the transaction. A single watcher per plugin polls all of
+the plugin's transactions that are being waited on, a round at a time, and
+wakes the waiting clients when their transaction completes.
+"""
+
+import asyncio
+
+import grpc
+from synse_plugin import api
+
+from synse import config, errors
+from synse.i18n import _
+from synse.log import logger
+
+
+class TransactionWatcher(object):
+    """Watches the outstanding transactions of a single plugin.
+
+    The watcher's polling task is started when the first transaction is
+    waited on, and stops once no transactions are being waited on. Each
+    round checks every transaction being waited on once, no matter how many
+    clients are waiting on it.
+
+    Args:
+        _plugin (Plugin): The plugin whose transactions are watched.
+
+    Attributes:
+        plugin (Plugin): The plugin whose transactions are watched.
+        waiters (dict): The futures of the clients waiting on each
+            transaction, keyed by transaction ID.
+        last (dict): The last WriteResponse seen for each transaction
+            being waited on which has not completed.
+        task (asyncio.Task): The polling task, if it is running.
+    """
+
+    def __init__(self, _plugin):
+        self.plugin = _plugin
+        self.waiters = {}
+        self.last = {}
+        self.task = None
+
+    def __str__(self):
+        return '<TransactionWatcher: plugin: {}, transactions: {}>'.format(
+            self.plugin.name, len(self.waiters))
+
+    async def wait(self, transaction_id, timeout):
+        """Wait for a transaction to complete.
+
+        Args:
+            transaction_id (str): The ID of the transaction to wait on.
+            timeout (float): The maximum time, in seconds, to wait.
+
+        Returns:
+            WriteResponse: The state of the transaction. If the timeout
+                expires before the transaction completes, this is the last
+                state seen for it, or None if it has not been checked yet.
+
+        Raises:
+            errors.FailedTransactionCommandError: The transaction could
+                not be checked.
+        """
+        future = asyncio.get_event_loop().create_future()
+        self.waiters.setdefault(transaction_id, set()).add(future)
+
+        if self.task is None:
+            logger.debug(_('Starting transaction watcher for plugin: {}').format(
+                self.plugin.name))
+            self.task = asyncio.ensure_future(self._run())
+
+        try:
+            # the future is shielded so that timing out does not cancel it,
+            # which would make it unusable to the polling task.
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return self.last.get(transaction_id)
+        finally:
+            self._remove(transaction_id, future)
+
+    def _remove(self, transaction_id, future):
+        """Remove a client's future from the waiters on a transaction.
+
+        Args:
+            transaction_id (str): The ID of the transaction.
+            future (asyncio.Future): The future of the waiting client.
+        """
+        futures = self.waiters.get(transaction_id)
+        if futures is None:
+            return
+
+        futures.discard(future)
+        if not futures:
+            del self.waiters[transaction_id]
+            self.last.pop(transaction_id, None)
+
+    def _resolve(self, transaction_id, result=None, exception=None):
+        """Wake all of the clients waiting on a transaction.
+
+        Args:
+            transaction_id (str): The ID of the transaction.
+            result (WriteResponse): The final state of the transaction.
+            exception (errors.SynseError): The error that occurred checking
+                the transaction.
+        """
+        for future in self.waiters.pop(transaction_id, set()):
+            if future.done():
+                continue
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        self.last.pop(transaction_id, None)
+
+    async def _run(self):
+        """Poll the transactions being waited on until there are none left."""
+        try:
+            while self.waiters:
+                transaction_ids = list(self.waiters)
+                results = await self._check_all(transaction_ids)
+
+                for transaction_id, result in zip(transaction_ids, results):
+                    if transaction_id not in self.waiters:
+                        continue
+                    if isinstance(result, errors.SynseError):
+                        self._resolve(transaction_id, exception=result)
+                    elif is_done(result):
+                        self._resolve(transaction_id, result=result)
+                    else:
+                        self.last[transaction_id] = result
+
+                if self.waiters:
+                    await asyncio.sleep(
+                        config.options.get('transaction.watch_interval', None) or 1
+                    )
+        finally:
+            logger.debug(_('Stopping transaction watcher for plugin: {}').format(
+                self.plugin.name))
+            self.task = None
+
+    async def _check_all(self, transaction_ids):
+        """Check a round of transactions concurrently.
+
+        At most 'grpc.max_concurrent_reads' checks are in flight to the
+        plugin at once.
+
+        Args:
+            transaction_ids (list[str]): The IDs of the transactions to check.
+
+        Returns:
+            list[WriteResponse | errors.SynseError]: The state of each
+                transaction, or the error that occurred checking it.
+        """
+        max_concurrent = config.options.get('grpc.max_concurrent_reads', None)
+        limit = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+
+        async def check(transaction_id):  # pylint: disable=missing-docstring
+            try:
+                if limit is None:
+                    return await self.plugin.client.check_transaction(transaction_id)
+                async with limit:
+                    return await self.plugin.client.check_transaction(transaction_id)
+            except grpc.RpcError as e:
+                return errors.FailedTransactionCommandError(str(e))
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning(_('Failed to check transaction {}: {}').format(
+                    transaction_id, e))
+                return errors.FailedTransactionCommandError(str(e))
+
+        return await asyncio.gather(*[check(t) for t in transaction_ids])
+
+
+def is_done(write_response):
+    """Check whether a transaction has reached a terminal state.
+
+    A transaction is terminal once its status is 'done', or once its state
+    is 'error', since no further updates will occur for it.
+
+    Args:
+        write_response (WriteResponse): The state of the transaction.
+
+    Returns:
+        bool: True if the transaction is terminal; False otherwise.
+    """
+    return (
+        write_response.status == api.WriteResponse.DONE or
+        write_response.state == api.WriteResponse.ERROR
+    )
+
+
+async def wait(_plugin, transaction_id, timeout):
+    """Wait for a transaction to complete, using the watcher for the plugin
+    which manages it.
+
+    Args:
+        _plugin (Plugin): The plugin which manages the transaction.
+        transaction_id (str): The ID of the transaction to wait on.
+        timeout (float): The maximum time, in seconds, to wait.
+
+    Returns:
+        WriteResponse: The state of the transaction, or None if it was not
+            checked before the timeout expired.
+    """
+    watcher = watchers.get(_plugin.name)
+    if watcher is None or watcher.plugin is not _plugin:
+        watcher = watchers[_plugin.name] = TransactionWatcher(_plugin)
+    return await watcher.wait(transaction_id, timeout)
+
+
+# The transaction watcher for each plugin, keyed by plugin name.
+watchers = {}
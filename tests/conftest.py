@@ -7,7 +7,7 @@ import shutil
 import pytest
 import yaml
 
-from synse import config, const, factory
+from synse import config, const, factory, response
 from tests import data_dir
 
 _app = None
@@ -68,3 +68,24 @@ def disable_logging():
 def no_pretty_json():
     """Fixture to ensure basic JSON responses."""
     config.options.set('pretty_json', False)
+    response.configure_json()
+
+
+@pytest.fixture()
+def pretty_json():
+    """Fixture to ensure pretty-printed JSON responses."""
+    config.options.set('pretty_json', True)
+    response.configure_json()
+    yield
+    config.options.set('pretty_json', False)
+    response.configure_json()
+
+
+@pytest.fixture()
+def compress_all():
+    """Fixture to compress responses of any size."""
+    config.options.set('compression.min_size', 0)
+    response.configure_compression()
+    yield
+    config.options.set('compression.min_size', 1024)
+    response.configure_compression()
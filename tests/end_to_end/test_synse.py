@@ -356,14 +356,23 @@ class TestConfig(object):
         # the expected configuration keys (default config)
         expected = {
             'cache': {
-                'meta': {'ttl': 20},
-                'transaction': {'ttl': 300}
+                'meta': {'ttl': 20, 'serve_stale': False, 'max_stale': 60, 'refresh_interval': 0},
+                'transaction': {'ttl': 300},
+                'read': {'ttl': 0, 'types': {}}
+            },
+            'grpc': {
+                'timeout': 3,
+                'max_workers': 100,
+                'max_concurrent_reads': 25,
+                'max_concurrent_writes': 25
             },
-            'grpc': {'timeout': 3},
             'locale': 'en_US',
             'logging': 'debug',
             'plugin': {'tcp': {}, 'unix': {}},
-            'pretty_json': True
+            'pretty_json': False,
+            'stream': {'interval': 1, 'buffer_size': 100},
+            'transaction': {'watch_interval': 1, 'max_wait': 30},
+            'compression': {'enabled': True, 'min_size': 1024, 'level': 6}
         }
 
         assert expected == data
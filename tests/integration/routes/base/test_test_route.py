@@ -16,6 +16,7 @@ def test_test_endpoint_ok(app):
     assert 'timestamp' in data
 
     assert data['status'] == 'ok'
+    assert set(data['cache']) == {'metainfo_rebuilds', 'device_reads'}
 
 
 def test_test_endpoint_post_not_allowed(app):
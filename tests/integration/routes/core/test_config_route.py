@@ -21,10 +21,75 @@ def test_config_endpoint_ok(app):
     assert 'grpc' in data
 
     assert data['locale'] == 'en_US'
-    assert data['pretty_json'] is True
+    assert data['pretty_json'] is False
     assert data['logging'] == 'info'
-    assert data['cache'] == {'meta': {'ttl': 20}, 'transaction': {'ttl': 300}}
-    assert data['grpc'] == {'timeout': 3}
+    assert data['cache'] == {
+        'meta': {'ttl': 20, 'serve_stale': False, 'max_stale': 60, 'refresh_interval': 0},
+        'transaction': {'ttl': 300},
+        'read': {'ttl': 0, 'types': {}}
+    }
+    assert data['grpc'] == {
+        'timeout': 3,
+        'max_workers': 100,
+        'max_concurrent_reads': 25,
+        'max_concurrent_writes': 25
+    }
+    assert data['stream'] == {'interval': 1, 'buffer_size': 100}
+    assert data['transaction'] == {'watch_interval': 1, 'max_wait': 30}
+    assert data['compression'] == {'enabled': True, 'min_size': 1024, 'level': 6}
+
+
+def test_config_endpoint_not_modified(app):
+    """Test getting a config response which the client already has."""
+    _, response = app.test_client.get(config_url)
+    assert response.status == 200
+    etag = response.headers['ETag']
+    last_modified = response.headers['Last-Modified']
+
+    _, response = app.test_client.get(config_url, headers={'If-None-Match': etag})
+    assert response.status == 304
+    assert response.headers['ETag'] == etag
+    assert response.text == ''
+
+    _, response = app.test_client.get(config_url, headers={'If-Modified-Since': last_modified})
+    assert response.status == 304
+
+
+def test_config_endpoint_pretty(app):
+    """Get the Synse Server configuration as pretty-printed JSON."""
+    _, response = app.test_client.get(config_url)
+    assert response.status == 200
+    assert '\n' not in response.text
+
+    _, response = app.test_client.get(config_url + '?pretty')
+    assert response.status == 200
+    assert response.text.startswith('{\n  "')
+    assert ujson.loads(response.text)['locale'] == 'en_US'
+
+    _, response = app.test_client.get(
+        config_url, headers={'Accept': 'application/json; pretty'})
+    assert response.status == 200
+    assert response.text.startswith('{\n  "')
+
+
+def test_config_endpoint_compressed(app, compress_all):
+    """Get the Synse Server configuration compressed."""
+    _, response = app.test_client.get(config_url, headers={'Accept-Encoding': 'gzip'})
+    assert response.status == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept, Accept-Encoding'
+    assert ujson.loads(response.text)['locale'] == 'en_US'
+
+    # the response is formatted before it is compressed
+    _, response = app.test_client.get(
+        config_url + '?pretty', headers={'Accept-Encoding': 'gzip'})
+    assert response.status == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.text.startswith('{\n  "')
+
+    _, response = app.test_client.get(config_url, headers={'Accept-Encoding': 'identity'})
+    assert response.status == 200
+    assert 'Content-Encoding' not in response.headers
 
 
 def test_config_endpoint_post_not_allowed(app):
@@ -18,6 +18,22 @@ def test_plugins_endpoint_ok(app):
     assert len(data) == 0
 
 
+def test_plugins_endpoint_not_modified(app):
+    """Test getting a plugins response which the client already has."""
+    _, response = app.test_client.get(plugins_url)
+    assert response.status == 200
+    etag = response.headers['ETag']
+    last_modified = response.headers['Last-Modified']
+
+    _, response = app.test_client.get(plugins_url, headers={'If-None-Match': etag})
+    assert response.status == 304
+    assert response.headers['ETag'] == etag
+    assert response.text == ''
+
+    _, response = app.test_client.get(plugins_url, headers={'If-Modified-Since': last_modified})
+    assert response.status == 304
+
+
 def test_plugins_endpoint_post_not_allowed(app):
     """Invalid request: POST"""
     _, response = app.test_client.post(plugins_url)
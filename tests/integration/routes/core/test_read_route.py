@@ -1,11 +1,14 @@
 """Test the 'synse.routes.core' module's read route."""
 # pylint: disable=redefined-outer-name,unused-argument
 
+import ujson
+
 from synse import errors
 from synse.version import __api_version__
 from tests import utils
 
 invalid_read_url = '/synse/{}/read/invalid-rack/invalid-board/invalid-device'.format(__api_version__)
+batch_read_url = '/synse/{}/read'.format(__api_version__)
 
 
 def test_read_endpoint_invalid(app):
@@ -53,3 +56,50 @@ def test_read_endpoint_options_not_allowed(app):
     """Invalid request: OPTIONS"""
     _, response = app.test_client.options(invalid_read_url)
     assert response.status == 405
+
+
+def test_batch_read_endpoint_ok(app):
+    """Test getting a batch read response.
+
+    Since the emulator plugin is not enabled, there are no devices to read.
+    """
+    _, response = app.test_client.get(batch_read_url)
+    assert response.status == 200
+
+    data = ujson.loads(response.text)
+    assert data == {'readings': []}
+
+
+def test_batch_read_endpoint_post_invalid_device(app):
+    """Test a batch read of an unknown device.
+
+    The error for the device is returned as part of the response,
+    rather than failing the request.
+    """
+    payload = [{'rack': 'invalid-rack', 'board': 'invalid-board', 'device': 'invalid-device'}]
+    _, response = app.test_client.post(batch_read_url, data=ujson.dumps(payload))
+    assert response.status == 200
+
+    data = ujson.loads(response.text)
+    assert len(data['readings']) == 1
+    assert data['readings'][0]['location'] == payload[0]
+    assert data['readings'][0]['error']['error_id'] == errors.DEVICE_NOT_FOUND
+    assert data['readings'][0]['error']['http_code'] == 404
+
+
+def test_batch_read_endpoint_post_invalid(app):
+    """Test a batch read with invalid data POSTed."""
+    _, response = app.test_client.post(batch_read_url, data=ujson.dumps({'rack': 'rack-1'}))
+    utils.test_error_json(response, errors.INVALID_ARGUMENTS, 400)
+
+
+def test_batch_read_endpoint_put_not_allowed(app):
+    """Invalid request: PUT"""
+    _, response = app.test_client.put(batch_read_url)
+    assert response.status == 405
+
+
+def test_batch_read_endpoint_delete_not_allowed(app):
+    """Invalid request: DELETE"""
+    _, response = app.test_client.delete(batch_read_url)
+    assert response.status == 405
@@ -25,6 +25,31 @@ def test_scan_endpoint_ok(app):
     assert data == {}
 
 
+def test_scan_endpoint_validator(app):
+    """Test getting the validator headers of a scan response.
+
+    Since there are no devices, no snapshot is kept between requests, so
+    each scan is a new version of the data.
+    """
+    _, response = app.test_client.get(scan_url)
+    assert response.status == 200
+    etag = response.headers['ETag']
+    assert etag.startswith('W/"')
+    assert 'Last-Modified' in response.headers
+
+    _, response = app.test_client.get(scan_url, headers={'If-None-Match': etag})
+    assert response.status == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_scan_endpoint_compressed(app, compress_all):
+    """Test getting a compressed scan response."""
+    _, response = app.test_client.get(scan_url, headers={'Accept-Encoding': 'deflate'})
+    assert response.status == 200
+    assert response.headers['Content-Encoding'] == 'deflate'
+    assert ujson.loads(response.text) == {}
+
+
 def test_scan_endpoint_post_not_allowed(app):
     """Invalid request: POST"""
     _, response = app.test_client.post(scan_url)
@@ -1,11 +1,14 @@
 """Test the 'synse.routes.core' module's transaction route."""
 # pylint: disable=redefined-outer-name,unused-argument
 
+import ujson
+
 from synse import errors
 from synse.version import __api_version__
 from tests import utils
 
 invalid_transaction_url = '/synse/{}/transaction/invalid-id'.format(__api_version__)
+batch_transaction_url = '/synse/{}/transaction'.format(__api_version__)
 
 
 def test_transaction_endpoint_invalid(app):
@@ -14,6 +17,57 @@ def test_transaction_endpoint_invalid(app):
     utils.test_error_json(response, errors.TRANSACTION_NOT_FOUND, 404)
 
 
+def test_transaction_endpoint_list(app):
+    """Test listing transactions, with filters and pagination."""
+    _, response = app.test_client.get(
+        batch_transaction_url + '?plugin=foo&status=pending&offset=0&limit=10'
+    )
+    assert response.status == 200
+    assert ujson.loads(response.text) == []
+
+
+def test_transaction_endpoint_list_bad_param(app):
+    """Test listing transactions with an unsupported query parameter."""
+    _, response = app.test_client.get(batch_transaction_url + '?context=foo')
+    utils.test_error_json(response, errors.INVALID_ARGUMENTS, 400)
+
+
+def test_transaction_endpoint_wait_invalid(app):
+    """Test waiting on an invalid transaction, which fails right away."""
+    _, response = app.test_client.get(invalid_transaction_url + '?wait=10')
+    utils.test_error_json(response, errors.TRANSACTION_NOT_FOUND, 404)
+
+
+def test_transaction_endpoint_wait_bad_value(app):
+    """Test waiting on a transaction with an invalid wait time."""
+    _, response = app.test_client.get(invalid_transaction_url + '?wait=soon')
+    utils.test_error_json(response, errors.INVALID_ARGUMENTS, 400)
+
+
+def test_batch_transaction_endpoint_invalid(app):
+    """Test checking many transactions, which are all invalid."""
+    _, response = app.test_client.post(
+        batch_transaction_url,
+        data=ujson.dumps(['invalid-1', 'invalid-2'])
+    )
+    assert response.status == 200
+
+    data = ujson.loads(response.text)
+    assert [t['id'] for t in data['transactions']] == ['invalid-1', 'invalid-2']
+    for t in data['transactions']:
+        assert t['error']['error_id'] == errors.TRANSACTION_NOT_FOUND
+        assert t['error']['http_code'] == 404
+
+
+def test_batch_transaction_endpoint_bad_data(app):
+    """Test checking many transactions, with invalid data POSTed."""
+    _, response = app.test_client.post(
+        batch_transaction_url,
+        data=ujson.dumps({'id': 'invalid-1'})
+    )
+    utils.test_error_json(response, errors.INVALID_ARGUMENTS, 400)
+
+
 def test_transaction_endpoint_post_not_allowed(app):
     """Invalid request: POST"""
     _, response = app.test_client.post(invalid_transaction_url)
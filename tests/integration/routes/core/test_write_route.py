@@ -8,6 +8,7 @@ from synse.version import __api_version__
 from tests import utils
 
 invalid_write_url = '/synse/{}/write/invalid-rack/invalid-board/invalid-device'.format(__api_version__)
+batch_write_url = '/synse/{}/write'.format(__api_version__)
 
 
 def test_write_invalid_endpoint_valid_data(app):
@@ -103,3 +104,55 @@ def test_write_endpoint_options_not_allowed(app):
     """Invalid request: OPTIONS"""
     _, response = app.test_client.options(invalid_write_url)
     assert response.status == 405
+
+
+def test_batch_write_endpoint_invalid_device(app):
+    """Test a batch write to an unknown device.
+
+    The error for the device is returned as part of the response,
+    rather than failing the request.
+    """
+    payload = [{
+        'rack': 'invalid-rack',
+        'board': 'invalid-board',
+        'device': 'invalid-device',
+        'action': 'valid'
+    }]
+    _, response = app.test_client.post(batch_write_url, data=ujson.dumps(payload))
+    assert response.status == 200
+
+    data = ujson.loads(response.text)
+    assert len(data['writes']) == 1
+    assert data['writes'][0]['location'] == {
+        'rack': 'invalid-rack',
+        'board': 'invalid-board',
+        'device': 'invalid-device'
+    }
+    assert data['writes'][0]['error']['error_id'] == errors.DEVICE_NOT_FOUND
+    assert data['writes'][0]['error']['http_code'] == 404
+
+
+def test_batch_write_endpoint_selectors(app):
+    """Test a batch write to the devices matching selectors.
+
+    Since the emulator plugin is not enabled, there are no devices to write to.
+    """
+    payload = {'selectors': {'type': 'led'}, 'action': 'valid'}
+    _, response = app.test_client.post(batch_write_url, data=ujson.dumps(payload))
+    assert response.status == 200
+
+    data = ujson.loads(response.text)
+    assert data == {'writes': []}
+
+
+def test_batch_write_endpoint_invalid_data(app):
+    """Test a batch write with invalid data POSTed."""
+    payload = [{'rack': 'invalid-rack', 'action': 'valid'}]
+    _, response = app.test_client.post(batch_write_url, data=ujson.dumps(payload))
+    utils.test_error_json(response, errors.INVALID_ARGUMENTS, 400)
+
+
+def test_batch_write_endpoint_get_not_allowed(app):
+    """Invalid request: GET"""
+    _, response = app.test_client.get(batch_write_url)
+    assert response.status == 405
@@ -0,0 +1,122 @@
+"""Test the 'synse.commands.fan_sensors' Synse Server module."""
+# pylint: disable=redefined-outer-name,unused-argument
+
+import importlib
+
+import asynctest
+import pytest
+from synse_plugin import api
+
+import synse.cache
+from synse import errors
+from synse.commands.fan_sensors import fan_sensors
+from synse.scheme import BatchReadResponse, ReadResponse
+
+# The fan_sensors module is shadowed by the fan_sensors command function in
+# the synse.commands package, so get the module itself for monkeypatching.
+fan_sensors_module = importlib.import_module('synse.commands.fan_sensors')
+
+
+def make_device(rack, uid, dtype, model, info):
+    """Helper method to make a new MetainfoResponse object."""
+    return api.MetainfoResponse(
+        timestamp='october',
+        uid=uid,
+        type=dtype,
+        model=model,
+        manufacturer='vapor io',
+        protocol='i2c',
+        info=info,
+        location=api.MetaLocation(
+            rack=rack,
+            board='vec'
+        ),
+        output=[
+            api.MetaOutput(
+                type=dtype,
+                data_type='float',
+                precision=2,
+            )
+        ]
+    )
+
+
+DEVICES = [
+    make_device('rack-2', '1', 'temperature', 'MAX11610', 'Rack Temperature 0 Front'),
+    make_device('rack-1', '2', 'temperature', 'MAX11610', 'Rack Temperature 1 Back'),
+    make_device('rack-1', '3', 'pressure', 'SDP610', 'Rack Differential Pressure Top'),
+    make_device('rack-1', '4', 'temperature', 'other', 'Rack Temperature 2 Back'),
+    make_device('rack-1', '5', 'pressure', 'SDP610', 'Rack Differential Pressure Bottom'),
+]
+
+
+def mockgetsnapshot():
+    """Mock method to monkeypatch the get_snapshot method."""
+    return synse.cache.MetainfoSnapshot(
+        {'foo': synse.cache.MetainfoPartition('foo', {
+            'rack-vec-{}'.format(d.uid): d for d in DEVICES
+        })},
+        1
+    )
+
+
+def mockbatchread(devices=None, selectors=None):
+    """Mock method to monkeypatch the batch_read command."""
+    metainfo = {d.uid: d for d in DEVICES}
+
+    results, read_times = [], []
+    for _, _, device in devices:
+        dev = metainfo[device]
+        if device == '5':
+            results.append(errors.FailedReadCommandError('failed'))
+            read_times.append(0.5)
+        else:
+            results.append(ReadResponse(dev, [
+                api.ReadResponse(timestamp='october', type=dev.type, value=device)
+            ]))
+            read_times.append(int(device) / 10)
+
+    return BatchReadResponse(devices, results, read_times)
+
+
+@pytest.fixture()
+def mock_fan_sensors(monkeypatch):
+    """Fixture to monkeypatch the cache snapshot and batch read."""
+    monkeypatch.setattr(
+        synse.cache, 'get_snapshot',
+        asynctest.CoroutineMock(synse.cache.get_snapshot, side_effect=mockgetsnapshot)
+    )
+    mock = asynctest.CoroutineMock(side_effect=mockbatchread)
+    monkeypatch.setattr(fan_sensors_module, 'batch_read', mock)
+    return mock
+
+
+@pytest.mark.asyncio
+async def test_fan_sensors_command(mock_fan_sensors):
+    """Get the fan sensor readings."""
+
+    result = await fan_sensors()
+
+    # only the fan sensor devices are read, in a single batch
+    mock_fan_sensors.assert_called_once_with(devices=[
+        ('rack-1', 'vec', '2'),
+        ('rack-2', 'vec', '1'),
+        ('rack-1', 'vec', '3'),
+        ('rack-1', 'vec', '5'),
+    ])
+
+    assert list(result['racks']) == ['rack-1', 'rack-2']
+
+    rack1 = result['racks']['rack-1']
+    assert rack1['thermistor_1'] == 2.0
+    assert rack1['differential_pressure_2'] == 3.0
+    assert 'differential_pressure_0' not in rack1
+    assert rack1['read_time'] == pytest.approx(300)
+
+    rack2 = result['racks']['rack-2']
+    assert rack2['thermistor_0'] == 1.0
+    assert rack2['read_time'] == pytest.approx(100)
+
+    for rack in result['racks'].values():
+        assert 'start_time' in rack
+        assert 'end_time' in rack
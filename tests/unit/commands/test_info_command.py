@@ -30,11 +30,18 @@ def mockreturn():
     }
 
 
+def mocksnapshot():
+    """Mock method that will be used in monkeypatching the snapshot lookup."""
+    snapshot = synse.cache.MetainfoSnapshot({}, 1)
+    snapshot.info = mockreturn()
+    return snapshot
+
+
 @pytest.fixture()
 def mock_info(monkeypatch):
     """Fixture to monkeypatch the underlying Synse cache lookup."""
-    mock = asynctest.CoroutineMock(synse.cache.get_resource_info_cache, side_effect=mockreturn)
-    monkeypatch.setattr(synse.cache, 'get_resource_info_cache', mock)
+    mock = asynctest.CoroutineMock(synse.cache.get_snapshot, side_effect=mocksnapshot)
+    monkeypatch.setattr(synse.cache, 'get_snapshot', mock)
     return mock_info
 
 
@@ -116,6 +123,22 @@ async def test_info_command_invalid_device(mock_info):
         await info(rack='rack-1', board='vec', device='foo')
 
 
+@pytest.mark.asyncio
+async def test_info_command_encoded(monkeypatch):
+    """The info data is encoded once per snapshot."""
+
+    snapshot = mocksnapshot()
+    monkeypatch.setattr(
+        synse.cache, 'get_snapshot',
+        asynctest.CoroutineMock(synse.cache.get_snapshot, return_value=snapshot)
+    )
+
+    resp = await info('rack-1', 'vec', '12345')
+    assert resp.encoded is not None
+    assert (await info('rack-1', 'vec', '12345')).encoded is resp.encoded
+    assert (await info('rack-1', 'vec')).encoded is not resp.encoded
+
+
 def test_get_resources_all_none():
     """Get resources when rack, board, device are None."""
 
@@ -7,7 +7,7 @@ import shutil
 import pytest
 
 from synse import plugin
-from synse.commands.plugins import get_plugins
+from synse.commands.plugins import get_plugins, plugins_validator
 from synse.scheme.plugins import PluginsResponse
 
 
@@ -81,3 +81,30 @@ async def test_plugins_command_plugin(mock_plugin, disable_register, cleanup):
             'address': 'localhost:9999'
         }
     ]
+
+
+@pytest.mark.asyncio
+async def test_plugins_command_validator(disable_register, cleanup):
+    """The plugins response validator changes when the plugins change."""
+    c = await get_plugins()
+    validator = c.validator
+    assert (await get_plugins()).validator.etag == validator.etag
+
+    plugin.Plugin(name='test-plug', address='localhost:9999', mode='tcp')
+
+    c = await get_plugins()
+    assert c.validator.etag != validator.etag
+
+
+@pytest.mark.asyncio
+async def test_plugins_command_no_register(mock_plugin, cleanup, monkeypatch):
+    """The plugins are not registered again if they were just registered."""
+
+    def fail():
+        """Fail if the plugins are registered."""
+        raise AssertionError('plugins registered')
+    monkeypatch.setattr(plugin, 'register_plugins', fail)
+
+    c = await get_plugins(register=False)
+    assert len(c.data) == 1
+    assert c.validator.etag == plugins_validator().etag
@@ -1,6 +1,7 @@
 """Test the 'synse.commands.read' Synse Server module."""
 # pylint: disable=redefined-outer-name,unused-argument
 
+import asyncio
 import os
 import shutil
 
@@ -10,10 +11,10 @@ import pytest
 from synse_plugin import api
 
 import synse.cache
-from synse import errors, plugin
-from synse.commands.read import read
+from synse import config, errors, plugin
+from synse.commands.read import batch_read, read
 from synse.proto.client import SynseInternalClient
-from synse.scheme.read import ReadResponse
+from synse.scheme.read import BatchReadResponse, ReadResponse
 
 
 @pytest.fixture(scope='module')
@@ -34,7 +35,7 @@ def setup():
 
 
 def mockgetdevicemeta(rack, board, device):
-    """Mock method to monkeypatch the get_device_meta method."""
+    """Helper method to make the plugin name and metainfo for a device."""
     # the plugin name 'foo' here corresponds to the plugin generated by
     # the `make_plugin` fixture
     return 'foo', api.MetainfoResponse(
@@ -67,7 +68,7 @@ def mockgetdevicemeta(rack, board, device):
     )
 
 
-def mockread(self, rack, board, device):
+async def mockread(self, rack, board, device):
     """Mock method to monkeypatch the client read method."""
     return [api.ReadResponse(
         timestamp='october',
@@ -76,17 +77,59 @@ def mockread(self, rack, board, device):
     )]
 
 
-def mockreadfail(self, rack, board, device):
+def mockgetsnapshot():
+    """Mock method to monkeypatch the get_snapshot method."""
+    _, dev = mockgetdevicemeta('rack-1', 'vec', '12345')
+    _, other = mockgetdevicemeta('rack-1', 'vec', '12345')
+    other.uid = '67890'
+    other.type = 'led'
+
+    return synse.cache.MetainfoSnapshot(
+        {
+            'foo': synse.cache.MetainfoPartition('foo', {
+                'rack-1-vec-12345': dev,
+                'rack-1-vec-67890': other,
+            }),
+        },
+        1
+    )
+
+
+async def mockreadfail(self, rack, board, device):
     """Mock method to monkeypatch the client read method to fail."""
     raise grpc.RpcError()
 
 
+def make_client_read(mock):
+    """Make a client read method which calls through to the given mock, so
+    the calls to it can be checked.
+    """
+    async def client_read(self, rack, board, device):
+        """Mock method for the gRPC client's read method."""
+        return await mock(self, rack, board, device)
+    return client_read
+
+
+def mockresolvedevice(rack, board, device):
+    """Mock method to monkeypatch the resolve_device method."""
+    plugin_name, dev = mockgetdevicemeta(rack, board, device)
+    return synse.cache.ResolvedDevice(rack, board, device, plugin_name, dev)
+
+
+@pytest.fixture()
+def mock_resolve_device(monkeypatch):
+    """Fixture to monkeypatch the cache device resolution."""
+    mock = asynctest.CoroutineMock(synse.cache.resolve_device, side_effect=mockresolvedevice)
+    monkeypatch.setattr(synse.cache, 'resolve_device', mock)
+    return mock
+
+
 @pytest.fixture()
-def mock_get_device_meta(monkeypatch):
-    """Fixture to monkeypatch the cache device meta lookup."""
-    mock = asynctest.CoroutineMock(synse.cache.get_device_meta, side_effect=mockgetdevicemeta)
-    monkeypatch.setattr(synse.cache, 'get_device_meta', mock)
-    return mock_get_device_meta
+def mock_get_snapshot(monkeypatch):
+    """Fixture to monkeypatch the cache snapshot lookup."""
+    mock = asynctest.CoroutineMock(synse.cache.get_snapshot, side_effect=mockgetsnapshot)
+    monkeypatch.setattr(synse.cache, 'get_snapshot', mock)
+    return mock_get_snapshot
 
 
 @pytest.fixture()
@@ -130,7 +173,7 @@ async def test_read_command_no_device():
 
 
 @pytest.mark.asyncio
-async def test_read_command_no_plugin(mock_get_device_meta):
+async def test_read_command_no_plugin(mock_resolve_device):
     """Get a ReadResponse when the plugin doesn't exist."""
 
     # FIXME - it would be nice to use pytest.raises, but it seems like it isn't
@@ -142,7 +185,7 @@ async def test_read_command_no_plugin(mock_get_device_meta):
 
 
 @pytest.mark.asyncio
-async def test_read_command_grpc_err(mock_get_device_meta, mock_client_read_fail, make_plugin):
+async def test_read_command_grpc_err(mock_resolve_device, mock_client_read_fail, make_plugin):
     """Get a ReadResponse when the plugin exists but cant communicate with it."""
 
     # FIXME - it would be nice to use pytest.raises, but it seems like it isn't
@@ -154,7 +197,7 @@ async def test_read_command_grpc_err(mock_get_device_meta, mock_client_read_fail
 
 
 @pytest.mark.asyncio
-async def test_read_command(mock_get_device_meta, mock_client_read, make_plugin):
+async def test_read_command(mock_resolve_device, mock_client_read, make_plugin):
     """Get a ReadResponse when the plugin exists."""
 
     resp = await read('rack-1', 'vec', '12345')
@@ -173,3 +216,197 @@ async def test_read_command(mock_get_device_meta, mock_client_read, make_plugin)
             }
         }
     }
+
+
+@pytest.mark.asyncio
+async def test_read_command_resolved(mock_resolve_device, mock_client_read, make_plugin):
+    """Read a device which has already been resolved."""
+
+    resolved = mockresolvedevice('rack-1', 'vec', '12345')
+
+    resp = await read('rack-1', 'vec', '12345', resolved=resolved)
+
+    assert isinstance(resp, ReadResponse)
+    assert resp.data['data']['temperature']['value'] == 10.0
+
+    # the device is not looked up again
+    mock_resolve_device.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_read_command(mock_get_snapshot, mock_client_read, make_plugin):
+    """Get a BatchReadResponse for a list of devices."""
+
+    resp = await batch_read(devices=[
+        ('rack-1', 'vec', '12345'),
+        ('rack-1', 'vec', 'unknown'),
+        ('rack-1', 'vec', '67890'),
+    ])
+
+    assert isinstance(resp, BatchReadResponse)
+    assert len(resp.results) == 3
+
+    assert isinstance(resp.results[0], ReadResponse)
+    assert resp.results[0].data['type'] == 'thermistor'
+
+    assert isinstance(resp.results[1], errors.DeviceNotFoundError)
+
+    assert isinstance(resp.results[2], ReadResponse)
+    assert resp.results[2].device.uid == '67890'
+
+
+@pytest.mark.asyncio
+async def test_batch_read_command_filter(mock_get_snapshot, mock_client_read, make_plugin):
+    """Get a BatchReadResponse for the devices selected by a filter."""
+
+    resp = await batch_read(selectors={'rack': 'rack-1', 'type': 'LED'})
+
+    assert isinstance(resp, BatchReadResponse)
+    assert resp.devices == [('rack-1', 'vec', '67890')]
+    assert isinstance(resp.results[0], ReadResponse)
+
+    resp = await batch_read(selectors={'rack': 'rack-1', 'board': 'vec'})
+    assert resp.devices == [('rack-1', 'vec', '12345'), ('rack-1', 'vec', '67890')]
+
+    resp = await batch_read()
+    assert resp.devices == [('rack-1', 'vec', '12345'), ('rack-1', 'vec', '67890')]
+
+    resp = await batch_read(selectors={'rack': 'rack-2'})
+    assert resp.devices == []
+    assert resp.data == {'readings': []}
+
+
+@pytest.mark.asyncio
+async def test_batch_read_command_no_plugin(mock_get_snapshot):
+    """Get a BatchReadResponse when the plugin doesn't exist."""
+
+    resp = await batch_read(devices=[('rack-1', 'vec', '12345')])
+
+    assert isinstance(resp, BatchReadResponse)
+    assert isinstance(resp.results[0], errors.PluginNotFoundError)
+
+
+@pytest.mark.asyncio
+async def test_batch_read_command_grpc_err(mock_get_snapshot, mock_client_read_fail, make_plugin):
+    """Get a BatchReadResponse when the plugin exists but cant communicate with it."""
+
+    resp = await batch_read(devices=[('rack-1', 'vec', '12345'), ('rack-1', 'vec', '67890')])
+
+    assert isinstance(resp, BatchReadResponse)
+    for result in resp.results:
+        assert isinstance(result, errors.FailedReadCommandError)
+
+
+@pytest.mark.asyncio
+async def test_batch_read_command_bad_selector(mock_get_snapshot):
+    """Get a BatchReadResponse when an unsupported selector is given."""
+
+    with pytest.raises(errors.InvalidArgumentsError):
+        await batch_read(selectors={'color': 'red'})
+
+
+@pytest.mark.asyncio
+async def test_batch_read_command_concurrency(mock_get_snapshot, make_plugin, monkeypatch):
+    """The number of concurrent reads to a plugin is bounded in a batch read."""
+
+    config.options.set('grpc.max_concurrent_reads', 2)
+
+    state = {'in_flight': 0, 'max': 0}
+
+    async def mockreadslow(self, rack, board, device):
+        """Mock read which tracks how many reads are in flight at once."""
+        state['in_flight'] += 1
+        state['max'] = max(state['max'], state['in_flight'])
+        await asyncio.sleep(0.05)
+        state['in_flight'] -= 1
+        return await mockread(self, rack, board, device)
+
+    monkeypatch.setattr(SynseInternalClient, 'read', mockreadslow)
+
+    resp = await batch_read(devices=[('rack-1', 'vec', '12345'), ('rack-1', 'vec', '67890')] * 3)
+
+    assert len(resp.results) == 6
+    for result in resp.results:
+        assert isinstance(result, ReadResponse)
+    for read_time in resp.read_times:
+        assert 0 < read_time < 1
+    assert state['max'] == 2
+
+
+@pytest.mark.asyncio
+async def test_read_command_cached(mock_resolve_device, make_plugin, clear_caches, monkeypatch):
+    """Read a device when its readings are cached."""
+
+    config.options.set('cache.read.ttl', 10)
+    mock = asynctest.CoroutineMock(side_effect=mockread)
+    monkeypatch.setattr(SynseInternalClient, 'read', make_client_read(mock))
+
+    resp = await read('rack-1', 'vec', '12345')
+    assert isinstance(resp, ReadResponse)
+    assert resp.data['cached'] is False
+    assert resp.data['age'] < 1
+    assert resp.data['data']['temperature']['value'] == 10.0
+
+    await asyncio.sleep(0.01)
+
+    resp = await read('rack-1', 'vec', '12345')
+    assert isinstance(resp, ReadResponse)
+    assert resp.data['cached'] is True
+    assert 0 < resp.data['age'] < 1
+    assert resp.data['data']['temperature']['value'] == 10.0
+
+    assert mock.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_read_command_cached_type_ttl(mock_resolve_device, make_plugin, clear_caches,
+                                            monkeypatch):
+    """Read a device when caching is disabled for its type."""
+
+    config.options.set('cache.read.ttl', 10)
+    config.options.set('cache.read.types', {'thermistor': 0})
+    mock = asynctest.CoroutineMock(side_effect=mockread)
+    monkeypatch.setattr(SynseInternalClient, 'read', make_client_read(mock))
+
+    for _ in range(2):
+        resp = await read('rack-1', 'vec', '12345')
+        assert 'cached' not in resp.data
+        assert 'age' not in resp.data
+
+    assert mock.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_read_command_cached_coalesced(mock_resolve_device, make_plugin, clear_caches,
+                                             monkeypatch):
+    """Concurrent reads of a device which miss the read cache result in a single read."""
+
+    config.options.set('cache.read.types', {'thermistor': 10})
+
+    async def mockreadslow(self, rack, board, device):
+        """Mock read which takes a while to complete."""
+        await asyncio.sleep(0.05)
+        return await mockread(self, rack, board, device)
+
+    mock = asynctest.CoroutineMock(side_effect=mockreadslow)
+    monkeypatch.setattr(SynseInternalClient, 'read', make_client_read(mock))
+
+    results = await asyncio.gather(*[read('rack-1', 'vec', '12345') for _ in range(5)])
+    for resp in results:
+        assert resp.data['cached'] is False
+        assert resp.data['data']['temperature']['value'] == 10.0
+
+    assert mock.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_read_command_cached_grpc_err(mock_resolve_device, mock_client_read_fail,
+                                            make_plugin, clear_caches):
+    """Failed reads are not cached."""
+
+    config.options.set('cache.read.ttl', 10)
+
+    with pytest.raises(errors.FailedReadCommandError):
+        await read('rack-1', 'vec', '12345')
+
+    assert await synse.cache.get_reading('rack-1-vec-12345') is None
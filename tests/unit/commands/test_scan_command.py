@@ -44,14 +44,29 @@ def mockregister():
     return True
 
 
+def mocksnapshot():
+    """Mock method that will be used in monkeypatching the snapshot lookup."""
+    snapshot = synse.cache.MetainfoSnapshot({}, 1)
+    snapshot.scan = mockreturn()
+    return snapshot
+
+
 @pytest.fixture()
 def mock_scan(monkeypatch):
     """Fixture to monkeypatch the underlying Synse cache lookup."""
-    mock = asynctest.CoroutineMock(synse.cache.get_scan_cache, side_effect=mockreturn)
-    monkeypatch.setattr(synse.cache, 'get_scan_cache', mock)
+    mock = asynctest.CoroutineMock(synse.cache.get_snapshot, side_effect=mocksnapshot)
+    monkeypatch.setattr(synse.cache, 'get_snapshot', mock)
     return mock_scan
 
 
+@pytest.fixture()
+def mock_refresh(monkeypatch):
+    """Fixture to monkeypatch the Synse cache plugin refresh."""
+    mock = asynctest.CoroutineMock(synse.cache.refresh_plugin_metainfo)
+    monkeypatch.setattr(synse.cache, 'refresh_plugin_metainfo', mock)
+    return mock
+
+
 @pytest.fixture()
 def mock_register(monkeypatch):
     """Fixture to monkeypatch the plugin's register_plugins method."""
@@ -113,3 +128,62 @@ async def test_scan_command_forced(mock_scan, mock_register):
 
     assert isinstance(resp, ScanResponse)
     assert resp.data == mockreturn()
+
+
+@pytest.mark.asyncio
+async def test_scan_command_forced_plugin(mock_scan, mock_register, mock_refresh, monkeypatch):
+    """Get a ScanResponse when a re-scan of a single plugin is forced."""
+
+    monkeypatch.setattr(synse.plugin, 'get_plugin', lambda name: 'plugin')
+    clear = asynctest.CoroutineMock(synse.cache.clear_all_meta_caches)
+    monkeypatch.setattr(synse.cache, 'clear_all_meta_caches', clear)
+
+    resp = await scan(force=True, plugin_name='foo')
+
+    assert isinstance(resp, ScanResponse)
+    assert resp.data == mockreturn()
+
+    mock_refresh.assert_called_once_with('foo')
+    clear.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_scan_command_forced_plugin_not_found(mock_scan, mock_register, mock_refresh):
+    """Force a re-scan of a single plugin which does not exist."""
+
+    with pytest.raises(errors.PluginNotFoundError):
+        await scan(force=True, plugin_name='foo')
+
+    mock_refresh.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_scan_command_plugin_not_forced(mock_scan, mock_register, mock_refresh):
+    """Get a ScanResponse when a plugin is given without forcing a re-scan."""
+
+    resp = await scan(plugin_name='foo')
+
+    assert isinstance(resp, ScanResponse)
+    assert resp.data == mockreturn()
+
+    mock_refresh.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_scan_command_encoded(monkeypatch, mock_register):
+    """The scan data is encoded once per snapshot."""
+
+    snapshot = mocksnapshot()
+    monkeypatch.setattr(
+        synse.cache, 'get_snapshot',
+        asynctest.CoroutineMock(synse.cache.get_snapshot, return_value=snapshot)
+    )
+
+    resp = await scan()
+    assert resp.encoded is not None
+    assert (await scan()).encoded is resp.encoded
+
+    resp = await scan(rack='rack-1')
+    assert resp.encoded is not None
+    assert (await scan(rack='rack-1')).encoded is resp.encoded
+    assert (await scan()).encoded is not resp.encoded
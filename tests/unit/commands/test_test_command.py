@@ -2,7 +2,7 @@
 
 import pytest
 
-from synse import commands
+from synse import cache, commands, utils
 from synse.scheme.test import TestResponse as TR
 
 
@@ -12,3 +12,20 @@ async def test_test_command():
 
     t = await commands.test()
     assert isinstance(t, TR)
+
+
+@pytest.mark.asyncio
+async def test_test_command_cache_metrics(monkeypatch):
+    """The test response includes the cache coalescing metrics."""
+
+    rebuilds = utils.SingleFlight()
+    rebuilds.calls, rebuilds.coalesced = 3, 12
+    monkeypatch.setattr(cache, 'metainfo_rebuilds', rebuilds)
+    monkeypatch.setattr(cache, 'device_reads', utils.SingleFlight())
+
+    t = await commands.test()
+    assert t.data['status'] == 'ok'
+    assert t.data['cache'] == {
+        'metainfo_rebuilds': {'calls': 3, 'coalesced': 12},
+        'device_reads': {'calls': 0, 'coalesced': 0},
+    }
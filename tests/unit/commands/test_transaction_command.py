@@ -8,10 +8,12 @@ import pytest
 from synse_plugin import api
 
 import synse.cache
-from synse import errors, plugin
-from synse.commands.transaction import check_transaction
+from synse import errors, plugin, watcher
+from synse.commands.transaction import (check_transaction, check_transactions,
+                                        list_transactions)
 from synse.proto.client import SynseInternalClient
-from synse.scheme.transaction import (TransactionListResponse,
+from synse.scheme.transaction import (BatchTransactionResponse,
+                                      TransactionListResponse,
                                       TransactionResponse)
 
 
@@ -28,7 +30,7 @@ def mockgettransaction(transaction):
     }
 
 
-def mockchecktransaction(self, transaction_id):
+async def mockchecktransaction(self, transaction_id):
     """Mock method to monkeypatch the client check_transaction method."""
     return api.WriteResponse(
         created='october',
@@ -38,7 +40,7 @@ def mockchecktransaction(self, transaction_id):
     )
 
 
-def mockchecktransactionfail(self, transaction_id):
+async def mockchecktransactionfail(self, transaction_id):
     """Mock method to monkeypatch the client check_transaction method to fail."""
     raise grpc.RpcError()
 
@@ -167,3 +169,137 @@ async def test_transaction_none2(clear_caches):
     assert isinstance(resp, TransactionListResponse)
     assert len(resp.data) == 1
     assert 'abc123' in resp.data
+
+
+@pytest.mark.asyncio
+async def test_transactions_command(mock_client_transaction, make_plugin, clear_caches):
+    """Check many transactions at once, some of which can not be checked."""
+
+    await synse.cache.add_transaction('abc123', {'action': 'foo'}, 'foo')
+    await synse.cache.add_transaction('def456', {'action': 'bar'}, 'foo')
+    await synse.cache.add_transaction('ghi789', {'action': 'baz'}, 'bar')
+
+    resp = await check_transactions(['abc123', 'unknown', 'ghi789', 'def456'])
+
+    assert isinstance(resp, BatchTransactionResponse)
+
+    transactions = resp.data['transactions']
+    assert len(transactions) == 4
+
+    assert transactions[0]['id'] == 'abc123'
+    assert transactions[0]['context'] == {'action': 'foo'}
+    assert transactions[0]['status'] == 'done'
+
+    assert transactions[1]['id'] == 'unknown'
+    assert transactions[1]['error']['error_id'] == errors.TRANSACTION_NOT_FOUND
+
+    assert transactions[2]['id'] == 'ghi789'
+    assert transactions[2]['error']['error_id'] == errors.PLUGIN_NOT_FOUND
+
+    assert transactions[3]['id'] == 'def456'
+    assert transactions[3]['context'] == {'action': 'bar'}
+
+
+@pytest.mark.asyncio
+async def test_transactions_command_grpc_err(mock_client_transaction_fail, make_plugin,
+                                             clear_caches):
+    """Check many transactions at once when the plugin can't be communicated with."""
+
+    await synse.cache.add_transaction('abc123', {'action': 'foo'}, 'foo')
+
+    resp = await check_transactions(['abc123'])
+
+    assert resp.data['transactions'][0]['id'] == 'abc123'
+    assert resp.data['transactions'][0]['error']['error_id'] == errors.FAILED_TRANSACTION_COMMAND
+
+
+@pytest.mark.asyncio
+async def test_transactions_command_empty(clear_caches):
+    """Check an empty list of transactions."""
+
+    resp = await check_transactions([])
+    assert resp.data == {'transactions': []}
+
+
+@pytest.mark.asyncio
+async def test_transaction_command_wait(mock_get_transaction, mock_client_transaction_fail,
+                                        make_plugin, monkeypatch):
+    """Wait for a transaction to complete."""
+
+    mock = asynctest.CoroutineMock(
+        watcher.wait,
+        return_value=api.WriteResponse(created='october', updated='november', status=3)
+    )
+    monkeypatch.setattr(watcher, 'wait', mock)
+
+    resp = await check_transaction('foo', wait=5)
+
+    assert resp.data['status'] == 'done'
+    mock.assert_called_once_with(plugin.get_plugin('foo'), 'foo', 5)
+
+
+@pytest.mark.asyncio
+async def test_transaction_command_wait_unchecked(mock_get_transaction, mock_client_transaction,
+                                                  make_plugin, monkeypatch):
+    """Wait for a transaction which the watcher does not check in time."""
+
+    mock = asynctest.CoroutineMock(watcher.wait, return_value=None)
+    monkeypatch.setattr(watcher, 'wait', mock)
+
+    # the transaction is checked directly instead
+    resp = await check_transaction('foo', wait=0)
+
+    assert resp.data['status'] == 'done'
+    mock.assert_not_called()
+
+    resp = await check_transaction('foo', wait=0.1)
+
+    assert resp.data['status'] == 'done'
+    mock.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_transactions_command_wait(mock_client_transaction_fail, make_plugin, clear_caches,
+                                         monkeypatch):
+    """Wait for many transactions to complete."""
+
+    async def mockwait(_plugin, transaction_id, timeout):
+        """Mock method to monkeypatch the watcher's wait method."""
+        if transaction_id == 'def456':
+            raise errors.FailedTransactionCommandError('failed')
+        return api.WriteResponse(created='october', updated='november', status=3)
+
+    monkeypatch.setattr(watcher, 'wait', mockwait)
+
+    await synse.cache.add_transaction('abc123', {'action': 'foo'}, 'foo')
+    await synse.cache.add_transaction('def456', {'action': 'bar'}, 'foo')
+
+    resp = await check_transactions(['abc123', 'def456'], wait=5)
+
+    transactions = resp.data['transactions']
+    assert transactions[0]['status'] == 'done'
+    assert transactions[1]['error']['error_id'] == errors.FAILED_TRANSACTION_COMMAND
+
+
+@pytest.mark.asyncio
+async def test_list_transactions_command(mock_client_transaction, make_plugin, clear_caches):
+    """List transactions, filtered by their last known state."""
+
+    await synse.cache.add_transaction('abc123', {'action': 'foo'}, 'foo', ('rack-1', 'vec', '1'))
+    await synse.cache.add_transaction('def456', {'action': 'bar'}, 'foo', ('rack-1', 'vec', '2'))
+
+    resp = await list_transactions(status='pending')
+    assert isinstance(resp, TransactionListResponse)
+    assert resp.data == ['abc123', 'def456']
+
+    # checking a transaction updates its last known status
+    await check_transaction('abc123')
+
+    resp = await list_transactions(status='pending')
+    assert resp.data == ['def456']
+
+    resp = await list_transactions(status='done', device='1')
+    assert resp.data == ['abc123']
+
+    resp = await list_transactions(offset=1, limit=5, plugin='foo')
+    assert resp.data == ['def456']
@@ -1,6 +1,7 @@
 """Test the 'synse.commands.write' Synse Server module."""
 # pylint: disable=redefined-outer-name,unused-argument,line-too-long
 
+import asyncio
 import os
 import shutil
 
@@ -10,10 +11,10 @@ import pytest
 from synse_plugin import api
 
 import synse.cache
-from synse import errors, plugin
-from synse.commands.write import write
+from synse import config, errors, plugin
+from synse.commands.write import batch_write, write
 from synse.proto.client import SynseInternalClient
-from synse.scheme.write import WriteResponse
+from synse.scheme.write import BatchWriteResponse, WriteResponse
 
 
 @pytest.fixture(scope='module')
@@ -34,7 +35,7 @@ def setup():
 
 
 def mockgetdevicemeta(rack, board, device):
-    """Mock method to monkeypatch the get_device_meta method."""
+    """Helper method to make the plugin name and metainfo for a device."""
     # the plugin name 'foo' here corresponds to the plugin generated by
     # the `make_plugin` fixture
     return 'foo', api.MetainfoResponse(
@@ -67,34 +68,89 @@ def mockgetdevicemeta(rack, board, device):
     )
 
 
-def mocktransactionadd(tid, ctx, name):
+def mockgetsnapshot():
+    """Mock method to monkeypatch the get_snapshot method."""
+    _, dev = mockgetdevicemeta('rack-1', 'vec', '12345')
+    _, other = mockgetdevicemeta('rack-1', 'vec', '12345')
+    other.uid = '67890'
+    other.type = 'led'
+    _, orphan = mockgetdevicemeta('rack-1', 'vec', '12345')
+    orphan.uid = '00000'
+    orphan.type = 'led'
+
+    return synse.cache.MetainfoSnapshot(
+        {
+            'foo': synse.cache.MetainfoPartition('foo', {
+                'rack-1-vec-12345': dev,
+                'rack-1-vec-67890': other,
+            }),
+            # a plugin which is not registered
+            'bar': synse.cache.MetainfoPartition('bar', {
+                'rack-1-vec-00000': orphan,
+            }),
+        },
+        1
+    )
+
+
+def mocktransactionadd(tid, ctx, name, device=None):
     """Fixture to mock a failure when adding transaction to cache."""
     return False
 
 
-def mockwrite(self, rack, board, device, data):
+async def mockwrite(self, rack, board, device, data):
     """Mock method to monkeypatch the client write method."""
+    # the first transaction ID is fixed, so it can be checked in tests
+    ids = ['abcdef'] + ['abcdef-{}'.format(i) for i in range(1, len(data))]
     return api.Transactions(
         transactions={
-            'abcdef': api.WriteData(
-                action=data[0].action,
-                raw=data[0].raw
-            )
+            _id: api.WriteData(
+                action=d.action,
+                raw=d.raw
+            ) for _id, d in zip(ids, data)
+        }
+    )
+
+
+async def mockbatchwrite(self, rack, board, device, data):
+    """Mock method to monkeypatch the client write method, which makes
+    transaction IDs unique to the device written to.
+    """
+    return api.Transactions(
+        transactions={
+            '{}-{}'.format(device, i): api.WriteData(
+                action=d.action,
+                raw=d.raw
+            ) for i, d in enumerate(data)
         }
     )
 
 
-def mockwritefail(self, rack, board, device, data):
+async def mockwritefail(self, rack, board, device, data):
     """Mock method to monkeypatch the client write method to fail."""
     raise grpc.RpcError()
 
 
+def mockresolvedevice(rack, board, device):
+    """Mock method to monkeypatch the resolve_device method."""
+    plugin_name, dev = mockgetdevicemeta(rack, board, device)
+    return synse.cache.ResolvedDevice(rack, board, device, plugin_name, dev)
+
+
+@pytest.fixture()
+def mock_resolve_device(monkeypatch):
+    """Fixture to monkeypatch the cache device resolution."""
+    mock = asynctest.CoroutineMock(synse.cache.resolve_device, side_effect=mockresolvedevice)
+    monkeypatch.setattr(synse.cache, 'resolve_device', mock)
+    return mock
+
+
 @pytest.fixture()
-def mock_get_device_meta(monkeypatch):
-    """Fixture to monkeypatch the cache device meta lookup."""
-    mock = asynctest.CoroutineMock(synse.cache.get_device_meta, side_effect=mockgetdevicemeta)
-    monkeypatch.setattr(synse.cache, 'get_device_meta', mock)
-    return mock_get_device_meta
+def mock_get_snapshot(monkeypatch):
+    """Fixture to monkeypatch the cache snapshot lookup."""
+    mock = asynctest.CoroutineMock(synse.cache.get_snapshot, side_effect=mockgetsnapshot)
+    monkeypatch.setattr(synse.cache, 'get_snapshot', mock)
+    return mock_get_snapshot
 
 
 @pytest.fixture()
@@ -147,7 +203,7 @@ async def test_write_command_no_device():
 
 
 @pytest.mark.asyncio
-async def test_write_command_no_plugin(mock_get_device_meta):
+async def test_write_command_no_plugin(mock_resolve_device):
     """Get a WriteResponse when the plugin doesn't exist."""
 
     # FIXME - it would be nice to use pytest.raises, but it seems like it isn't
@@ -160,7 +216,7 @@ async def test_write_command_no_plugin(mock_get_device_meta):
 
 
 @pytest.mark.asyncio
-async def test_write_command_grpc_err(mock_get_device_meta, mock_client_write_fail, make_plugin):
+async def test_write_command_grpc_err(mock_resolve_device, mock_client_write_fail, make_plugin):
     """Get a WriteResponse when the plugin exists but cant communicate with it."""
 
     # FIXME - it would be nice to use pytest.raises, but it seems like it isn't
@@ -173,7 +229,7 @@ async def test_write_command_grpc_err(mock_get_device_meta, mock_client_write_fa
 
 
 @pytest.mark.asyncio
-async def test_write_command(mock_get_device_meta, mock_client_write, make_plugin):
+async def test_write_command(mock_resolve_device, mock_client_write, make_plugin):
     """Get a WriteResponse when the plugin exists."""
 
     data = {'action': 'foo', 'raw': 'bar'}
@@ -192,7 +248,8 @@ async def test_write_command(mock_get_device_meta, mock_client_write, make_plugi
 
 
 @pytest.mark.asyncio
-async def test_write_command_failed_add(mock_get_device_meta, mock_transaction_add, mock_client_write, make_plugin):
+async def test_write_command_failed_add(mock_resolve_device, mock_transaction_add,
+                                        mock_client_write, make_plugin):
     """Get a WriteResponse when the plugin exists but the transaction isn't added."""
 
     data = {'action': 'foo', 'raw': 'bar'}
@@ -214,7 +271,8 @@ async def test_write_command_failed_add(mock_get_device_meta, mock_transaction_a
 
 
 @pytest.mark.asyncio
-async def test_write_command_bad_action_value(mock_get_device_meta, mock_client_write, make_plugin):
+async def test_write_command_bad_action_value(mock_resolve_device, mock_client_write,
+                                              make_plugin):
     """Write when an invalid value is passed in for the action field."""
 
     # FIXME - it would be nice to use pytest.raises, but it seems like it isn't
@@ -227,7 +285,7 @@ async def test_write_command_bad_action_value(mock_get_device_meta, mock_client_
 
 
 @pytest.mark.asyncio
-async def test_write_command_bad_raw_value(mock_get_device_meta, mock_client_write, make_plugin):
+async def test_write_command_bad_raw_value(mock_resolve_device, mock_client_write, make_plugin):
     """Write when an invalid value is passed in for the raw field."""
 
     # FIXME - it would be nice to use pytest.raises, but it seems like it isn't
@@ -237,3 +295,221 @@ async def test_write_command_bad_raw_value(mock_get_device_meta, mock_client_wri
         await write('rack-1', 'vec', '12345', data)
     except errors.SynseError as e:
         assert e.error_id == errors.INVALID_ARGUMENTS
+
+
+@pytest.mark.asyncio
+async def test_write_command_many(mock_resolve_device, make_plugin, clear_caches, monkeypatch):
+    """Write many actions to a device in a single write."""
+
+    calls = []
+
+    async def counting_write(self, rack, board, device, data):
+        """Mock write which records the data written."""
+        calls.append(data)
+        return await mockwrite(self, rack, board, device, data)
+
+    monkeypatch.setattr(SynseInternalClient, 'write', counting_write)
+
+    data = [
+        {'action': 'state', 'raw': 'on'},
+        {'action': 'color', 'raw': 'ff0000'},
+    ]
+    resp = await write('rack-1', 'vec', '12345', data)
+
+    assert len(calls) == 1
+    assert [d.action for d in calls[0]] == ['state', 'color']
+
+    assert isinstance(resp, WriteResponse)
+    assert sorted(resp.data, key=lambda t: t['transaction']) == [
+        {
+            'context': {
+                'action': 'state',
+                'raw': [b'on']
+            },
+            'transaction': 'abcdef'
+        },
+        {
+            'context': {
+                'action': 'color',
+                'raw': [b'ff0000']
+            },
+            'transaction': 'abcdef-1'
+        }
+    ]
+
+    # all of the transactions are tracked, with the device written to
+    for t in resp.data:
+        transaction = await synse.cache.get_transaction(t['transaction'])
+        assert transaction['plugin'] == 'foo'
+        assert transaction['device'] == ('rack-1', 'vec', '12345')
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('data', [
+    [],
+    [{'action': 'state', 'raw': 'on'}, {'action': 1}],
+    [{'action': 'state', 'raw': 'on'}, 'color'],
+])
+async def test_write_command_many_invalid(mock_resolve_device, mock_client_write_fail, make_plugin,
+                                          data):
+    """Write many actions to a device, when some of them are invalid."""
+
+    # the write itself would fail, so an invalid arguments error means
+    # that nothing was written.
+    with pytest.raises(errors.InvalidArgumentsError):
+        await write('rack-1', 'vec', '12345', data)
+
+
+@pytest.mark.asyncio
+async def test_batch_write_command(mock_get_snapshot, make_plugin, clear_caches, monkeypatch):
+    """Write to many devices in a single batch write."""
+
+    calls = []
+
+    async def counting_write(self, rack, board, device, data):
+        """Mock write which records the device and actions written."""
+        calls.append((device, [d.action for d in data]))
+        return await mockbatchwrite(self, rack, board, device, data)
+
+    monkeypatch.setattr(SynseInternalClient, 'write', counting_write)
+
+    resp = await batch_write(writes=[
+        {'rack': 'rack-1', 'board': 'vec', 'device': '67890', 'action': 'state', 'raw': 'on'},
+        {'rack': 'rack-1', 'board': 'vec', 'device': '12345', 'action': 'mode'},
+        {'rack': 'rack-1', 'board': 'vec', 'device': '67890', 'action': 'color', 'raw': 'ff0000'},
+        {'rack': 'rack-1', 'board': 'vec', 'device': '11111', 'action': 'state'},
+        {'rack': 'rack-1', 'board': 'vec', 'device': '00000', 'action': 'state'},
+    ])
+
+    assert isinstance(resp, BatchWriteResponse)
+
+    # the writes to each device are sent in a single write, in order
+    assert sorted(calls) == [('12345', ['mode']), ('67890', ['state', 'color'])]
+
+    writes = resp.data['writes']
+    assert [w['location']['device'] for w in writes] == ['67890', '12345', '11111', '00000']
+    assert sorted(writes[0]['transactions'], key=lambda t: t['transaction']) == [
+        {'context': {'action': 'state', 'raw': [b'on']}, 'transaction': '67890-0'},
+        {'context': {'action': 'color', 'raw': [b'ff0000']}, 'transaction': '67890-1'},
+    ]
+    assert writes[1]['transactions'] == [
+        {'context': {'action': 'mode', 'raw': []}, 'transaction': '12345-0'},
+    ]
+    assert writes[2]['error']['error_id'] == errors.DEVICE_NOT_FOUND
+    assert writes[3]['error']['error_id'] == errors.PLUGIN_NOT_FOUND
+
+    # all of the transactions are tracked, with the device written to
+    for tid, device in [('67890-0', '67890'), ('67890-1', '67890'), ('12345-0', '12345')]:
+        transaction = await synse.cache.get_transaction(tid)
+        assert transaction['plugin'] == 'foo'
+        assert transaction['device'] == ('rack-1', 'vec', device)
+
+
+@pytest.mark.asyncio
+async def test_batch_write_command_selectors(mock_get_snapshot, make_plugin, clear_caches,
+                                             monkeypatch):
+    """Write the same data to all devices matching the selectors."""
+
+    monkeypatch.setattr(SynseInternalClient, 'write', mockbatchwrite)
+
+    resp = await batch_write(
+        selectors={'rack': 'rack-1', 'type': 'led'},
+        data={'action': 'state', 'raw': 'off'}
+    )
+
+    writes = resp.data['writes']
+    assert [w['location']['device'] for w in writes] == ['00000', '67890']
+    assert writes[0]['error']['error_id'] == errors.PLUGIN_NOT_FOUND
+    assert writes[1]['transactions'] == [
+        {'context': {'action': 'state', 'raw': [b'off']}, 'transaction': '67890-0'},
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('selectors', [
+    None,
+    {},
+    {'rack': None},
+    {'rack': None, 'type': None},
+    {'type': ''},
+])
+async def test_batch_write_command_no_selectors(mock_get_snapshot, make_plugin, monkeypatch,
+                                                selectors):
+    """Batch write without any selectors, which would select every device."""
+
+    write = asynctest.CoroutineMock(side_effect=mockwrite)
+    monkeypatch.setattr(SynseInternalClient, 'write', write)
+
+    with pytest.raises(errors.InvalidArgumentsError):
+        await batch_write(selectors=selectors, data={'action': 'state'})
+
+    write.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_write_command_unknown_selector(mock_get_snapshot):
+    """Batch write when an unsupported selector is given."""
+
+    with pytest.raises(errors.InvalidArgumentsError):
+        await batch_write(selectors={'color': 'red'}, data={'action': 'state'})
+
+
+@pytest.mark.asyncio
+async def test_batch_write_command_errors(mock_get_snapshot, mock_client_write_fail, make_plugin,
+                                          clear_caches):
+    """Errors writing to a device are reported for the device."""
+
+    resp = await batch_write(writes=[
+        {'rack': 'rack-1', 'board': 'vec', 'device': '12345', 'action': 'state'},
+        {'rack': 'rack-1', 'board': 'vec', 'device': '67890', 'action': 1},
+    ])
+
+    writes = resp.data['writes']
+    assert writes[0]['error']['error_id'] == errors.FAILED_WRITE_COMMAND
+    assert writes[1]['error']['error_id'] == errors.INVALID_ARGUMENTS
+    assert await synse.cache.list_transactions() == []
+
+
+@pytest.mark.asyncio
+async def test_batch_write_command_concurrency(mock_get_snapshot, make_plugin, clear_caches,
+                                               monkeypatch):
+    """The number of concurrent writes to a plugin is bounded in a batch write."""
+
+    config.options.set('grpc.max_concurrent_writes', 1)
+
+    state = {'in_flight': 0, 'max': 0}
+
+    async def mockwriteslow(self, rack, board, device, data):
+        """Mock write which tracks how many writes are in flight at once."""
+        state['in_flight'] += 1
+        state['max'] = max(state['max'], state['in_flight'])
+        await asyncio.sleep(0.02)
+        state['in_flight'] -= 1
+        return await mockbatchwrite(self, rack, board, device, data)
+
+    monkeypatch.setattr(SynseInternalClient, 'write', mockwriteslow)
+
+    resp = await batch_write(writes=[
+        {'rack': 'rack-1', 'board': 'vec', 'device': '12345', 'action': 'state'},
+        {'rack': 'rack-1', 'board': 'vec', 'device': '67890', 'action': 'state'},
+    ])
+
+    assert all('transactions' in w for w in resp.data['writes'])
+    assert state['max'] == 1
+
+
+@pytest.mark.asyncio
+async def test_write_command_resolved(mock_resolve_device, mock_client_write, make_plugin,
+                                      clear_caches):
+    """Write to a device which has already been resolved."""
+
+    resolved = mockresolvedevice('rack-1', 'vec', '12345')
+
+    resp = await write('rack-1', 'vec', '12345', {'action': 'color', 'raw': 'ff0000'},
+                       resolved=resolved)
+
+    assert isinstance(resp, WriteResponse)
+    assert resp.data[0]['transaction'] == 'abcdef'
+
+    # the device is not looked up again
+    mock_resolve_device.assert_not_called()
@@ -30,6 +30,9 @@ def reset_state():
     # clear out the state of the client manager
     client.SynseInternalClient._client_stubs = {}
 
+    # drop the metainfo snapshot
+    cache._snapshot = None
+
     # clear the environment
     for k, _ in os.environ.items():
         if k.startswith('SYNSE_'):
@@ -44,3 +47,4 @@ async def clear_caches():
     """Fixture to clear all caches before a test starts."""
     await cache.clear_all_meta_caches()
     await cache.clear_cache(cache.NS_TRANSACTION)
+    await cache.clear_cache(cache.NS_READ)
@@ -1,6 +1,9 @@
 """Test the 'synse.proto.client' Synse Server module."""
 # pylint: disable=redefined-outer-name,unused-argument
 
+import asyncio
+import time
+
 import grpc
 import pytest
 from synse_plugin import api as synse_api
@@ -78,6 +81,12 @@ def mock_transaction(req, timeout):
         state=0,
     )
 
+
+def mock_read_slow(req, timeout):
+    """Mock the internal read call, taking some time to respond."""
+    time.sleep(0.2)
+    return mock_read(req, timeout)
+
 # --- Test Cases ---
 
 
@@ -152,49 +161,83 @@ def test_client_init_bad_mode():
         client.SynseInternalClient('test-cli', 'test-cli.sock', 'foo')
 
 
-def test_client_read():
+@pytest.mark.asyncio
+async def test_client_read():
     """Test reading via the client."""
 
     c = client.SynseInternalClient('test', 'test.sock', 'unix')
     c.stub.Read = mock_read
 
-    resp = c.read('rack-1', 'vec', '12345')
+    resp = await c.read('rack-1', 'vec', '12345')
 
     assert isinstance(resp, list)
     assert len(resp) == 1
     assert isinstance(resp[0], synse_api.ReadResponse)
 
 
-def test_client_write():
+@pytest.mark.asyncio
+async def test_client_write():
     """Test writing via the client."""
 
     c = client.SynseInternalClient('test', 'test.sock', 'unix')
     c.stub.Write = mock_write
 
-    resp = c.write('rack-1', 'vec', '12345', [client.WriteData()])
+    resp = await c.write('rack-1', 'vec', '12345', [client.WriteData()])
 
     assert isinstance(resp, synse_api.Transactions)
 
 
-def test_client_metainfo():
+@pytest.mark.asyncio
+async def test_client_metainfo():
     """Test getting metainfo via the client."""
 
     c = client.SynseInternalClient('test', 'test.sock', 'unix')
     c.stub.Metainfo = mock_metainfo
 
-    resp = c.metainfo()
+    resp = await c.metainfo()
 
     assert isinstance(resp, list)
     assert len(resp) == 1
     assert isinstance(resp[0], synse_api.MetainfoResponse)
 
 
-def test_client_transaction():
+@pytest.mark.asyncio
+async def test_client_transaction():
     """Test checking a transaction via the client."""
 
     c = client.SynseInternalClient('test', 'test.sock', 'unix')
     c.stub.TransactionCheck = mock_transaction
 
-    resp = c.check_transaction('abcdef')
+    resp = await c.check_transaction('abcdef')
 
     assert isinstance(resp, synse_api.WriteResponse)
+
+
+def test_get_executor():
+    """Get the executor used for gRPC requests."""
+
+    e = client.get_executor()
+    assert e is not None
+
+    # subsequent calls should get the same executor
+    assert client.get_executor() == e
+
+
+@pytest.mark.asyncio
+async def test_client_read_concurrent():
+    """Test that slow reads via the client do not block one another."""
+
+    c = client.SynseInternalClient('test', 'test.sock', 'unix')
+    c.stub.Read = mock_read_slow
+
+    start = time.time()
+    resp = await asyncio.gather(*[c.read('rack-1', 'vec', '12345') for _ in range(5)])
+    elapsed = time.time() - start
+
+    assert len(resp) == 5
+    for r in resp:
+        assert len(r) == 1
+        assert isinstance(r[0], synse_api.ReadResponse)
+
+    # if the reads were issued serially, this would take at least one second
+    assert elapsed < 0.8
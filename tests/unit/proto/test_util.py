@@ -111,6 +111,24 @@ def test_metainfo_to_dict():
     }
 
 
+def test_metainfo_equal():
+    """Compare two MetainfoResponses that describe the same device."""
+
+    meta = api.MetainfoResponse(uid='12345', type='thermistor', info='a', timestamp='october')
+    other = api.MetainfoResponse(uid='12345', type='thermistor', info='a', timestamp='november')
+
+    assert util.metainfo_equal(meta, other)
+
+
+def test_metainfo_equal_changed():
+    """Compare two MetainfoResponses that describe different devices."""
+
+    meta = api.MetainfoResponse(uid='12345', type='thermistor', info='a')
+    other = api.MetainfoResponse(uid='12345', type='thermistor', info='b')
+
+    assert not util.metainfo_equal(meta, other)
+
+
 def test_metaoutput_to_dict():
     """Convert a MetaOutput object to dictionary."""
 
@@ -16,14 +16,20 @@ from synse.scheme.write import WriteResponse
 from tests import utils
 
 
-def mockwritereturn(rack, board, device, data):
-    """Mock method that will be used in monkeypatching the write command."""
-    r = WriteResponse({
-        '{}-{}-{}'.format(rack, board, device): api.WriteData(
-            action=data.get('action'),
-            raw=[data.get('raw').encode('ascii')]
-        )
-    })
+def mockwritereturn(rack, board, device, data, resolved=None):
+    """Mock method that will be used in monkeypatching the write command.
+
+    The LED route writes all of its actions at once, so there is a
+    transaction for each action in the data.
+    """
+    r = WriteResponse({})
+    for d in data:
+        r.data.extend(WriteResponse({
+            '{}-{}-{}'.format(rack, board, device): api.WriteData(
+                action=d.get('action'),
+                raw=[d.get('raw').encode('ascii')]
+            )
+        }).data)
     return r
 
 
@@ -32,10 +38,10 @@ def mock_write(monkeypatch):
     """Fixture to monkeypatch the underlying Synse command."""
     mock = asynctest.CoroutineMock(synse.commands.write, side_effect=mockwritereturn)
     monkeypatch.setattr(synse.commands, 'write', mock)
-    return mock_write
+    return mock
 
 
-def mockreadreturn(rack, board, device):
+def mockreadreturn(rack, board, device, resolved=None):
     """Mock method that will be used in monkeypatching the read command."""
     r = SynseResponse()
     r.data = {'value': 1}
@@ -76,6 +82,25 @@ async def test_synse_led_read(mock_validate_device_type, mock_read, no_pretty_js
     assert result.status == 200
 
 
+@pytest.mark.asyncio
+async def test_synse_led_resolved(monkeypatch, mock_read, mock_write, no_pretty_json):
+    """The device resolved when validating it is passed to the command."""
+
+    resolved = object()
+    monkeypatch.setattr(
+        synse.validate, 'validate_device_type',
+        asynctest.CoroutineMock(synse.validate.validate_device_type, return_value=resolved)
+    )
+
+    r = utils.make_request('/synse/led')
+    await led_route(r, 'rack-1', 'vec', '123456')
+    synse.commands.read.assert_called_once_with('rack-1', 'vec', '123456', resolved=resolved)
+
+    r = utils.make_request('/synse/led?state=on')
+    await led_route(r, 'rack-1', 'vec', '123456')
+    assert mock_write.call_args[1] == {'resolved': resolved}
+
+
 @pytest.mark.asyncio
 async def test_synse_led_write_invalid_1(mock_validate_device_type, mock_write, no_pretty_json):
     """Test writing LED state with an invalid state specified."""
@@ -225,6 +250,9 @@ async def test_synse_led_write_valid_6(mock_validate_device_type, mock_write, no
     assert result.body == expected_json.encode('ascii')
     assert result.status == 200
 
+    # both actions are written in a single write
+    mock_write.assert_called_once()
+
 
 @pytest.mark.asyncio
 async def test_synse_led_route_bad_param(mock_validate_device_type, mock_write, no_pretty_json):
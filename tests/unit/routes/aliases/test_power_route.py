@@ -13,7 +13,7 @@ from synse.scheme.base_response import SynseResponse
 from tests import utils
 
 
-def mockwritereturn(rack, board, device, data):
+def mockwritereturn(rack, board, device, data, resolved=None):
     """Mock method that will be used in monkeypatching the write command."""
     r = SynseResponse()
     r.data = {'data': data}
@@ -28,7 +28,7 @@ def mock_write(monkeypatch):
     return mock_write
 
 
-def mockreadreturn(rack, board, device):
+def mockreadreturn(rack, board, device, resolved=None):
     """Mock method that will be used in monkeypatching the read command."""
     r = SynseResponse()
     r.data = {'value': 1}
@@ -8,6 +8,7 @@ from sanic.response import HTTPResponse
 import synse.commands
 from synse.routes.core import config_route
 from synse.scheme.base_response import SynseResponse
+from synse.scheme.config import config_validator
 from tests import utils
 
 
@@ -23,7 +24,7 @@ def mock_config(monkeypatch):
     """Fixture to monkeypatch the underlying Synse command."""
     mock = asynctest.CoroutineMock(synse.commands.config, side_effect=mockreturn)
     monkeypatch.setattr(synse.commands, 'config', mock)
-    return mock_config
+    return mock
 
 
 @pytest.mark.asyncio
@@ -35,3 +36,21 @@ async def test_synse_config_route(mock_config, no_pretty_json):
     assert isinstance(result, HTTPResponse)
     assert result.body == b'{"test":"config"}'
     assert result.status == 200
+
+
+@pytest.mark.asyncio
+async def test_synse_config_route_not_modified(mock_config):
+    """A client with the current config gets a 304 response."""
+
+    r = utils.make_request('/synse/config')
+    r.headers['If-None-Match'] = config_validator.etag
+
+    result = await config_route(r)
+
+    assert isinstance(result, HTTPResponse)
+    assert result.status == 304
+    assert result.body == b''
+    assert result.headers == config_validator.headers
+
+    # the config is not looked up for a client which already has it
+    mock_config.assert_not_called()
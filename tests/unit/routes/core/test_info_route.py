@@ -6,6 +6,7 @@ import pytest
 from sanic.response import HTTPResponse
 
 import synse.commands
+from synse import cache
 from synse.routes.core import info_route
 from synse.scheme.base_response import SynseResponse
 from tests import utils
@@ -52,3 +53,28 @@ async def test_synse_info_route_no_optional(mock_info, no_pretty_json):
     assert isinstance(result, HTTPResponse)
     assert result.body == b'{"r":"rack1","b":null,"d":null}'
     assert result.status == 200
+
+
+@pytest.mark.asyncio
+async def test_synse_info_route_not_modified(mock_info, monkeypatch):
+    """A client with the current info data gets it without the command being run."""
+
+    snapshot = cache.MetainfoSnapshot({}, 1)
+    monkeypatch.setattr(cache, '_snapshot', snapshot)
+    monkeypatch.setattr(snapshot, 'is_expired', lambda: False)
+
+    r = utils.make_request('/synse/info')
+    r.headers['If-None-Match'] = snapshot.validator.etag
+
+    result = await info_route(r, 'rack1')
+
+    assert isinstance(result, HTTPResponse)
+    assert result.status == 304
+    assert result.headers == snapshot.validator.headers
+    synse.commands.info.assert_not_called()
+
+    # a client with an older version gets the data
+    r.headers['If-None-Match'] = cache.MetainfoSnapshot({}, 0).validator.etag
+    result = await info_route(r, 'rack1')
+    assert result.status == 200
+    synse.commands.info.assert_called_once()
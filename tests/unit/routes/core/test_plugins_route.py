@@ -6,12 +6,14 @@ import pytest
 from sanic.response import HTTPResponse
 
 import synse.commands
+import synse.plugin
+from synse.response import Validator
 from synse.routes.core import plugins_route
 from synse.scheme.base_response import SynseResponse
 from tests import utils
 
 
-def mockreturn():
+def mockreturn(register=True):
     """Mock method that will be used in monkeypatching the command."""
     r = SynseResponse()
     r.data = []
@@ -23,7 +25,8 @@ def mock_plugins(monkeypatch):
     """Fixture to monkeypatch the underlying Synse command."""
     mock = asynctest.CoroutineMock(synse.commands.get_plugins, side_effect=mockreturn)
     monkeypatch.setattr(synse.commands, 'get_plugins', mock)
-    return mock_plugins
+    monkeypatch.setattr(synse.plugin, 'register_plugins', lambda: None)
+    return mock
 
 
 @pytest.mark.asyncio
@@ -35,3 +38,24 @@ async def test_synse_config_route(mock_plugins, no_pretty_json):
     assert isinstance(result, HTTPResponse)
     assert result.body == b'[]'
     assert result.status == 200
+
+
+@pytest.mark.asyncio
+async def test_synse_plugins_route_not_modified(mock_plugins, monkeypatch):
+    """A client with the current plugins gets a 304 response."""
+
+    validator = Validator('plugins-1', 1508155200)
+    monkeypatch.setattr(synse.commands, 'plugins_validator', lambda: validator)
+
+    r = utils.make_request('/synse/plugins')
+    r.headers['If-None-Match'] = validator.etag
+
+    result = await plugins_route(r)
+
+    assert isinstance(result, HTTPResponse)
+    assert result.status == 304
+    assert result.body == b''
+    assert result.headers == validator.headers
+
+    # the plugins are not looked up for a client which already has them
+    mock_plugins.assert_not_called()
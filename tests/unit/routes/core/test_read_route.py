@@ -3,10 +3,12 @@
 
 import asynctest
 import pytest
+import ujson
 from sanic.response import HTTPResponse
 
 import synse.commands
-from synse.routes.core import read_route
+from synse import errors
+from synse.routes.core import batch_read_route, read_route
 from synse.scheme.base_response import SynseResponse
 from tests import utils
 
@@ -18,6 +20,21 @@ def mockreturn(rack, board, device):
     return r
 
 
+def mockbatchreturn(devices=None, selectors=None):
+    """Mock method that will be used in monkeypatching the batch command."""
+    r = SynseResponse()
+    r.data = {'devices': devices, 'selectors': selectors}
+    return r
+
+
+@pytest.fixture()
+def mock_batch_read(monkeypatch):
+    """Fixture to monkeypatch the underlying Synse batch command."""
+    mock = asynctest.CoroutineMock(synse.commands.batch_read, side_effect=mockbatchreturn)
+    monkeypatch.setattr(synse.commands, 'batch_read', mock)
+    return mock_batch_read
+
+
 @pytest.fixture()
 def mock_read(monkeypatch):
     """Fixture to monkeypatch the underlying Synse command."""
@@ -38,3 +55,80 @@ async def test_synse_read_route(mock_read, no_pretty_json):
     assert isinstance(result, HTTPResponse)
     assert result.body == b'{"value":1}'
     assert result.status == 200
+
+
+@pytest.mark.asyncio
+async def test_synse_batch_read_route_get(mock_batch_read, no_pretty_json):
+    """Test a successful batch read, selecting devices by query params."""
+
+    r = utils.make_request('/synse/read?rack=rack-1&type=temperature&model=max11610')
+    r.method = 'GET'
+
+    result = await batch_read_route(r)
+
+    assert isinstance(result, HTTPResponse)
+    assert ujson.loads(result.body) == {
+        'devices': None,
+        'selectors': {'rack': 'rack-1', 'type': 'temperature', 'model': 'max11610'}
+    }
+    assert result.status == 200
+
+
+@pytest.mark.asyncio
+async def test_synse_batch_read_route_get_bad_param(mock_batch_read, no_pretty_json):
+    """Test a batch read, passing an unsupported query param."""
+
+    r = utils.make_request('/synse/read?device=12345')
+    r.method = 'GET'
+
+    with pytest.raises(errors.InvalidArgumentsError):
+        await batch_read_route(r)
+
+
+@pytest.mark.asyncio
+async def test_synse_batch_read_route_post(mock_batch_read, no_pretty_json):
+    """Test a successful batch read, with the devices POSTed."""
+
+    r = utils.make_request('/synse/read', [
+        {'rack': 'rack-1', 'board': 'vec', 'device': '12345'},
+        {'rack': 'rack-1', 'board': 'vec', 'device': '67890'},
+    ])
+    r.method = 'POST'
+
+    result = await batch_read_route(r)
+
+    assert isinstance(result, HTTPResponse)
+    assert result.body == \
+        b'{"devices":[["rack-1","vec","12345"],["rack-1","vec","67890"]],"selectors":null}'
+    assert result.status == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('data', [
+    {'rack': 'rack-1', 'board': 'vec', 'device': '12345'},
+    [{'rack': 'rack-1', 'board': 'vec'}],
+    ['rack-1'],
+    [{'rack': 'rack-1', 'board': 'vec', 'device': 12345}],
+    [{'rack': ['rack-1'], 'board': 'vec', 'device': '12345'}],
+    [{'rack': 'rack-1', 'board': None, 'device': '12345'}],
+])
+async def test_synse_batch_read_route_post_invalid(mock_batch_read, no_pretty_json, data):
+    """Test a batch read, with invalid devices POSTed."""
+
+    r = utils.make_request('/synse/read', data)
+    r.method = 'POST'
+
+    with pytest.raises(errors.InvalidArgumentsError):
+        await batch_read_route(r)
+
+
+@pytest.mark.asyncio
+async def test_synse_batch_read_route_post_bad_json(mock_batch_read, no_pretty_json):
+    """Test a batch read, with invalid JSON POSTed."""
+
+    r = utils.make_request('/synse/read')
+    r.body = '{"rack":'
+    r.method = 'POST'
+
+    with pytest.raises(errors.InvalidJsonError):
+        await batch_read_route(r)
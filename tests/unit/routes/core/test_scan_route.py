@@ -12,10 +12,10 @@ from synse.scheme.base_response import SynseResponse
 from tests import utils
 
 
-def mockreturn(rack, board, force):
+def mockreturn(rack, board, force, plugin_name):
     """Mock method that will be used in monkeypatching the command."""
     r = SynseResponse()
-    r.data = {'r': rack, 'b': board, 'forced': force}
+    r.data = {'r': rack, 'b': board, 'forced': force, 'plugin': plugin_name}
     return r
 
 
@@ -36,7 +36,7 @@ async def test_synse_scan_route(mock_scan, no_pretty_json):
     result = await scan_route(r)
 
     assert isinstance(result, HTTPResponse)
-    assert result.body == b'{"r":null,"b":null,"forced":false}'
+    assert result.body == b'{"r":null,"b":null,"forced":false,"plugin":null}'
     assert result.status == 200
 
 
@@ -49,7 +49,7 @@ async def test_synse_scan_route_with_rack(mock_scan, no_pretty_json):
     result = await scan_route(r, 'rack-1')
 
     assert isinstance(result, HTTPResponse)
-    assert result.body == b'{"r":"rack-1","b":null,"forced":false}'
+    assert result.body == b'{"r":"rack-1","b":null,"forced":false,"plugin":null}'
     assert result.status == 200
 
 
@@ -62,7 +62,7 @@ async def test_synse_scan_route_with_rack_and_board(mock_scan, no_pretty_json):
     result = await scan_route(r, 'rack-1', 'vec')
 
     assert isinstance(result, HTTPResponse)
-    assert result.body == b'{"r":"rack-1","b":"vec","forced":false}'
+    assert result.body == b'{"r":"rack-1","b":"vec","forced":false,"plugin":null}'
     assert result.status == 200
 
 
@@ -75,7 +75,7 @@ async def test_synse_scan_route_forced(mock_scan, no_pretty_json):
     result = await scan_route(r)
 
     assert isinstance(result, HTTPResponse)
-    assert result.body == b'{"r":null,"b":null,"forced":true}'
+    assert result.body == b'{"r":null,"b":null,"forced":true,"plugin":null}'
     assert result.status == 200
 
 
@@ -88,7 +88,20 @@ async def test_synse_scan_route_forced_2(mock_scan, no_pretty_json):
     result = await scan_route(r)
 
     assert isinstance(result, HTTPResponse)
-    assert result.body == b'{"r":null,"b":null,"forced":false}'
+    assert result.body == b'{"r":null,"b":null,"forced":false,"plugin":null}'
+    assert result.status == 200
+
+
+@pytest.mark.asyncio
+async def test_synse_scan_route_forced_plugin(mock_scan, no_pretty_json):
+    """Test forcing a rescan of a single plugin."""
+
+    r = utils.make_request('/synse/scan?force=true&plugin=foo')
+
+    result = await scan_route(r)
+
+    assert isinstance(result, HTTPResponse)
+    assert result.body == b'{"r":null,"b":null,"forced":true,"plugin":"foo"}'
     assert result.status == 200
 
 
@@ -0,0 +1,252 @@
+"""Test the 'synse.routes.core' Synse Server module's stream route."""
+# pylint: disable=redefined-outer-name,unused-argument
+
+import asyncio
+
+import pytest
+import ujson
+from sanic.response import StreamingHTTPResponse
+
+import synse.routes.core
+from synse import config, errors, stream
+from synse.routes.core import sse_route, stream_route
+from tests import utils
+
+
+class MockWebSocket(object):
+    """Mock WebSocket, which the test sends messages to and which collects
+    the messages sent to the client.
+    """
+
+    def __init__(self):
+        self.received = asyncio.Queue()
+        self.sent = []
+
+        self.closed = False
+
+    async def recv(self):
+        """Receive the next message queued for the server."""
+        return await self.received.get()
+
+    async def send(self, message):
+        """Send a message to the client."""
+        self.sent.append(ujson.loads(message))
+
+    async def close(self):
+        """Close the WebSocket."""
+        self.closed = True
+
+
+class MockTransport(object):
+    """Mock transport for a streaming response, with a write buffer that
+    the test controls.
+    """
+
+    def __init__(self):
+        self.buffered = 0
+        self.closing = False
+
+    def get_write_limits(self):
+        """Get the high and low limits of the write buffer."""
+        return 16, 64
+
+    def get_write_buffer_size(self):
+        """Get the number of bytes in the write buffer."""
+        return self.buffered
+
+    def is_closing(self):
+        """Check whether the transport is closing."""
+        return self.closing
+
+
+class MockStreamingResponse(object):
+    """Mock streaming response, which collects the data written to it."""
+
+    def __init__(self):
+        self.transport = MockTransport()
+        self.written = []
+
+    def write(self, data):
+        """Collect the data written to the response."""
+        self.written.append(data)
+
+
+@pytest.fixture()
+def mock_poller(monkeypatch):
+    """Fixture to monkeypatch the stream poller, so no devices are polled."""
+
+    class MockPoller(object):
+        """Mock poller, which publishes a message for each subscribed device."""
+        def __init__(self):
+            self.subscriptions = {}
+
+        def subscribe(self, subscription, devices):
+            """Subscribe to devices, publishing a message for each of them."""
+            self.subscriptions[subscription] = devices
+            for device in devices:
+                subscription.publish({'location': device})
+            self.subscription = subscription
+
+        def unsubscribe(self, subscription):
+            """Remove a subscription."""
+            del self.subscriptions[subscription]
+
+    poller = MockPoller()
+    monkeypatch.setattr(stream, 'poller', poller)
+    return poller
+
+
+@pytest.mark.asyncio
+async def test_synse_stream_route(mock_poller):
+    """Subscribe to devices over the stream route."""
+
+    ws = MockWebSocket()
+    task = asyncio.ensure_future(stream_route(utils.make_request('/synse/stream'), ws))
+
+    await ws.received.put(ujson.dumps({
+        'devices': [{'rack': 'rack-1', 'board': 'vec', 'device': '1'}]
+    }))
+    await asyncio.sleep(0.01)
+
+    assert list(mock_poller.subscriptions.values()) == [[('rack-1', 'vec', '1')]]
+    assert ws.sent == [{'location': ['rack-1', 'vec', '1']}]
+
+    # an invalid subscription sends an error, but does not close the stream
+    await ws.received.put('{"rack":')
+    await asyncio.sleep(0.01)
+
+    assert ws.sent[1]['error']['error_id'] == errors.INVALID_JSON
+    assert not task.done()
+
+    # closing the stream removes the subscription
+    task.cancel()
+    await asyncio.sleep(0.01)
+    assert mock_poller.subscriptions == {}
+
+
+@pytest.mark.asyncio
+async def test_synse_stream_route_dropped(mock_poller):
+    """The WebSocket is closed when the subscription is dropped."""
+
+    config.options.set('stream.buffer_size', 1)
+
+    ws = MockWebSocket()
+    task = asyncio.ensure_future(stream_route(utils.make_request('/synse/stream'), ws))
+
+    await ws.received.put(ujson.dumps({
+        'devices': [{'rack': 'rack-1', 'board': 'vec', 'device': '1'}]
+    }))
+    await asyncio.sleep(0.01)
+    assert not ws.closed
+
+    # overflow the buffer before the sender gets to run
+    mock_poller.subscription.publish({'location': 'foo'})
+    mock_poller.subscription.publish({'location': 'bar'})
+    await asyncio.sleep(0.01)
+    assert mock_poller.subscription.dropped
+    assert ws.sent[-1] == {'location': 'foo'}
+    assert ws.closed
+
+    task.cancel()
+
+
+@pytest.fixture()
+def mock_select(monkeypatch):
+    """Fixture to monkeypatch the selection of devices at a location."""
+
+    async def select_location(rack, board=None):
+        """Mock method to monkeypatch the select_location method."""
+        if rack != 'rack-1':
+            raise errors.RackNotFoundError('not found')
+        return [(rack, board or 'vec', '1'), (rack, board or 'vec', '2')]
+
+    monkeypatch.setattr(stream, 'select_location', select_location)
+
+
+@pytest.fixture()
+def no_keepalive_wait(monkeypatch):
+    """Fixture to shorten the Server-Sent Events keep-alive interval."""
+    monkeypatch.setattr(synse.routes.core, 'SSE_KEEPALIVE_INTERVAL', 0.05)
+
+
+@pytest.mark.asyncio
+async def test_synse_sse_route(mock_poller, mock_select, no_keepalive_wait):
+    """Stream the readings of a board as Server-Sent Events."""
+
+    r = utils.make_request('/synse/stream/rack-1/board-1')
+
+    result = await sse_route(r, 'rack-1', 'board-1')
+
+    assert isinstance(result, StreamingHTTPResponse)
+    assert result.content_type == 'text/event-stream'
+    assert result.headers['Cache-Control'] == 'no-cache'
+    assert list(mock_poller.subscriptions.values()) == [
+        [('rack-1', 'board-1', '1'), ('rack-1', 'board-1', '2')]
+    ]
+
+    response = MockStreamingResponse()
+    task = asyncio.ensure_future(result.streaming_fn(response))
+    await asyncio.sleep(0.01)
+
+    assert response.written == [
+        'data: {"location":["rack-1","board-1","1"]}\n\n',
+        'data: {"location":["rack-1","board-1","2"]}\n\n',
+    ]
+
+    # idle clients get keep-alive comments
+    await asyncio.sleep(0.06)
+    assert response.written[2] == ': keep-alive\n\n'
+
+    # the stream ends when the client disconnects
+    response.transport.closing = True
+    await asyncio.sleep(0.06)
+    assert task.done()
+    assert mock_poller.subscriptions == {}
+
+
+@pytest.mark.asyncio
+async def test_synse_sse_route_backpressure(mock_poller, mock_select):
+    """No more events are written while the transport is backed up, and
+    the stream ends when the subscription is dropped.
+    """
+
+    config.options.set('stream.buffer_size', 2)
+
+    result = await sse_route(utils.make_request('/synse/stream/rack-1'), 'rack-1')
+    subscription = mock_poller.subscription
+
+    response = MockStreamingResponse()
+    response.transport.buffered = 100
+    task = asyncio.ensure_future(result.streaming_fn(response))
+    await asyncio.sleep(0.01)
+
+    # the first event is written, then the writer waits for the buffer to drain
+    assert len(response.written) == 1
+    assert subscription.queue.qsize() == 1
+
+    response.transport.buffered = 0
+    await asyncio.sleep(0.15)
+    assert len(response.written) == 2
+
+    # the buffer overflows while the transport is backed up, which drops
+    # the subscription and ends the stream
+    response.transport.buffered = 100
+    for i in range(4):
+        subscription.publish({'location': i})
+        await asyncio.sleep(0.01)
+    assert subscription.dropped
+    assert len(response.written) == 3
+
+    await asyncio.sleep(0.1)
+    assert task.done()
+    assert mock_poller.subscriptions == {}
+
+
+@pytest.mark.asyncio
+async def test_synse_sse_route_not_found(mock_poller, mock_select):
+    """Stream the readings of a rack which does not exist."""
+
+    with pytest.raises(errors.RackNotFoundError):
+        await sse_route(utils.make_request('/synse/stream/rack-2'), 'rack-2')
+
+    assert mock_poller.subscriptions == {}
@@ -3,18 +3,22 @@
 
 import asynctest
 import pytest
+import ujson
 from sanic.response import HTTPResponse
 
 import synse.commands
+from synse import config, errors
 from synse.routes.core import transaction_route
 from synse.scheme.base_response import SynseResponse
 from tests import utils
 
 
-def mockreturn(transaction):
+def mockreturn(transaction, wait=None):
     """Mock method that will be used in monkeypatching the command."""
     r = SynseResponse()
     r.data = {'id': transaction}
+    if wait is not None:
+        r.data['wait'] = wait
     return r
 
 
@@ -26,6 +30,38 @@ def mock_transaction(monkeypatch):
     return mock_transaction
 
 
+def mockreturnbatch(transactions, wait=None):
+    """Mock method that will be used in monkeypatching the batch command."""
+    r = SynseResponse()
+    r.data = {'transactions': transactions}
+    if wait is not None:
+        r.data['wait'] = wait
+    return r
+
+
+@pytest.fixture()
+def mock_transactions(monkeypatch):
+    """Fixture to monkeypatch the underlying Synse batch command."""
+    mock = asynctest.CoroutineMock(synse.commands.check_transactions, side_effect=mockreturnbatch)
+    monkeypatch.setattr(synse.commands, 'check_transactions', mock)
+    return mock_transactions
+
+
+def mockreturnlist(offset=0, limit=None, **filters):
+    """Mock method that will be used in monkeypatching the list command."""
+    r = SynseResponse()
+    r.data = {'offset': offset, 'limit': limit, 'filters': filters}
+    return r
+
+
+@pytest.fixture()
+def mock_list_transactions(monkeypatch):
+    """Fixture to monkeypatch the underlying Synse list command."""
+    mock = asynctest.CoroutineMock(synse.commands.list_transactions, side_effect=mockreturnlist)
+    monkeypatch.setattr(synse.commands, 'list_transactions', mock)
+    return mock_list_transactions
+
+
 @pytest.mark.asyncio
 async def test_synse_transaction_route(mock_transaction, no_pretty_json):
     """Test a successful transaction check."""
@@ -45,3 +81,147 @@ async def test_synse_transaction_route(mock_transaction, no_pretty_json):
         assert isinstance(result, HTTPResponse)
         assert result.body == expected.encode('ascii')
         assert result.status == 200
+
+
+@pytest.mark.asyncio
+async def test_synse_transaction_route_post(mock_transactions, no_pretty_json):
+    """Test a successful batch transaction check."""
+
+    r = utils.make_request('/synse/transaction', ['123456', 'abcdef'])
+    r.method = 'POST'
+
+    result = await transaction_route(r)
+
+    assert isinstance(result, HTTPResponse)
+    assert result.body == b'{"transactions":["123456","abcdef"]}'
+    assert result.status == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('qparam,expected', [
+    ('2', 2),
+    ('0.5', 0.5),
+    ('0', 0),
+    ('600', 30),
+])
+async def test_synse_transaction_route_wait(mock_transaction, no_pretty_json, qparam, expected):
+    """Test a transaction check which waits for the transaction to complete."""
+
+    config.options.set('transaction.max_wait', 30)
+
+    r = utils.make_request('/synse/transaction?wait={}'.format(qparam))
+
+    result = await transaction_route(r, '123456')
+
+    assert isinstance(result, HTTPResponse)
+    assert ujson.loads(result.body) == {'id': '123456', 'wait': expected}
+    assert result.status == 200
+
+
+@pytest.mark.asyncio
+async def test_synse_transaction_route_post_wait(mock_transactions, no_pretty_json):
+    """Test a batch transaction check which waits for the transactions to complete."""
+
+    r = utils.make_request('/synse/transaction?wait=5', ['123456', 'abcdef'])
+    r.method = 'POST'
+
+    result = await transaction_route(r)
+
+    assert isinstance(result, HTTPResponse)
+    assert result.body == b'{"transactions":["123456","abcdef"],"wait":5.0}'
+    assert result.status == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('qparam', [
+    'wait=-1',
+    'wait=foo',
+    'wait=nan',
+    'wait=inf',
+    'timeout=5',
+])
+async def test_synse_transaction_route_wait_invalid(mock_transaction, no_pretty_json, qparam):
+    """Test a transaction check with invalid query parameters."""
+
+    r = utils.make_request('/synse/transaction?{}'.format(qparam))
+
+    with pytest.raises(errors.InvalidArgumentsError):
+        await transaction_route(r, '123456')
+
+
+@pytest.mark.asyncio
+async def test_synse_transaction_route_list_wait(mock_transaction, no_pretty_json):
+    """Test listing transactions, which does not support waiting."""
+
+    r = utils.make_request('/synse/transaction?wait=5')
+
+    with pytest.raises(errors.InvalidArgumentsError):
+        await transaction_route(r)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('data', [
+    {'id': '123456'},
+    ['123456', 7],
+    '123456',
+])
+async def test_synse_transaction_route_post_invalid(mock_transactions, no_pretty_json, data):
+    """Test a batch transaction check, with invalid data POSTed."""
+
+    r = utils.make_request('/synse/transaction', data)
+    r.method = 'POST'
+
+    with pytest.raises(errors.InvalidArgumentsError):
+        await transaction_route(r)
+
+
+@pytest.mark.asyncio
+async def test_synse_transaction_route_post_bad_json(mock_transactions, no_pretty_json):
+    """Test a batch transaction check, with invalid JSON POSTed."""
+
+    r = utils.make_request('/synse/transaction')
+    r.body = '["123456"'
+    r.method = 'POST'
+
+    with pytest.raises(errors.InvalidJsonError):
+        await transaction_route(r)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('qparams,offset,limit,filters', [
+    ('', 0, None, {}),
+    ('?plugin=foo&status=done', 0, None, {'plugin': 'foo', 'status': 'done'}),
+    ('?rack=rack-1&board=vec&device=1', 0, None, {'rack': 'rack-1', 'board': 'vec', 'device': '1'}),
+    ('?state=error&offset=10&limit=5', 10, 5, {'state': 'error'}),
+])
+async def test_synse_transaction_route_list(mock_list_transactions, no_pretty_json,
+                                            qparams, offset, limit, filters):
+    """Test listing transactions."""
+
+    r = utils.make_request('/synse/transaction' + qparams)
+    r.method = 'GET'
+
+    result = await transaction_route(r)
+
+    assert isinstance(result, HTTPResponse)
+    assert ujson.loads(result.body) == {'offset': offset, 'limit': limit, 'filters': filters}
+    assert result.status == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('qparams', [
+    '?offset=-1',
+    '?limit=ten',
+    '?limit=1.5',
+    '?limit=%C2%B2',
+    '?context=foo',
+])
+async def test_synse_transaction_route_list_invalid(mock_list_transactions, no_pretty_json,
+                                                    qparams):
+    """Test listing transactions with invalid query parameters."""
+
+    r = utils.make_request('/synse/transaction' + qparams)
+    r.method = 'GET'
+
+    with pytest.raises(errors.InvalidArgumentsError):
+        await transaction_route(r)
@@ -6,8 +6,8 @@ import pytest
 from sanic.response import HTTPResponse
 
 import synse.commands
-from synse.errors import InvalidJsonError, SynseError
-from synse.routes.core import write_route
+from synse.errors import InvalidArgumentsError, InvalidJsonError, SynseError
+from synse.routes.core import batch_write_route, write_route
 from synse.scheme.base_response import SynseResponse
 from tests import utils
 
@@ -19,6 +19,13 @@ def mockreturn(rack, board, device, data):
     return r
 
 
+def mockbatchreturn(writes=None, selectors=None, data=None):
+    """Mock method that will be used in monkeypatching the batch command."""
+    r = SynseResponse()
+    r.data = {'writes': writes, 'selectors': selectors, 'data': data}
+    return r
+
+
 @pytest.fixture()
 def mock_write(monkeypatch):
     """Fixture to monkeypatch the underlying Synse command."""
@@ -27,6 +34,14 @@ def mock_write(monkeypatch):
     return mock_write
 
 
+@pytest.fixture()
+def mock_batch_write(monkeypatch):
+    """Fixture to monkeypatch the underlying Synse batch write command."""
+    mock = asynctest.CoroutineMock(synse.commands.batch_write, side_effect=mockbatchreturn)
+    monkeypatch.setattr(synse.commands, 'batch_write', mock)
+    return mock
+
+
 @pytest.mark.asyncio
 async def test_synse_write_route(mock_write, no_pretty_json):
     """Test a successful write."""
@@ -110,3 +125,119 @@ async def test_synse_write_route_partial_json_ok_2(mock_write, no_pretty_json):
     assert isinstance(result, HTTPResponse)
     assert result.status == 200
     assert result.body == expected.encode('ascii')
+
+
+@pytest.mark.asyncio
+async def test_synse_write_route_many(mock_write, no_pretty_json):
+    """Write many actions to a device at once."""
+
+    data = [
+        {'action': 'state', 'raw': 'on'},
+        {'action': 'color', 'raw': 'ff0000'},
+    ]
+
+    r = utils.make_request('/synse/write', data)
+
+    result = await write_route(r, 'rack-1', 'vec', '123456')
+    expected = '{"r":"rack-1","b":"vec","d":"123456"}'
+
+    assert isinstance(result, HTTPResponse)
+    assert result.status == 200
+    assert result.body == expected.encode('ascii')
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('data', [
+    [],
+    [{'action': 'state', 'raw': 'on'}, {'key1': 'color'}],
+    ['state'],
+])
+async def test_synse_write_route_many_invalid(mock_write, no_pretty_json, data):
+    """Write many actions to a device, when some of them are invalid."""
+
+    r = utils.make_request('/synse/write', data)
+
+    with pytest.raises(SynseError):
+        await write_route(r, 'rack-1', 'vec', '123456')
+
+
+@pytest.mark.asyncio
+async def test_synse_batch_write_route(mock_batch_write, no_pretty_json):
+    """Write to many devices at once."""
+
+    data = [
+        {'rack': 'rack-1', 'board': 'vec', 'device': '1', 'action': 'state', 'raw': 'on'},
+        {'rack': 'rack-1', 'board': 'vec', 'device': '2', 'raw': 'ff0000'},
+    ]
+
+    r = utils.make_request('/synse/write', data)
+
+    result = await batch_write_route(r)
+
+    assert isinstance(result, HTTPResponse)
+    assert result.status == 200
+    mock_batch_write.assert_called_once_with(writes=data)
+
+
+@pytest.mark.asyncio
+async def test_synse_batch_write_route_selectors(mock_batch_write, no_pretty_json):
+    """Write to all devices matching the selectors."""
+
+    data = {
+        'selectors': {'type': 'led'},
+        'action': 'state',
+        'raw': 'off'
+    }
+
+    r = utils.make_request('/synse/write', data)
+
+    result = await batch_write_route(r)
+
+    assert isinstance(result, HTTPResponse)
+    assert result.status == 200
+    mock_batch_write.assert_called_once_with(
+        selectors={'type': 'led'},
+        data={'action': 'state', 'raw': 'off'}
+    )
+
+
+@pytest.mark.asyncio
+async def test_synse_batch_write_route_bad_json(mock_batch_write, no_pretty_json):
+    """Batch write when invalid JSON is posted."""
+
+    r = utils.make_request('/synse/write')
+    r.body = '{{/.'
+
+    with pytest.raises(InvalidJsonError):
+        await batch_write_route(r)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('data', [
+    {'action': 'state'},
+    {'selectors': 'led', 'action': 'state'},
+    {'selectors': {'type': 'led'}},
+    [{'rack': 'rack-1', 'board': 'vec', 'action': 'state'}],
+    [{'rack': 'rack-1', 'board': 'vec', 'device': '1'}],
+    ['state'],
+    [{'rack': 'rack-1', 'board': 'vec', 'device': 1, 'action': 'state'}],
+    [{'rack': ['rack-1'], 'board': 'vec', 'device': '1', 'action': 'state'}],
+    [{'rack': 'rack-1', 'board': 'vec', 'device': '1', 'action': ['state']}],
+    [{'rack': 'rack-1', 'board': 'vec', 'device': '1', 'action': 'state', 'raw': 1}],
+    {'selectors': {'type': 1}, 'action': 'state'},
+    {'selectors': {'type': ['led']}, 'action': 'state'},
+    {'selectors': {'type': 'led'}, 'action': {'state': 'on'}},
+    {'selectors': {}, 'action': 'state', 'raw': 'on'},
+    {'selectors': {'rack': None}, 'action': 'state', 'raw': 'on'},
+    {'selectors': {'rack': None, 'type': None}, 'action': 'state', 'raw': 'on'},
+    {'selectors': {'type': ''}, 'action': 'state', 'raw': 'on'},
+])
+async def test_synse_batch_write_route_invalid(mock_batch_write, no_pretty_json, data):
+    """Batch write when the posted writes are invalid."""
+
+    r = utils.make_request('/synse/write', data)
+
+    with pytest.raises(InvalidArgumentsError):
+        await batch_write_route(r)
+
+    mock_batch_write.assert_not_called()
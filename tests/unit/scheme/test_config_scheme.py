@@ -32,3 +32,9 @@ def test_config_scheme_hidden_value():
         'debug': False,
         'pretty_json': True
     }
+
+
+def test_config_scheme_validator():
+    """The config does not change while running, so it has a single version."""
+    assert ConfigResponse().validator is ConfigResponse().validator
+    assert ConfigResponse().validator.etag.endswith('-config"')
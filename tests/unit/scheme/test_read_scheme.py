@@ -4,7 +4,9 @@
 import pytest
 from synse_plugin import api
 
-from synse.scheme.read import ReadResponse
+from synse import errors
+from synse.scheme.read import (BatchReadResponse, OutputFormatter,
+                               ReadResponse, compile_formatters)
 
 
 def make_metainfo_response():
@@ -273,3 +275,138 @@ def test_read_scheme_no_precision():
             }
         }
     }
+
+
+def test_read_scheme_cached():
+    """Test that the read scheme includes the cache info, when given."""
+    dev = make_metainfo_response()
+
+    rr = api.ReadResponse(
+        timestamp='november',
+        type='temperature',
+        value='10'
+    )
+
+    response_scheme = ReadResponse(dev, [rr], cached=True, age=0.51234)
+
+    assert response_scheme.data['cached'] is True
+    assert response_scheme.data['age'] == 0.512
+    assert response_scheme.data['data']['temperature']['value'] == 10.0
+
+
+def test_read_scheme_formatters():
+    """Readings are formatted with the given compiled formatters."""
+    dev = make_metainfo_response()
+    formatters = compile_formatters(dev.output)
+
+    rr = api.ReadResponse(timestamp='november', type='temperature', value='10.12345')
+
+    r1 = ReadResponse(dev, [rr], formatters=formatters)
+    r2 = ReadResponse(dev, [rr], formatters=formatters)
+
+    assert r1.data['data']['temperature']['value'] == 10.123
+
+    # the unit is not rebuilt for each response
+    assert r1.data['data']['temperature']['unit'] is formatters['temperature'].unit
+    assert r2.data['data']['temperature']['unit'] is formatters['temperature'].unit
+
+
+def test_compile_formatters():
+    """Compile the formatters for a device's outputs."""
+    formatters = compile_formatters([
+        api.MetaOutput(type='temperature', data_type='float', precision=2),
+        api.MetaOutput(type='temperature', data_type='int'),
+        api.MetaOutput(type='state', data_type='string'),
+    ])
+
+    assert set(formatters) == {'temperature', 'state'}
+
+    # the first output for a reading type is used
+    assert formatters['temperature'].data_type == 'float'
+    assert formatters['temperature'].precision == 2
+    assert formatters['state'].unit is None
+
+
+@pytest.mark.parametrize('data_type,precision,value,expected', [
+    ('float', 0, '10', 10.0),
+    ('float', 2, '10.12345', 10.12),
+    ('float', 2, 'foo', 'foo'),
+    ('int', 0, '10.7', 10),
+    ('int', 1, '10.75', 10),
+    ('int', 1, 'inf', 'inf'),
+    ('bool', 0, 'True', True),
+    ('bool', 0, 'foo', 'foo'),
+    ('bool', 2, '1', '1.0'),
+    ('string', 2, '1.23456', '1.23'),
+    ('string', 0, 'on', 'on'),
+    ('unknown', 1, '1.23', '1.2'),
+])
+def test_output_formatter_convert(data_type, precision, value, expected):
+    """Convert reading values to an output's precision and data type."""
+    formatter = OutputFormatter(
+        api.MetaOutput(type='temperature', data_type=data_type, precision=precision)
+    )
+
+    converted = formatter.convert(value)
+    assert converted == expected
+    assert isinstance(converted, type(expected))
+
+
+def test_batch_read_scheme():
+    """Test that the batch read scheme matches the expected."""
+    dev = make_metainfo_response()
+
+    rr = api.ReadResponse(
+        timestamp='november',
+        type='temperature',
+        value='10'
+    )
+
+    response_scheme = BatchReadResponse(
+        devices=[('rack-1', 'vec', '12345'), ('rack-1', 'vec', '67890')],
+        results=[ReadResponse(dev, [rr]), errors.DeviceNotFoundError('not found')]
+    )
+
+    assert response_scheme.data == {
+        'readings': [
+            {
+                'location': {
+                    'rack': 'rack-1',
+                    'board': 'vec',
+                    'device': '12345'
+                },
+                'type': 'thermistor',
+                'data': {
+                    'temperature': {
+                        'value': 10.0,
+                        'timestamp': 'november',
+                        'unit': {
+                            'name': 'celsius',
+                            'symbol': 'C'
+                        }
+                    }
+                }
+            },
+            {
+                'location': {
+                    'rack': 'rack-1',
+                    'board': 'vec',
+                    'device': '67890'
+                },
+                'error': {
+                    'http_code': 404,
+                    'error_id': errors.DEVICE_NOT_FOUND,
+                    'description': 'device not found',
+                    'context': 'not found'
+                }
+            }
+        ]
+    }
+
+
+def test_batch_read_scheme_empty():
+    """Test the batch read scheme when there are no devices."""
+
+    response_scheme = BatchReadResponse(devices=[], results=[])
+
+    assert response_scheme.data == {'readings': []}
@@ -12,3 +12,12 @@ def test_test_scheme():
     assert 'timestamp' in response_scheme.data
 
     assert response_scheme.data['status'] == 'ok'
+
+
+def test_test_scheme_cache():
+    """Test that the test scheme includes the cache metrics, if given."""
+
+    metrics = {'metainfo_rebuilds': {'calls': 1, 'coalesced': 2}}
+
+    assert 'cache' not in TResp().data
+    assert TResp(cache=metrics).data['cache'] == metrics
@@ -2,7 +2,9 @@
 
 from synse_plugin import api
 
-from synse.scheme.transaction import (TransactionListResponse,
+from synse import errors
+from synse.scheme.transaction import (BatchTransactionResponse,
+                                      TransactionListResponse,
                                       TransactionResponse)
 
 
@@ -51,3 +53,49 @@ def test_transaction_list_scheme():
 
     response_scheme = TransactionListResponse(ids)
     assert response_scheme.data == ids
+
+
+def test_batch_transaction_scheme():
+    """Test that the batch transaction scheme matches the expected."""
+
+    ctx = {
+        'action': 'test',
+        'raw': ['abcd']
+    }
+    wr = api.WriteResponse(
+        created='october',
+        updated='november',
+        status=3,
+        state=0,
+    )
+
+    response_scheme = BatchTransactionResponse(
+        ['123456', 'abcdef'],
+        [
+            TransactionResponse('123456', ctx, wr),
+            errors.TransactionNotFoundError('not found')
+        ]
+    )
+
+    assert response_scheme.data == {
+        'transactions': [
+            {
+                'id': '123456',
+                'context': ctx,
+                'state': 'ok',
+                'status': 'done',
+                'created': 'october',
+                'updated': 'november',
+                'message': ''
+            },
+            {
+                'id': 'abcdef',
+                'error': {
+                    'http_code': 404,
+                    'error_id': errors.TRANSACTION_NOT_FOUND,
+                    'description': 'transaction not found',
+                    'context': 'not found'
+                }
+            }
+        ]
+    }
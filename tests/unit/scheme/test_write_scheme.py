@@ -2,7 +2,8 @@
 
 from synse_plugin import api
 
-from synse.scheme.write import WriteResponse
+from synse import errors
+from synse.scheme.write import BatchWriteResponse, WriteResponse
 
 
 def test_write_scheme():
@@ -43,3 +44,51 @@ def test_write_scheme():
             'transaction': '!@#$%^'
         }
     ]
+
+
+def test_batch_write_scheme():
+    """Check that the batch write scheme matches the expected."""
+
+    wd = api.WriteData(raw=[b'on'], action='state')
+
+    response_scheme = BatchWriteResponse(
+        [('rack-1', 'vec', '1'), ('rack-1', 'vec', '2')],
+        [
+            {'123456': wd},
+            errors.DeviceNotFoundError('rack-1/vec/2 does not correspond with a known device'),
+        ]
+    )
+
+    assert response_scheme.data == {
+        'writes': [
+            {
+                'location': {
+                    'rack': 'rack-1',
+                    'board': 'vec',
+                    'device': '1'
+                },
+                'transactions': [
+                    {
+                        'context': {
+                            'action': 'state',
+                            'raw': [b'on']
+                        },
+                        'transaction': '123456'
+                    }
+                ]
+            },
+            {
+                'location': {
+                    'rack': 'rack-1',
+                    'board': 'vec',
+                    'device': '2'
+                },
+                'error': {
+                    'http_code': 404,
+                    'error_id': errors.DEVICE_NOT_FOUND,
+                    'description': 'device not found',
+                    'context': 'rack-1/vec/2 does not correspond with a known device'
+                }
+            }
+        ]
+    }
@@ -1,7 +1,9 @@
 """Test the 'synse.cache' Synse Server module."""
 # pylint: disable=redefined-outer-name,unused-argument
 
+import asyncio
 import os
+import time
 
 import aiocache
 import asynctest
@@ -9,7 +11,7 @@ import grpc
 import pytest
 from synse_plugin import api
 
-from synse import cache, errors, plugin
+from synse import cache, config, errors, plugin, utils
 from tests import data_dir
 
 # -- Helper Methods ---
@@ -50,37 +52,55 @@ def make_metainfo_response(rack, board, device):
 
 
 def mock_get_metainfo_cache():
-    """Mock method for get_metainfo_cache - returns a single device."""
+    """Mock metainfo cache data - a single device."""
     return {
         'rack-1-vec-12345': make_metainfo_response('rack-1', 'vec', '12345')
     }
 
 
-def mock_client_metainfo(rack=None, board=None):
+async def mock_client_metainfo(rack=None, board=None):
     """Mock method for the gRPC client's metainfo method."""
     # reuse the metainforesponse defined above
     mir = mock_get_metainfo_cache()['rack-1-vec-12345']
     return [mir]
 
 
-def mock_client_metainfo_empty(rack=None, board=None):
+async def mock_client_metainfo_empty(rack=None, board=None):
     """Mock method for the gRPC client's metainfo method that contains empty metainfo."""
     return []
 
 
-def mock_client_metainfo_fail(rack=None, board=None):
+async def mock_client_metainfo_fail(rack=None, board=None):
     """Mock method for the gRPC client's metainfo method that is intended to fail."""
     raise grpc.RpcError()
 
+async def mock_client_metainfo_slow(rack=None, board=None):
+    """Mock method for the gRPC client's metainfo method that is slow to respond."""
+    await asyncio.sleep(0.2)
+    return await mock_client_metainfo(rack, board)
+
+
+async def mock_client_metainfo_hang(rack=None, board=None):
+    """Mock method for the gRPC client's metainfo method that never responds in time."""
+    await asyncio.sleep(10)
+    return await mock_client_metainfo(rack, board)
+
 # --- Test Fixtures ---
 
 
+def mock_build_metainfo_cache(names=None):
+    """Mock method for _build_metainfo_cache - returns a single device."""
+    return mock_get_metainfo_cache(), {'rack-1-vec-12345': 'test-plugin'}
+
+
 @pytest.fixture()
 def patch_metainfo(monkeypatch):
-    """Fixture to monkeypatch the get_metainfo_cache method."""
-    mock = asynctest.CoroutineMock(cache.get_metainfo_cache, side_effect=mock_get_metainfo_cache)
-    monkeypatch.setattr(cache, 'get_metainfo_cache', mock)
-    return patch_metainfo
+    """Fixture to monkeypatch the _build_metainfo_cache method."""
+    mock = asynctest.CoroutineMock(
+        cache._build_metainfo_cache, side_effect=mock_build_metainfo_cache
+    )
+    monkeypatch.setattr(cache, '_build_metainfo_cache', mock)
+    return mock
 
 
 @pytest.fixture()
@@ -125,41 +145,33 @@ async def test_clear_cache():
 
 
 @pytest.mark.asyncio
-async def test_clear_all_meta_caches():
+async def test_clear_all_meta_caches(patch_metainfo):
     """Clear all meta-info caches."""
 
-    meta = aiocache.SimpleMemoryCache(namespace=cache.NS_META)
-    scan = aiocache.SimpleMemoryCache(namespace=cache.NS_SCAN)
-    info = aiocache.SimpleMemoryCache(namespace=cache.NS_INFO)
-    other = aiocache.SimpleMemoryCache(namespace='other')
-
-    # first, populate the test caches
-    for c in [meta, scan, info, other]:
-        ok = await c.set('key', 'value')
-        assert ok
+    # first, build the metainfo snapshot
+    snapshot = await cache.get_snapshot()
+    assert cache._snapshot is snapshot
 
     # clear the meta caches
     await cache.clear_all_meta_caches()
+    assert cache._snapshot is None
 
-    # now, the meta caches should be empty, but the other cache
-    # should not be affected.
-    for c in [meta, scan, info]:
-        val = await c.get('key')
-        assert val is None
-
-    val = await other.get('key')
-    assert val == 'value'
+    # the snapshot should be rebuilt on the next request
+    new_snapshot = await cache.get_snapshot()
+    assert new_snapshot is not snapshot
+    assert new_snapshot.version > snapshot.version
+    assert patch_metainfo.call_count == 2
 
 
 @pytest.mark.asyncio
 async def test_get_transaction_ok(clear_caches):
     """Get transaction info from the transaction cache."""
 
-    ok = await cache.transaction_cache.set('key', 'value')
-    assert ok
+    cache.transaction_store.add('key', {'action': 'test'}, 'foo')
 
     val = await cache.get_transaction('key')
-    assert val == 'value'
+    assert val['plugin'] == 'foo'
+    assert val['context'] == {'action': 'test'}
 
 
 @pytest.mark.asyncio
@@ -174,19 +186,22 @@ async def test_get_transaction_none(clear_caches):
 async def test_add_transaction_new(clear_caches):
     """Add a new value to the transaction cache."""
 
-    pre = await cache.transaction_cache.get('test')
+    pre = await cache.get_transaction('test')
     assert pre is None
 
     ok = await cache.add_transaction('test', {'action': 'test', 'raw': None}, 'foo')
     assert ok
 
-    post = await cache.transaction_cache.get('test')
+    post = await cache.get_transaction('test')
     assert post == {
         'plugin': 'foo',
         'context': {
             'action': 'test',
             'raw': None
-        }
+        },
+        'device': None,
+        'state': 'ok',
+        'status': 'pending'
     }
 
 
@@ -194,39 +209,168 @@ async def test_add_transaction_new(clear_caches):
 async def test_add_transaction_existing(clear_caches):
     """Update an existing value in the transaction cache."""
 
-    pre = await cache.transaction_cache.get('test')
+    pre = await cache.get_transaction('test')
     assert pre is None
 
     ok = await cache.add_transaction('test', {'action': 'test', 'raw': None}, 'foo')
     assert ok
 
-    post = await cache.transaction_cache.get('test')
+    post = await cache.get_transaction('test')
     assert post == {
         'plugin': 'foo',
         'context': {
             'action': 'test',
             'raw': None
-        }
+        },
+        'device': None,
+        'state': 'ok',
+        'status': 'pending'
     }
 
-    ok = await cache.add_transaction('test', {'action': 'test2', 'raw': '1'}, 'foo2')
+    ok = await cache.add_transaction(
+        'test', {'action': 'test2', 'raw': '1'}, 'foo2', ('rack-1', 'vec', '1')
+    )
     assert ok
 
-    post = await cache.transaction_cache.get('test')
+    post = await cache.get_transaction('test')
     assert post == {
         'plugin': 'foo2',
         'context': {
             'action': 'test2',
             'raw': '1'
-        }
+        },
+        'device': ('rack-1', 'vec', '1'),
+        'state': 'ok',
+        'status': 'pending'
     }
+    assert await cache.list_transactions(plugin='foo') == []
+    assert await cache.list_transactions(plugin='foo2') == ['test']
+
+
+@pytest.mark.asyncio
+async def test_update_transaction(clear_caches):
+    """Update the last known state of a cached transaction."""
+
+    await cache.add_transaction('test', {'action': 'test'}, 'foo')
+    await cache.update_transaction('test', api.WriteResponse(status=3, state=1))
+
+    post = await cache.get_transaction('test')
+    assert post['status'] == 'done'
+    assert post['state'] == 'error'
+    assert await cache.list_transactions(status='pending') == []
+    assert await cache.list_transactions(status='done', state='error') == ['test']
+
+    # updating an unknown transaction does nothing
+    await cache.update_transaction('other', api.WriteResponse(status=3))
+    assert await cache.get_transaction('other') is None
+
+
+@pytest.mark.asyncio
+async def test_list_transactions(clear_caches):
+    """List cached transactions by their fields."""
+
+    await cache.add_transaction('t1', {}, 'foo', ('rack-1', 'vec', '1'))
+    await cache.add_transaction('t2', {}, 'bar', ('rack-1', 'vec', '2'))
+    await cache.add_transaction('t3', {}, 'foo', ('rack-2', 'vec', '1'))
+    await cache.add_transaction('t4', {}, 'foo')
+    await cache.update_transaction('t3', api.WriteResponse(status=3))
+
+    assert await cache.list_transactions() == ['t1', 't2', 't3', 't4']
+    assert await cache.list_transactions(plugin='foo') == ['t1', 't3', 't4']
+    assert await cache.list_transactions(rack='rack-1') == ['t1', 't2']
+    assert await cache.list_transactions(board='vec', device='1') == ['t1', 't3']
+    assert await cache.list_transactions(rack='rack-1', board='vec', device='1') == ['t1']
+    assert await cache.list_transactions(plugin='foo', status='pending') == ['t1', 't4']
+    assert await cache.list_transactions(plugin='baz') == []
+    assert await cache.list_transactions(plugin=None) == ['t1', 't2', 't3', 't4']
+
+    # pagination
+    assert await cache.list_transactions(limit=2) == ['t1', 't2']
+    assert await cache.list_transactions(offset=2, limit=2) == ['t3', 't4']
+    assert await cache.list_transactions(offset=3) == ['t4']
+    assert await cache.list_transactions(offset=1, limit=1, plugin='foo') == ['t3']
+    assert await cache.list_transactions(offset=10) == []
+
+    with pytest.raises(errors.InvalidArgumentsError):
+        await cache.list_transactions(context='foo')
+
+
+def test_transaction_store_expire():
+    """Transactions are expired by the store's timer wheel."""
+
+    store = cache.TransactionStore()
+    store.wheel = utils.TimerWheel(resolution=0.01)
+
+    store.add('t1', {}, 'foo', ttl=0.02)
+    store.add('t2', {}, 'foo', ttl=0.5)
+    store.add('t3', {}, 'foo')
+    assert store.select() == ['t1', 't2', 't3']
+
+    time.sleep(0.04)
+    assert store.get('t1') is None
+    assert store.select(plugin='foo') == ['t2', 't3']
+    assert 'foo' in store.indexes['plugin']
+
+    # re-adding a transaction reschedules its expiry
+    store.add('t2', {}, 'foo', ttl=0.02)
+    time.sleep(0.04)
+    assert store.select() == ['t3']
+    assert len(store.wheel) == 0
+
+
+def test_transaction_store_clear():
+    """Clear the transaction store."""
+
+    store = cache.TransactionStore()
+    store.add('t1', {}, 'foo', ('rack-1', 'vec', '1'), ttl=10)
+    store.clear()
+
+    assert store.select() == []
+    assert store.indexes == {f: {} for f in cache.TRANSACTION_FILTERS}
+    assert len(store.wheel) == 0
+
+
+def test_get_read_ttl():
+    """Get the read cache TTL for device types."""
+
+    assert not cache.get_read_ttl('temperature')
+
+    config.options.set('cache.read.ttl', 2)
+    config.options.set('cache.read.types', {'led': 0, 'fan': 5})
+
+    assert cache.get_read_ttl('temperature') == 2
+    assert cache.get_read_ttl('led') == 0
+    assert cache.get_read_ttl('fan') == 5
+
+
+@pytest.mark.asyncio
+async def test_add_reading(clear_caches):
+    """Add readings to the read cache."""
+
+    assert await cache.get_reading('rack-1-vec-12345') is None
+
+    added = await cache.add_reading('rack-1-vec-12345', ['reading'], 10)
+    assert added['readings'] == ['reading']
+
+    reading = await cache.get_reading('rack-1-vec-12345')
+    assert reading == added
+    assert reading['time'] <= time.monotonic()
+
+
+@pytest.mark.asyncio
+async def test_add_reading_expires(clear_caches):
+    """Readings expire from the read cache after their TTL."""
+
+    await cache.add_reading('rack-1-vec-12345', ['reading'], 0.1)
+    assert await cache.get_reading('rack-1-vec-12345') is not None
+
+    await asyncio.sleep(0.15)
+    assert await cache.get_reading('rack-1-vec-12345') is None
 
 
 @pytest.mark.asyncio
 async def test_get_device_meta_ok(patch_metainfo, clear_caches):
     """Get device metainfo."""
-    # add a plugin record to for the device
-    await cache._plugins_cache.set(cache.PLUGINS_CACHE_KEY, {'rack-1-vec-12345': 'test-plugin'})
 
     plugin_name, dev = await cache.get_device_meta('rack-1', 'vec', '12345')
     assert plugin_name == 'test-plugin'
@@ -236,6 +380,58 @@ async def test_get_device_meta_ok(patch_metainfo, clear_caches):
     assert dev.location.board == 'vec'
 
 
+@pytest.mark.asyncio
+async def test_resolve_device(patch_metainfo, clear_caches):
+    """Resolve a device to its metainfo and plugin."""
+
+    resolved = await cache.resolve_device('rack-1', 'vec', '12345')
+    assert isinstance(resolved, cache.ResolvedDevice)
+    assert (resolved.rack, resolved.board, resolved.device) == ('rack-1', 'vec', '12345')
+    assert resolved.plugin_name == 'test-plugin'
+    assert resolved.meta.uid == '12345'
+
+    # the plugin is not registered
+    assert resolved.plugin is None
+
+
+@pytest.mark.asyncio
+async def test_resolve_device_current(patch_metainfo, clear_caches, monkeypatch):
+    """Resolving a device does not await the snapshot while it is current."""
+
+    resolved = await cache.resolve_device('rack-1', 'vec', '12345')
+
+    mock = asynctest.CoroutineMock(cache.get_snapshot)
+    monkeypatch.setattr(cache, 'get_snapshot', mock)
+
+    assert await cache.resolve_device('rack-1', 'vec', '12345') is resolved
+    mock.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_current_snapshot(patch_metainfo, clear_caches, monkeypatch):
+    """Get the current snapshot only if it can be used as it is."""
+
+    assert cache.current_snapshot() is None
+
+    snapshot = await cache.get_snapshot()
+    assert cache.current_snapshot() is snapshot
+
+    monkeypatch.setattr(snapshot, 'is_expired', lambda: True)
+    assert cache.current_snapshot() is None
+
+    # the expired snapshot is not refreshed
+    assert cache._snapshot is snapshot
+    assert patch_metainfo.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_resolve_device_not_found(clear_caches):
+    """Resolve a device which doesn't exist."""
+
+    with pytest.raises(errors.DeviceNotFoundError):
+        await cache.resolve_device('foo', 'bar', 'baz')
+
+
 @pytest.mark.asyncio
 async def test_get_device_meta_not_found(clear_caches):
     """Get device metainfo when the specified device doesn't exist."""
@@ -326,6 +522,157 @@ async def test_get_metainfo_cache_partial_failure(plugin_context, clear_caches):
     assert len(meta) == 1  # two plugins registered, but only one successful
 
 
+@pytest.mark.asyncio
+async def test_get_metainfo_cache_concurrent(plugin_context, clear_caches):
+    """Get the metainfo cache when plugins are slow to respond. The plugins
+    should be queried concurrently.
+    """
+
+    # create & register new plugins
+    plugins = [('foo', 'localhost:9999'), ('bar', 'localhost:9998'), ('baz', 'localhost:9997')]
+    for name, addr in plugins:
+        p = plugin.Plugin(name, addr, 'tcp')
+        p.client.metainfo = mock_client_metainfo_slow
+
+    start = time.time()
+    meta = await cache.get_metainfo_cache()
+    elapsed = time.time() - start
+
+    assert isinstance(meta, dict)
+    assert 'rack-1-vec-12345' in meta
+
+    # if the plugins were queried serially, this would take at least 0.6s
+    assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_get_metainfo_cache_plugin_timeout(plugin_context, clear_caches):
+    """Get the metainfo cache when a plugin does not respond within the deadline."""
+
+    config.options.set('grpc.timeout', 0.2)
+
+    # create & register new plugins
+    p = plugin.Plugin('foo', 'localhost:9999', 'tcp')
+    p.client.metainfo = mock_client_metainfo
+
+    p = plugin.Plugin('bar', 'localhost:9998', 'tcp')
+    p.client.metainfo = mock_client_metainfo_hang  # override to induce timeout
+
+    start = time.time()
+    meta = await cache.get_metainfo_cache()
+    elapsed = time.time() - start
+
+    assert isinstance(meta, dict)
+    assert len(meta) == 1  # two plugins registered, but only one responded
+    assert elapsed < 1
+
+
+@pytest.mark.asyncio
+async def test_get_metainfo_cache_coalesced(plugin_context, clear_caches):
+    """Concurrent cache misses should result in a single rebuild."""
+
+    mock = asynctest.CoroutineMock(side_effect=mock_client_metainfo_slow)
+
+    # create & register new plugin
+    p = plugin.Plugin('foo', 'localhost:9999', 'tcp')
+    p.client.metainfo = mock
+
+    calls = cache.metainfo_rebuilds.calls
+    coalesced = cache.metainfo_rebuilds.coalesced
+
+    results = await asyncio.gather(*[cache.get_metainfo_cache() for _ in range(10)])
+    for meta in results:
+        assert 'rack-1-vec-12345' in meta
+
+    assert mock.call_count == 1
+    assert cache.metainfo_rebuilds.calls == calls + 1
+    assert cache.metainfo_rebuilds.coalesced == coalesced + 9
+
+
+@pytest.mark.asyncio
+async def test_get_metainfo_cache_serve_stale(plugin_context, clear_caches):
+    """Get the metainfo cache after it expires, when serving stale data is enabled."""
+
+    config.options.set('cache.meta.serve_stale', True)
+    config.options.set('cache.meta.ttl', 0.1)
+    config.options.set('cache.meta.max_stale', 60)
+    mock = asynctest.CoroutineMock(side_effect=mock_client_metainfo_slow)
+
+    # create & register new plugin
+    p = plugin.Plugin('foo', 'localhost:9999', 'tcp')
+    p.client.metainfo = mock
+
+    meta = await cache.get_metainfo_cache()
+    assert 'rack-1-vec-12345' in meta
+    assert mock.call_count == 1
+
+    # let the metainfo snapshot expire
+    snapshot = cache._snapshot
+    await asyncio.sleep(0.15)
+    assert snapshot.is_expired()
+
+    # the stale data should be returned without waiting on the plugin
+    start = time.time()
+    meta = await cache.get_metainfo_cache()
+    elapsed = time.time() - start
+
+    assert 'rack-1-vec-12345' in meta
+    assert elapsed < 0.2
+
+    plugin_name, dev = await cache.get_device_meta('rack-1', 'vec', '12345')
+    assert plugin_name == 'foo'
+    assert dev.uid == '12345'
+
+    # the snapshot should be refreshed in the background
+    await asyncio.sleep(0.3)
+    assert mock.call_count == 2
+    assert cache._snapshot.age() < 0.2
+
+
+@pytest.mark.asyncio
+async def test_get_metainfo_cache_serve_stale_too_old(plugin_context, clear_caches):
+    """Get the metainfo cache after it expires, when the stale data is too old
+    to be served.
+    """
+
+    config.options.set('cache.meta.serve_stale', True)
+    config.options.set('cache.meta.ttl', 0.1)
+    config.options.set('cache.meta.max_stale', 0.1)
+    mock = asynctest.CoroutineMock(side_effect=mock_client_metainfo_slow)
+
+    # create & register new plugin
+    p = plugin.Plugin('foo', 'localhost:9999', 'tcp')
+    p.client.metainfo = mock
+
+    await cache.get_metainfo_cache()
+    assert mock.call_count == 1
+
+    # let the metainfo snapshot expire beyond its max staleness
+    await asyncio.sleep(0.25)
+
+    # the stale data is too old, so the snapshot is rebuilt inline
+    meta = await cache.get_metainfo_cache()
+    assert 'rack-1-vec-12345' in meta
+    assert mock.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_clear_all_meta_caches_no_stale(plugin_context, clear_caches):
+    """Clearing the meta caches should not leave stale data to be served."""
+
+    config.options.set('cache.meta.serve_stale', True)
+
+    # create & register new plugin
+    p = plugin.Plugin('foo', 'localhost:9999', 'tcp')
+    p.client.metainfo = mock_client_metainfo
+
+    await cache.get_metainfo_cache()
+    assert cache._snapshot is not None
+
+    await cache.clear_all_meta_caches()
+    assert cache._snapshot is None
+
+
 @pytest.mark.asyncio
 async def test_get_metainfo_cache_no_plugins(clear_caches, plugin_context):
     """Get the metainfo cache when there are no plugins to provide data."""
@@ -416,6 +763,415 @@ async def test_get_resource_info_cache_exist(patch_metainfo, clear_caches):
     validate_info_cache(second_info_cache, 'rack-1', 'vec', '12345')
 
 
+@pytest.mark.asyncio
+async def test_get_snapshot_consistent(patch_metainfo, clear_caches):
+    """The metainfo, scan, and info data come from a single snapshot build,
+    and the derived data is not rebuilt on subsequent requests.
+    """
+
+    snapshot = await cache.get_snapshot()
+    assert isinstance(snapshot, cache.MetainfoSnapshot)
+    assert 'rack-1-vec-12345' in snapshot.metainfo
+    assert snapshot.plugins == {'rack-1-vec-12345': 'test-plugin'}
+    validate_scan_cache(snapshot.scan, 'rack-1', 'vec', '12345')
+    validate_info_cache(snapshot.info, 'rack-1', 'vec', '12345')
+
+    assert await cache.get_metainfo_cache() is snapshot.metainfo
+    assert await cache.get_scan_cache() is snapshot.scan
+    assert await cache.get_resource_info_cache() is snapshot.info
+    assert patch_metainfo.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_snapshot_expired_unchanged(patch_metainfo, clear_caches):
+    """An expired snapshot is refreshed, but is kept if its devices did not change."""
+
+    config.options.set('cache.meta.ttl', 0.1)
+
+    snapshot = await cache.get_snapshot()
+    assert not snapshot.is_expired()
+
+    await asyncio.sleep(0.15)
+    assert snapshot.is_expired()
+
+    new_snapshot = await cache.get_snapshot()
+    assert new_snapshot is snapshot
+    assert new_snapshot.version == snapshot.version
+    assert not new_snapshot.is_expired()
+    assert patch_metainfo.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_snapshot_expired_changed(patch_metainfo, clear_caches):
+    """An expired snapshot is rebuilt, with a new version, if its devices changed."""
+
+    config.options.set('cache.meta.ttl', 0.1)
+
+    snapshot = await cache.get_snapshot()
+
+    # add a new device to the metainfo returned by the next refresh
+    patch_metainfo.side_effect = lambda names=None: (
+        {
+            'rack-1-vec-12345': make_metainfo_response('rack-1', 'vec', '12345'),
+            'rack-1-vec-54321': make_metainfo_response('rack-1', 'vec', '54321'),
+        },
+        {
+            'rack-1-vec-12345': 'test-plugin',
+            'rack-1-vec-54321': 'test-plugin',
+        }
+    )
+
+    await asyncio.sleep(0.15)
+
+    new_snapshot = await cache.get_snapshot()
+    assert new_snapshot is not snapshot
+    assert new_snapshot.version > snapshot.version
+    assert 'rack-1-vec-54321' in new_snapshot.metainfo
+    validate_scan_cache(new_snapshot.scan, 'rack-1', 'vec', '54321')
+    validate_info_cache(new_snapshot.info, 'rack-1', 'vec', '54321')
+
+
+def test_partition_diff():
+    """Compare a partition against newly collected meta-information."""
+
+    partition = cache.MetainfoPartition(
+        'foo',
+        {
+            'rack-1-vec-1': make_metainfo_response('rack-1', 'vec', '1'),
+            'rack-1-vec-2': make_metainfo_response('rack-1', 'vec', '2'),
+            'rack-1-vec-3': make_metainfo_response('rack-1', 'vec', '3'),
+        }
+    )
+
+    changed_info = make_metainfo_response('rack-1', 'vec', '2')
+    changed_info.info = 'changed'
+
+    # only the timestamp differs, which does not count as a change
+    same = make_metainfo_response('rack-1', 'vec', '1')
+    same.timestamp = 'november'
+
+    added, removed, changed = partition.diff({
+        'rack-1-vec-1': same,
+        'rack-1-vec-2': changed_info,
+        'rack-1-vec-4': make_metainfo_response('rack-1', 'vec', '4'),
+    })
+
+    assert added == {'rack-1-vec-4'}
+    assert removed == {'rack-1-vec-3'}
+    assert changed == {'rack-1-vec-2'}
+
+
+def test_partition_diff_unchanged():
+    """Compare a partition against the same meta-information."""
+
+    metainfo = {'rack-1-vec-1': make_metainfo_response('rack-1', 'vec', '1')}
+
+    partition = cache.MetainfoPartition('foo', metainfo)
+    assert partition.diff(dict(metainfo)) == (set(), set(), set())
+
+
+def test_snapshot_from_partitions():
+    """Build a snapshot from the partitions of multiple plugins."""
+
+    snapshot = cache.MetainfoSnapshot(
+        {
+            'foo': cache.MetainfoPartition(
+                'foo', {'rack-1-vec-1': make_metainfo_response('rack-1', 'vec', '1')}
+            ),
+            'bar': cache.MetainfoPartition(
+                'bar', {'rack-1-vec-2': make_metainfo_response('rack-1', 'vec', '2')}
+            ),
+        },
+        1
+    )
+
+    assert set(snapshot.metainfo) == {'rack-1-vec-1', 'rack-1-vec-2'}
+    assert snapshot.plugins == {'rack-1-vec-1': 'foo', 'rack-1-vec-2': 'bar'}
+    validate_scan_cache(snapshot.scan, 'rack-1', 'vec', '1')
+    validate_info_cache(snapshot.info, 'rack-1', 'vec', '2')
+
+    # the info data is built from the partitions' converted device info
+    devices = snapshot.info['rack-1']['boards']['vec']['devices']
+    assert devices['1'] is snapshot.partitions['foo'].info['rack-1-vec-1']
+    assert devices['2'] is snapshot.partitions['bar'].info['rack-1-vec-2']
+
+
+def test_snapshot_devices():
+    """The snapshot's device index is keyed by rack, board, and device."""
+
+    partition = cache.MetainfoPartition(
+        'foo', {'rack-1-vec-1': make_metainfo_response('rack-1', 'vec', '1')}
+    )
+    snapshot = cache.MetainfoSnapshot({'foo': partition}, 1)
+
+    resolved = snapshot.devices[('rack-1', 'vec', '1')]
+    assert resolved.plugin_name == 'foo'
+    assert resolved.meta is snapshot.metainfo['rack-1-vec-1']
+    assert set(resolved.formatters) == {'temperature'}
+    assert resolved.formatters['temperature'].precision == 3
+
+    # the resolved devices are built once per partition
+    assert resolved is partition.devices[('rack-1', 'vec', '1')]
+
+    # IDs which make the same id composite do not match
+    assert ('rack', '1-vec', '1') not in snapshot.devices
+
+
+def test_snapshot_validator():
+    """The snapshot's validator is derived from its version."""
+
+    snapshot = cache.MetainfoSnapshot({}, 1)
+
+    assert snapshot.validator.etag.endswith('-1"')
+    assert snapshot.validator.last_modified == snapshot.created
+    assert cache.MetainfoSnapshot({}, 2).validator.etag != snapshot.validator.etag
+
+
+def test_snapshot_encode(no_pretty_json):
+    """Response bodies are encoded once per snapshot."""
+
+    snapshot = cache.MetainfoSnapshot({}, 1)
+
+    encoded = snapshot.encode(('scan', None, None), {'racks': []})
+    assert encoded.body == b'{"racks":[]}'
+
+    # the body is not encoded again for the same response
+    assert snapshot.encode(('scan', None, None), {'racks': []}) is encoded
+    assert snapshot.encode(('scan', 'rack-1', None), {'id': 'rack-1'}) is not encoded
+
+    # a new snapshot encodes its own bodies
+    assert cache.MetainfoSnapshot({}, 2).encode(('scan', None, None), {'racks': []}) \
+        is not encoded
+
+
+def test_snapshot_select():
+    """Select devices from a snapshot using its secondary indexes."""
+
+    devices = {}
+    for rack, board, device, dtype, model in [
+            ('rack-1', 'vec', '1', 'temperature', 'MAX11610'),
+            ('rack-1', 'vec', '2', 'pressure', 'SDP610'),
+            ('rack-1', 'ipmi', '3', 'temperature', 'other'),
+            ('rack-2', 'vec', '4', 'temperature', 'MAX11610'),
+    ]:
+        d = make_metainfo_response(rack, board, device)
+        d.type = dtype
+        d.model = model
+        devices['{}-{}-{}'.format(rack, board, device)] = d
+
+    snapshot = cache.MetainfoSnapshot({'foo': cache.MetainfoPartition('foo', devices)}, 1)
+
+    def uids(selected):
+        """Get the IDs of the selected devices."""
+        return [d.uid for d in selected]
+
+    assert snapshot.index['type'] == {
+        'temperature': {'rack-1-vec-1', 'rack-1-ipmi-3', 'rack-2-vec-4'},
+        'pressure': {'rack-1-vec-2'},
+    }
+    assert snapshot.index['model']['max11610'] == {'rack-1-vec-1', 'rack-2-vec-4'}
+
+    assert uids(snapshot.select()) == ['3', '1', '2', '4']
+    assert uids(snapshot.select(type='temperature')) == ['3', '1', '4']
+    assert uids(snapshot.select(type='Temperature', model='max11610')) == ['1', '4']
+    assert uids(snapshot.select(rack='rack-1', board='vec')) == ['1', '2']
+    assert uids(snapshot.select(rack='rack-1', model='max11610', board=None)) == ['1']
+    assert uids(snapshot.select(protocol='FOO', rack='rack-2')) == ['4']
+    assert snapshot.select(type='led') == []
+    assert snapshot.select(rack='rack-3', type='temperature') == []
+
+    with pytest.raises(errors.InvalidArgumentsError):
+        snapshot.select(color='red')
+
+
+async def mock_client_metainfo_bar(rack=None, board=None):
+    """Mock method for the gRPC client's metainfo method, for a second plugin."""
+    return [make_metainfo_response('rack-1', 'vec', '54321')]
+
+
+@pytest.mark.asyncio
+async def test_refresh_plugin_metainfo(plugin_context, clear_caches):
+    """Refresh the meta-information for a single plugin."""
+
+    foo_plugin = plugin.Plugin('foo', 'localhost:9999', 'tcp')
+    foo_plugin.client.metainfo = asynctest.CoroutineMock(side_effect=mock_client_metainfo)
+    bar_plugin = plugin.Plugin('bar', 'localhost:9998', 'tcp')
+    bar_plugin.client.metainfo = asynctest.CoroutineMock(side_effect=mock_client_metainfo_bar)
+
+    snapshot = await cache.get_snapshot()
+    assert set(snapshot.partitions) == {'foo', 'bar'}
+    assert snapshot.plugins == {'rack-1-vec-12345': 'foo', 'rack-1-vec-54321': 'bar'}
+
+    # add a device to the 'bar' plugin
+    async def bar_metainfo(rack=None, board=None):
+        """Mock metainfo for 'bar' with an added device."""
+        return [
+            make_metainfo_response('rack-1', 'vec', '54321'),
+            make_metainfo_response('rack-1', 'vec', '99999'),
+        ]
+    bar_plugin.client.metainfo = asynctest.CoroutineMock(side_effect=bar_metainfo)
+
+    new_snapshot = await cache.refresh_plugin_metainfo('bar')
+    assert new_snapshot is cache._snapshot
+    assert new_snapshot.version > snapshot.version
+    assert 'rack-1-vec-99999' in new_snapshot.metainfo
+    assert new_snapshot.plugins['rack-1-vec-99999'] == 'bar'
+
+    # only the 'bar' plugin was asked for its meta-information, and the
+    # partition for 'foo' was carried over as-is
+    assert foo_plugin.client.metainfo.call_count == 1
+    assert bar_plugin.client.metainfo.call_count == 1
+    assert new_snapshot.partitions['foo'] is snapshot.partitions['foo']
+    assert new_snapshot.partitions['bar'] is not snapshot.partitions['bar']
+
+
+@pytest.mark.asyncio
+async def test_refresh_plugin_metainfo_fail(plugin_context, clear_caches):
+    """Refresh the meta-information for a single plugin which fails to respond."""
+
+    foo_plugin = plugin.Plugin('foo', 'localhost:9999', 'tcp')
+    foo_plugin.client.metainfo = mock_client_metainfo
+    bar_plugin = plugin.Plugin('bar', 'localhost:9998', 'tcp')
+    bar_plugin.client.metainfo = mock_client_metainfo_bar
+
+    snapshot = await cache.get_snapshot()
+
+    bar_plugin.client.metainfo = mock_client_metainfo_fail
+
+    # the failed plugin's devices are dropped, the others are kept
+    new_snapshot = await cache.refresh_plugin_metainfo('bar')
+    assert set(new_snapshot.partitions) == {'foo'}
+    assert new_snapshot.partitions['foo'] is snapshot.partitions['foo']
+    assert 'rack-1-vec-54321' not in new_snapshot.metainfo
+
+
+@pytest.mark.asyncio
+async def test_get_snapshot_partition_expired(plugin_context, clear_caches):
+    """Only the expired partitions of a snapshot are refreshed."""
+
+    config.options.set('cache.meta.ttl', 0.2)
+
+    foo_plugin = plugin.Plugin('foo', 'localhost:9999', 'tcp')
+    foo_plugin.client.metainfo = asynctest.CoroutineMock(side_effect=mock_client_metainfo)
+    bar_plugin = plugin.Plugin('bar', 'localhost:9998', 'tcp')
+    bar_plugin.client.metainfo = asynctest.CoroutineMock(side_effect=mock_client_metainfo_bar)
+
+    await cache.get_snapshot()
+
+    # refresh 'bar' part way through the TTL, so only 'foo' expires
+    await asyncio.sleep(0.1)
+    await cache.refresh_plugin_metainfo('bar')
+    await asyncio.sleep(0.15)
+
+    snapshot = cache._snapshot
+    assert snapshot.expired() == ['foo']
+
+    await cache.get_snapshot()
+    assert foo_plugin.client.metainfo.call_count == 2
+    assert bar_plugin.client.metainfo.call_count == 2
+    assert not cache._snapshot.is_expired()
+
+
+@pytest.mark.asyncio
+async def test_get_snapshot_partition_expired_new_plugin(plugin_context, clear_caches):
+    """Plugins without a partition are refreshed with the expired partitions."""
+
+    config.options.set('cache.meta.ttl', 0.2)
+
+    foo_plugin = plugin.Plugin('foo', 'localhost:9999', 'tcp')
+    foo_plugin.client.metainfo = asynctest.CoroutineMock(side_effect=mock_client_metainfo)
+    bar_plugin = plugin.Plugin('bar', 'localhost:9998', 'tcp')
+    bar_plugin.client.metainfo = asynctest.CoroutineMock(side_effect=mock_client_metainfo_bar)
+
+    await cache.get_snapshot()
+
+    # refresh 'bar' part way through the TTL, so only 'foo' expires
+    await asyncio.sleep(0.1)
+    await cache.refresh_plugin_metainfo('bar')
+
+    # register a new plugin after the snapshot was built
+    async def baz_metainfo(rack=None, board=None):
+        """Mock metainfo for the newly registered 'baz' plugin."""
+        return [make_metainfo_response('rack-2', 'vec', '11111')]
+    baz_plugin = plugin.Plugin('baz', 'localhost:9997', 'tcp')
+    baz_plugin.client.metainfo = asynctest.CoroutineMock(side_effect=baz_metainfo)
+
+    await asyncio.sleep(0.15)
+    assert cache._snapshot.expired() == ['foo']
+
+    snapshot = await cache.get_snapshot()
+    assert set(snapshot.partitions) == {'foo', 'bar', 'baz'}
+    assert 'rack-2-vec-11111' in snapshot.metainfo
+    assert foo_plugin.client.metainfo.call_count == 2
+    assert bar_plugin.client.metainfo.call_count == 2
+    assert baz_plugin.client.metainfo.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_rebuild_snapshot_keeps_newer_partition(plugin_context, clear_caches):
+    """A full rebuild does not replace a partition refreshed after it started."""
+
+    foo_plugin = plugin.Plugin('foo', 'localhost:9999', 'tcp')
+    foo_plugin.client.metainfo = asynctest.CoroutineMock(side_effect=mock_client_metainfo)
+    bar_plugin = plugin.Plugin('bar', 'localhost:9998', 'tcp')
+    bar_plugin.client.metainfo = asynctest.CoroutineMock(side_effect=mock_client_metainfo_bar)
+
+    await cache.get_snapshot()
+
+    # the full rebuild is slow to get the old devices from 'bar'...
+    async def slow_bar_metainfo(rack=None, board=None):
+        """Mock metainfo for 'bar' which is slow to respond."""
+        await asyncio.sleep(0.1)
+        return [make_metainfo_response('rack-1', 'vec', '54321')]
+    bar_plugin.client.metainfo = asynctest.CoroutineMock(side_effect=slow_bar_metainfo)
+    rebuild = asyncio.ensure_future(cache.metainfo_rebuilds.do(
+        cache.SNAPSHOT_KEY, cache._rebuild_snapshot
+    ))
+    await asyncio.sleep(0.01)
+
+    # ...while a refresh of 'bar' picks up a new device
+    async def new_bar_metainfo(rack=None, board=None):
+        """Mock metainfo for 'bar' with an added device."""
+        return [
+            make_metainfo_response('rack-1', 'vec', '54321'),
+            make_metainfo_response('rack-1', 'vec', '99999'),
+        ]
+    bar_plugin.client.metainfo = asynctest.CoroutineMock(side_effect=new_bar_metainfo)
+    refreshed = await cache.refresh_plugin_metainfo('bar')
+    assert 'rack-1-vec-99999' in refreshed.metainfo
+
+    await rebuild
+    assert cache._snapshot.partitions['bar'] is refreshed.partitions['bar']
+    assert 'rack-1-vec-99999' in cache._snapshot.metainfo
+
+
+@pytest.mark.asyncio
+async def test_metainfo_refresher(patch_metainfo, clear_caches):
+    """The background refresher keeps the snapshot refreshed."""
+
+    config.options.set('cache.meta.refresh_interval', 0.1)
+
+    task = asyncio.ensure_future(cache.metainfo_refresher())
+    try:
+        await asyncio.sleep(0.05)
+        snapshot = cache._snapshot
+        assert snapshot is not None
+        assert patch_metainfo.call_count == 1
+
+        await asyncio.sleep(0.25)
+        assert patch_metainfo.call_count >= 3
+
+        # the devices did not change, so the snapshot is not rebuilt
+        assert cache._snapshot is snapshot
+
+        # unsetting the interval should stop the refresher
+        config.options.set('cache.meta.refresh_interval', 0)
+        await asyncio.sleep(0.15)
+        assert task.done()
+    finally:
+        task.cancel()
+
+
 def test_build_scan_cache_ok():
     """Build the scan cache."""
 
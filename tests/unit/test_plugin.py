@@ -3,6 +3,7 @@
 
 import os
 import socket
+import time
 
 import pytest
 
@@ -61,6 +62,24 @@ def test_plugin_manager_add(mock_plugin):
     assert 'test-plug' in pm.plugins
 
 
+def test_plugin_manager_version(mock_plugin):
+    """The Manager's version changes when plugins are added or removed."""
+    pm = plugin.PluginManager()
+    assert pm.version == 0
+
+    pm.add(mock_plugin)
+    assert pm.version == 1
+
+    # removing a plugin which is not managed changes nothing
+    pm.remove('foo')
+    pm.purge(['foo'])
+    assert pm.version == 1
+
+    pm.purge(['test-plug'])
+    assert pm.version == 2
+    assert pm.modified <= time.time()
+
+
 def test_plugin_manager_remove(mock_plugin):
     """Remove a plugin from the Manager."""
     pm = plugin.PluginManager()
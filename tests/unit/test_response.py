@@ -1,9 +1,14 @@
 """Test the 'synse.response' Synse Server module."""
+# pylint: disable=redefined-outer-name,unused-argument
+
+import gzip
+import zlib
 
 import pytest
 from sanic.response import HTTPResponse
 
 from synse import config, response
+from tests import utils
 
 
 @pytest.mark.parametrize(
@@ -32,11 +37,338 @@ def test_json(data, expected):
         ({'test': False}, b'{\n  "test":false\n}\n'),
     ]
 )
-def test_json_pretty(data, expected):
+def test_json_pretty(pretty_json, data, expected):
     """Test parsing dict to a pretty JSON string."""
-    config.options.set('pretty_json', True)
-
     actual = response.json(data)
 
     assert isinstance(actual, HTTPResponse)
     assert expected == actual.body
+
+
+@pytest.mark.parametrize('pretty,expected', [
+    (False, b'{"test":"value"}'),
+    (True, b'{\n  "test":"value"\n}\n'),
+])
+def test_encoded_json(pretty, expected):
+    """Encode a JSON response body once."""
+    config.options.set('pretty_json', pretty)
+    response.configure_json()
+
+    encoded = response.EncodedJson({'test': 'value'})
+
+    # the body is encoded the same way as a JSON response
+    assert encoded.body == expected
+    assert encoded.body == response.json({'test': 'value'}).body
+
+    config.options.set('pretty_json', False)
+    response.configure_json()
+
+
+@pytest.mark.parametrize('header,etag,expected', [
+    (None, '"abc"', False),
+    ('', '"abc"', False),
+    ('"abc"', '"abc"', True),
+    ('"def"', '"abc"', False),
+    ('"def", "abc"', '"abc"', True),
+    ('W/"abc"', '"abc"', True),
+    ('"abc"', 'W/"abc"', True),
+    ('*', '"abc"', True),
+    ('abc', '"abc"', False),
+])
+def test_etag_matches(header, etag, expected):
+    """Match the If-None-Match header against an entity tag."""
+    assert response.etag_matches(header, etag) == expected
+
+
+def test_encoded_json_response(no_pretty_json):
+    """Create a response from an encoded JSON body."""
+    encoded = response.EncodedJson({'test': 'value'})
+
+    actual = response.encoded_json(encoded, headers={'ETag': '"abc"'})
+
+    assert isinstance(actual, HTTPResponse)
+    assert actual.status == 200
+    assert actual.body == b'{"test":"value"}'
+    assert actual.content_type == 'application/json'
+    assert actual.headers['ETag'] == '"abc"'
+
+
+def test_validator():
+    """Make the validator headers for a version of some data."""
+    validator = response.Validator(3, 1508155200.5)
+
+    assert validator.etag == 'W/"{}-3"'.format(response.RUN_ID)
+    assert validator.last_modified == 1508155200.5
+    assert validator.headers == {
+        'ETag': validator.etag,
+        'Last-Modified': 'Mon, 16 Oct 2017 12:00:00 GMT',
+    }
+    assert validator.etag != response.Validator(4, 1508155200.5).etag
+
+
+@pytest.mark.parametrize('headers,expected', [
+    ({}, False),
+    ({'If-None-Match': 'W/"{run}-3"'}, True),
+    ({'If-None-Match': '"{run}-3"'}, True),
+    ({'If-None-Match': 'W/"{run}-2", W/"{run}-3"'}, True),
+    ({'If-None-Match': 'W/"{run}-2"'}, False),
+    ({'If-None-Match': 'W/"other-3"'}, False),
+    ({'If-None-Match': '*'}, True),
+    ({'If-Modified-Since': 'Mon, 16 Oct 2017 12:00:00 GMT'}, True),
+    ({'If-Modified-Since': 'Mon, 16 Oct 2017 12:30:00 GMT'}, True),
+    ({'If-Modified-Since': 'Mon, 16 Oct 2017 11:59:59 GMT'}, False),
+    ({'If-Modified-Since': 'not a date'}, False),
+    # If-None-Match takes precedence over If-Modified-Since
+    ({
+        'If-None-Match': 'W/"{run}-2"',
+        'If-Modified-Since': 'Mon, 16 Oct 2017 12:00:00 GMT'
+    }, False),
+])
+def test_validator_matches(headers, expected):
+    """Check whether a client already has a version of some data."""
+    validator = response.Validator(3, 1508155200.5)
+
+    r = utils.make_request('/synse/scan')
+    r.headers.update({k: v.format(run=response.RUN_ID) for k, v in headers.items()})
+
+    assert validator.matches(r) == expected
+
+
+def test_not_modified():
+    """Create a response for a client which already has the data."""
+    validator = response.Validator(3, 1508155200.5)
+
+    actual = response.not_modified(validator)
+
+    assert isinstance(actual, HTTPResponse)
+    assert actual.status == 304
+    assert actual.body == b''
+    assert actual.headers == validator.headers
+
+
+@pytest.mark.parametrize('url,headers,expected', [
+    ('/synse/scan', {}, None),
+    ('/synse/scan?pretty', {}, True),
+    ('/synse/scan?pretty=true', {}, True),
+    ('/synse/scan?pretty=false', {}, False),
+    ('/synse/scan?pretty=0', {}, False),
+    ('/synse/scan?force=true', {}, None),
+    ('/synse/scan', {'Accept': 'application/json'}, None),
+    ('/synse/scan', {'Accept': 'application/json; pretty'}, True),
+    ('/synse/scan', {'Accept': 'application/json;pretty=true'}, True),
+    ('/synse/scan', {'Accept': 'application/json; pretty="false"'}, False),
+    ('/synse/scan', {'Accept': 'text/html, */*; pretty'}, True),
+    ('/synse/scan', {'Accept': 'text/html; pretty'}, None),
+    # the query parameter takes precedence over the Accept header
+    ('/synse/scan?pretty=false', {'Accept': 'application/json; pretty'}, False),
+])
+def test_wants_pretty(url, headers, expected):
+    """Get the JSON format that the client asked for."""
+    r = utils.make_request(url)
+    r.headers.update(headers)
+
+    assert response.wants_pretty(r) == expected
+
+
+def test_format_json(no_pretty_json):
+    """Re-encode a JSON response for a client which asked for pretty JSON."""
+    resp = response.json({'test': 'value'})
+
+    response.format_json(utils.make_request('/synse/scan'), resp)
+    assert resp.body == b'{"test":"value"}'
+
+    response.format_json(utils.make_request('/synse/scan?pretty=false'), resp)
+    assert resp.body == b'{"test":"value"}'
+
+    response.format_json(utils.make_request('/synse/scan?pretty'), resp)
+    assert resp.body == b'{\n  "test":"value"\n}\n'
+
+
+def test_format_json_default_pretty(pretty_json):
+    """Re-encode a JSON response for a client which asked for compact JSON."""
+    resp = response.json({'test': 'value'})
+
+    response.format_json(utils.make_request('/synse/scan?pretty'), resp)
+    assert resp.body == b'{\n  "test":"value"\n}\n'
+
+    response.format_json(utils.make_request('/synse/scan?pretty=false'), resp)
+    assert resp.body == b'{"test":"value"}'
+
+
+@pytest.mark.parametrize('url,headers', [
+    ('/synse/scan', {}),
+    ('/synse/scan?pretty', {}),
+    ('/synse/scan', {'Accept': 'application/json; pretty'}),
+    ('/synse/scan', {'Accept-Encoding': 'gzip'}),
+])
+def test_format_json_vary(no_pretty_json, url, headers):
+    """JSON responses vary with the Accept header, whether or not they are
+    re-encoded.
+    """
+    r = utils.make_request(url)
+    r.headers.update(headers)
+    resp = response.json({'test': 'value'})
+
+    response.format_json(r, resp)
+    assert resp.headers['Vary'] == 'Accept'
+
+
+def test_format_json_vary_merge(no_pretty_json):
+    """The Accept header is added to any fields the response already varies with."""
+    r = utils.make_request('/synse/scan?pretty')
+    resp = response.json({'test': 'value'}, headers={'Vary': 'Accept-Encoding'})
+
+    response.format_json(r, resp)
+    assert resp.headers['Vary'] == 'Accept-Encoding, Accept'
+
+    response.compress_response(r, resp)
+    assert resp.headers['Vary'] == 'Accept-Encoding, Accept'
+
+
+@pytest.mark.parametrize('resp', [
+    HTTPResponse('{"test":"value"}', content_type='text/plain'),
+    HTTPResponse(status=304),
+])
+def test_format_json_not_json(no_pretty_json, resp):
+    """Only JSON response bodies are re-encoded."""
+    body = resp.body
+
+    response.format_json(utils.make_request('/synse/scan?pretty'), resp)
+    assert resp.body == body
+    assert 'Vary' not in resp.headers
+
+
+@pytest.mark.parametrize('vary,field,expected', [
+    (None, 'Accept', 'Accept'),
+    ('', 'Accept', 'Accept'),
+    ('Accept', 'Accept', 'Accept'),
+    ('accept', 'Accept', 'accept'),
+    ('Accept-Encoding', 'Accept', 'Accept-Encoding, Accept'),
+    ('Accept, Accept-Encoding', 'Accept-Encoding', 'Accept, Accept-Encoding'),
+    ('*', 'Accept', '*'),
+])
+def test_add_vary(vary, field, expected):
+    """Add a field to the Vary header of a response."""
+    resp = HTTPResponse()
+    if vary is not None:
+        resp.headers['Vary'] = vary
+
+    response.add_vary(resp, field)
+    assert resp.headers['Vary'] == expected
+
+
+@pytest.mark.parametrize('header,expected', [
+    (None, None),
+    ('', None),
+    ('identity', None),
+    ('gzip', 'gzip'),
+    ('deflate', 'deflate'),
+    ('gzip, deflate', 'gzip'),
+    ('deflate, gzip', 'gzip'),
+    ('gzip;q=0.5, deflate', 'deflate'),
+    ('GZIP', 'gzip'),
+    ('gzip;q=0', None),
+    ('gzip;q=invalid, deflate;q=0.1', 'deflate'),
+    ('*', response.CODINGS[0]),
+    ('*;q=0.5, gzip;q=0', 'br' if 'br' in response.CODINGS else 'deflate'),
+])
+def test_accepted_encoding(header, expected):
+    """Negotiate the content-coding of a response."""
+    r = utils.make_request('/synse/scan')
+    if header is not None:
+        r.headers['Accept-Encoding'] = header
+
+    assert response.accepted_encoding(r) == expected
+
+
+def test_accepted_encoding_disabled(compress_all):
+    """No content-coding is negotiated if compression is disabled."""
+    r = utils.make_request('/synse/scan')
+    r.headers['Accept-Encoding'] = 'gzip'
+
+    config.options.set('compression.enabled', False)
+    response.configure_compression()
+    try:
+        assert response.accepted_encoding(r) is None
+    finally:
+        config.options.set('compression.enabled', True)
+        response.configure_compression()
+
+
+@pytest.mark.parametrize('coding,decompress', [
+    ('gzip', gzip.decompress),
+    ('deflate', zlib.decompress),
+])
+def test_compress(coding, decompress):
+    """Compress a response body."""
+    body = b'{"test":"value"}' * 100
+
+    compressed = response.compress(body, coding)
+    assert len(compressed) < len(body)
+    assert decompress(compressed) == body
+
+
+@pytest.mark.parametrize('resp,expected', [
+    (HTTPResponse(body_bytes=b'x' * 1024, content_type='application/json'), True),
+    (HTTPResponse(body_bytes=b'x' * 1024, content_type='text/plain'), True),
+    (HTTPResponse(body_bytes=b'x' * 1023, content_type='application/json'), False),
+    (HTTPResponse(body_bytes=b'x' * 1024, content_type='image/png'), False),
+    (HTTPResponse(body_bytes=b'x' * 1024, content_type='text/event-stream'), False),
+    (HTTPResponse(status=304), False),
+    (HTTPResponse(
+        body_bytes=b'x' * 1024,
+        content_type='application/json',
+        headers={'Content-Encoding': 'gzip'}
+    ), False),
+])
+def test_is_compressible(resp, expected):
+    """Check whether a response should be compressed."""
+    assert response.is_compressible(resp) == expected
+
+
+def test_compress_response():
+    """Compress a response for a client which accepts it."""
+    body = b'{"test":"value"}' * 100
+
+    r = utils.make_request('/synse/scan')
+    resp = HTTPResponse(body_bytes=body, content_type='application/json')
+    response.compress_response(r, resp)
+
+    # the client does not accept compression
+    assert resp.body == body
+    assert 'Content-Encoding' not in resp.headers
+    assert resp.headers['Vary'] == 'Accept-Encoding'
+
+    r.headers['Accept-Encoding'] = 'gzip'
+    response.compress_response(r, resp)
+
+    assert gzip.decompress(resp.body) == body
+    assert resp.headers['Content-Encoding'] == 'gzip'
+
+    # a compressed response is not compressed again, or re-formatted
+    compressed = resp.body
+    response.compress_response(r, resp)
+    response.format_json(utils.make_request('/synse/scan?pretty'), resp)
+    assert resp.body == compressed
+
+
+def test_encoded_json_compressed(no_pretty_json):
+    """An encoded JSON body is compressed once for each content-coding."""
+    encoded = response.EncodedJson({'test': 'value' * 500})
+
+    r = utils.make_request('/synse/scan')
+    r.headers['Accept-Encoding'] = 'gzip'
+
+    resp = response.encoded_json(encoded, r)
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(resp.body) == encoded.body
+    assert encoded.compressed('gzip') is resp.body
+    assert response.encoded_json(encoded, r).body is resp.body
+
+    # a client which asked for a different format gets the body to re-format
+    r = utils.make_request('/synse/scan?pretty')
+    r.headers['Accept-Encoding'] = 'gzip'
+
+    resp = response.encoded_json(encoded, r)
+    assert resp.body == encoded.body
+    assert 'Content-Encoding' not in resp.headers
@@ -0,0 +1,352 @@
+"""Test the 'synse.stream' Synse Server module."""
+# pylint: disable=redefined-outer-name,unused-argument
+
+import asyncio
+
+import asynctest
+import pytest
+import ujson
+from synse_plugin import api
+
+import synse.cache
+import synse.commands
+from synse import config, errors, stream
+from synse.scheme import ReadResponse
+
+
+def make_device(device, dtype='temperature'):
+    """Helper method to make a new MetainfoResponse object."""
+    return api.MetainfoResponse(
+        timestamp='october',
+        uid=device,
+        type=dtype,
+        model='test',
+        manufacturer='vapor io',
+        protocol='foo',
+        info='bar',
+        location=api.MetaLocation(
+            rack='rack-1',
+            board='vec'
+        ),
+        output=[
+            api.MetaOutput(
+                type=dtype,
+                data_type='int',
+            )
+        ]
+    )
+
+
+class MockRead(object):
+    """Mock for the read command, which returns the value set for each device."""
+
+    def __init__(self):
+        self.values = {}
+        self.calls = []
+
+    async def __call__(self, rack, board, device):
+        self.calls.append(device)
+        value = self.values.get(device, '1')
+        if value is None:
+            raise errors.DeviceNotFoundError('not found')
+        return ReadResponse(make_device(device), [
+            api.ReadResponse(
+                # the timestamp changes on every read
+                timestamp=str(len(self.calls)),
+                type='temperature',
+                value=value
+            )
+        ])
+
+
+@pytest.fixture()
+def mock_read(monkeypatch):
+    """Fixture to monkeypatch the read command."""
+    config.options.set('stream.interval', 0.05)
+    mock = MockRead()
+    monkeypatch.setattr(synse.commands, 'read', mock)
+    return mock
+
+
+@pytest.fixture()
+def poller():
+    """Fixture to create a poller, stopping all of its polling on teardown."""
+    p = stream.DevicePoller()
+    yield p
+    for task in p.tasks.values():
+        task.cancel()
+
+
+def drain(subscription):
+    """Get all of the messages currently queued for a subscription."""
+    messages = []
+    while not subscription.queue.empty():
+        messages.append(subscription.queue.get_nowait())
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_poller_subscribe(mock_read, poller):
+    """Subscriptions to the same device share a single poller."""
+
+    dev = ('rack-1', 'vec', '1')
+
+    sub1 = stream.Subscription()
+    sub2 = stream.Subscription()
+    poller.subscribe(sub1, [dev])
+    poller.subscribe(sub2, [dev, ('rack-1', 'vec', '2')])
+
+    assert set(poller.tasks) == {dev, ('rack-1', 'vec', '2')}
+    assert poller.subscriptions[dev] == {sub1, sub2}
+
+    await asyncio.sleep(0.12)
+
+    # three polls of each device, at most
+    assert mock_read.calls.count('1') <= 3
+    assert mock_read.calls.count('2') <= 3
+
+    # the reading did not change, so it is only published once
+    messages = drain(sub1)
+    assert len(messages) == 1
+    assert messages[0]['location'] == {'rack': 'rack-1', 'board': 'vec', 'device': '1'}
+    assert messages[0]['data']['temperature']['value'] == 1
+
+    assert len(drain(sub2)) == 2
+
+
+@pytest.mark.asyncio
+async def test_poller_publish_changed(mock_read, poller):
+    """Readings are published when they change."""
+
+    sub = stream.Subscription()
+    poller.subscribe(sub, [('rack-1', 'vec', '1')])
+
+    await asyncio.sleep(0.02)
+    mock_read.values['1'] = '2'
+    await asyncio.sleep(0.05)
+    mock_read.values['1'] = None
+    await asyncio.sleep(0.05)
+
+    messages = drain(sub)
+    assert len(messages) == 3
+    assert messages[0]['data']['temperature']['value'] == 1
+    assert messages[1]['data']['temperature']['value'] == 2
+    assert messages[2]['error']['error_id'] == errors.DEVICE_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_poller_subscribe_last(mock_read, poller):
+    """A new subscription to a polled device gets its last reading right away."""
+
+    dev = ('rack-1', 'vec', '1')
+
+    sub1 = stream.Subscription()
+    poller.subscribe(sub1, [dev])
+    await asyncio.sleep(0.02)
+
+    sub2 = stream.Subscription()
+    poller.subscribe(sub2, [dev])
+
+    messages = drain(sub2)
+    assert len(messages) == 1
+    assert messages[0] == poller.last[dev]
+
+
+@pytest.mark.asyncio
+async def test_poller_unsubscribe(mock_read, poller):
+    """Polling of a device stops when it has no subscriptions left."""
+
+    dev = ('rack-1', 'vec', '1')
+
+    sub1 = stream.Subscription()
+    sub2 = stream.Subscription()
+    poller.subscribe(sub1, [dev])
+    poller.subscribe(sub2, [dev])
+    await asyncio.sleep(0.02)
+
+    task = poller.tasks[dev]
+
+    poller.unsubscribe(sub1)
+    assert sub1.devices == set()
+    assert dev in poller.tasks
+
+    # changing the subscription removes it from the device
+    poller.subscribe(sub2, [('rack-1', 'vec', '2')])
+    assert dev not in poller.tasks
+    assert dev not in poller.subscriptions
+    assert dev not in poller.last
+
+    await asyncio.sleep(0.01)
+    assert task.cancelled()
+
+
+def mockgetsnapshot():
+    """Mock method to monkeypatch the get_snapshot method."""
+    return synse.cache.MetainfoSnapshot(
+        {'foo': synse.cache.MetainfoPartition('foo', {
+            'rack-1-vec-1': make_device('1'),
+            'rack-1-vec-2': make_device('2', 'led'),
+        })},
+        1
+    )
+
+
+@pytest.mark.asyncio
+async def test_parse_subscription_devices():
+    """Parse a subscription to a list of devices."""
+
+    devices = await stream.parse_subscription(ujson.dumps({
+        'devices': [{'rack': 'rack-1', 'board': 'vec', 'device': '1'}]
+    }))
+    assert devices == [('rack-1', 'vec', '1')]
+
+
+@pytest.mark.asyncio
+async def test_parse_subscription_selectors(monkeypatch):
+    """Parse a subscription to the devices matching selectors."""
+
+    monkeypatch.setattr(
+        synse.cache, 'get_snapshot',
+        asynctest.CoroutineMock(synse.cache.get_snapshot, side_effect=mockgetsnapshot)
+    )
+
+    devices = await stream.parse_subscription(ujson.dumps({
+        'selectors': {'type': 'led'}
+    }))
+    assert devices == [('rack-1', 'vec', '2')]
+
+
+@pytest.mark.asyncio
+async def test_select_location(monkeypatch):
+    """Get the devices on a rack or board."""
+
+    monkeypatch.setattr(
+        synse.cache, 'get_snapshot',
+        asynctest.CoroutineMock(synse.cache.get_snapshot, side_effect=mockgetsnapshot)
+    )
+
+    devices = await stream.select_location('rack-1')
+    assert devices == [('rack-1', 'vec', '1'), ('rack-1', 'vec', '2')]
+
+    devices = await stream.select_location('rack-1', 'vec')
+    assert devices == [('rack-1', 'vec', '1'), ('rack-1', 'vec', '2')]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('rack,board,error', [
+    ('rack-2', None, errors.RackNotFoundError),
+    ('rack-2', 'vec', errors.RackNotFoundError),
+    ('rack-1', 'foo', errors.BoardNotFoundError),
+])
+async def test_select_location_not_found(monkeypatch, rack, board, error):
+    """Get the devices on a rack or board which does not exist."""
+
+    monkeypatch.setattr(
+        synse.cache, 'get_snapshot',
+        asynctest.CoroutineMock(synse.cache.get_snapshot, side_effect=mockgetsnapshot)
+    )
+
+    with pytest.raises(error):
+        await stream.select_location(rack, board)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('message,error', [
+    ('{"devices":', errors.InvalidJsonError),
+    ('[]', errors.InvalidArgumentsError),
+    ('{"rack": "rack-1"}', errors.InvalidArgumentsError),
+    ('{"devices": [{"rack": "rack-1"}]}', errors.InvalidArgumentsError),
+    ('{"selectors": "led"}', errors.InvalidArgumentsError),
+    ('{"selectors": {"type": 1}}', errors.InvalidArgumentsError),
+    ('{"selectors": {"type": ["led"]}}', errors.InvalidArgumentsError),
+    ('{"selectors": {}}', errors.InvalidArgumentsError),
+    ('{"selectors": {"rack": null}}', errors.InvalidArgumentsError),
+    ('{"selectors": {"type": ""}}', errors.InvalidArgumentsError),
+    ('{"devices": 5}', errors.InvalidArgumentsError),
+    ('{"devices": "rack-1"}', errors.InvalidArgumentsError),
+    ('{"devices": {"rack": "r1", "board": "b1", "device": "1"}}', errors.InvalidArgumentsError),
+    ('{"devices": [{"rack": ["r1"], "board": "b1", "device": "1"}]}', errors.InvalidArgumentsError),
+    ('{"devices": [{"rack": "r1", "board": "b1", "device": 1}]}', errors.InvalidArgumentsError),
+])
+async def test_parse_subscription_invalid(message, error):
+    """Parse invalid subscription messages."""
+
+    with pytest.raises(error):
+        await stream.parse_subscription(message)
+
+
+def test_subscription_buffer_full():
+    """A subscription is dropped when its buffer is full."""
+
+    sub = stream.Subscription(buffer_size=2)
+    assert sub.publish({'id': 1})
+    assert sub.publish({'id': 2})
+    assert not sub.dropped
+
+    assert not sub.publish({'id': 3})
+    assert sub.dropped
+
+    # nothing more is published to a dropped subscription
+    assert not sub.publish({'id': 4})
+    assert sub.queue.qsize() == 2
+
+
+def test_subscription_buffer_config():
+    """The subscription buffer size comes from the configuration."""
+
+    config.options.set('stream.buffer_size', 5)
+    assert stream.Subscription().queue.maxsize == 5
+
+    config.options.set('stream.buffer_size', 0)
+    assert stream.Subscription().queue.maxsize == 0
+
+
+@pytest.mark.asyncio
+async def test_subscription_next_dropped():
+    """A dropped subscription has no next message."""
+
+    sub = stream.Subscription(buffer_size=1)
+    sub.publish({'id': 1})
+    sub.publish({'id': 2})
+
+    assert await sub.next() is None
+
+
+@pytest.mark.asyncio
+async def test_poller_drop_slow(mock_read, poller):
+    """Subscriptions which do not keep up are dropped by the poller."""
+
+    dev = ('rack-1', 'vec', '1')
+
+    slow = stream.Subscription(buffer_size=1)
+    fast = stream.Subscription()
+    poller.subscribe(slow, [dev])
+    poller.subscribe(fast, [dev])
+
+    await asyncio.sleep(0.02)
+    mock_read.values['1'] = '2'
+    await asyncio.sleep(0.05)
+
+    assert slow.dropped
+    assert slow.devices == set()
+    assert poller.subscriptions[dev] == {fast}
+    assert len(drain(fast)) == 2
+
+
+@pytest.mark.asyncio
+async def test_poller_drop_last(mock_read, poller):
+    """Dropping the last subscription to a device stops polling it."""
+
+    dev = ('rack-1', 'vec', '1')
+
+    sub = stream.Subscription(buffer_size=1)
+    poller.subscribe(sub, [dev])
+    task = poller.tasks[dev]
+
+    await asyncio.sleep(0.02)
+    mock_read.values['1'] = '2'
+    await asyncio.sleep(0.05)
+
+    assert sub.dropped
+    assert dev not in poller.tasks
+    assert task.done()
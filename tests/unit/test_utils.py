@@ -1,8 +1,10 @@
 """Test the 'synse.utils' Synse Server module."""
 
+import asyncio
+
 import pytest
 
-from synse import utils
+from synse import errors, utils
 
 
 @pytest.mark.parametrize(
@@ -87,3 +89,186 @@ def test_s_to_int_invalid(val):
     """Test unsuccessfully converting from string to int"""
     with pytest.raises(ValueError):
         utils.s_to_int(val)
+
+
+@pytest.mark.asyncio
+async def test_bounded_call():
+    """Get the result of a bounded call."""
+
+    async def fn(a, b):
+        """Return the sum of the arguments."""
+        return a + b
+
+    assert await utils.bounded_call(fn, 1, 2) == 3
+    assert await utils.bounded_call(fn, 1, 2, limit=asyncio.Semaphore(1)) == 3
+
+
+@pytest.mark.asyncio
+async def test_bounded_call_limit():
+    """No more calls than the limit are in flight at once."""
+    limit = asyncio.Semaphore(2)
+    in_flight = []
+
+    async def fn():
+        """Record the number of calls in flight during a delay."""
+        in_flight.append(2 - limit._value)  # pylint: disable=protected-access
+        await asyncio.sleep(0.05)
+
+    await asyncio.gather(*[utils.bounded_call(fn, limit=limit) for _ in range(5)])
+    assert max(in_flight) == 2
+    assert limit._value == 2  # pylint: disable=protected-access
+
+
+@pytest.mark.asyncio
+async def test_bounded_call_synse_error():
+    """A Synse error raised by a bounded call is returned as the result."""
+    err = errors.DeviceNotFoundError('not found')
+
+    async def fn():
+        """Raise a Synse error."""
+        raise err
+
+    assert await utils.bounded_call(fn, error=errors.FailedReadCommandError) is err
+
+
+@pytest.mark.asyncio
+async def test_bounded_call_other_error():
+    """Any other error raised by a bounded call is converted and returned."""
+    limit = asyncio.Semaphore(1)
+
+    async def fn():
+        """Raise a non-Synse error."""
+        raise ValueError('bad value')
+
+    result = await utils.bounded_call(
+        fn, limit=limit, error=errors.FailedReadCommandError, failure='Failed to read'
+    )
+    assert isinstance(result, errors.FailedReadCommandError)
+    assert 'bad value' in str(result)
+    assert not limit.locked()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesce():
+    """Concurrent calls for the same key are coalesced into a single call."""
+    sf = utils.SingleFlight()
+    calls = []
+
+    async def fn(val):
+        """Record the call and return the value after a delay."""
+        calls.append(val)
+        await asyncio.sleep(0.1)
+        return val
+
+    results = await asyncio.gather(*[sf.do('key', fn, i) for i in range(5)])
+
+    # every caller gets the result of the single call that was made
+    assert len(calls) == 1
+    assert results == [calls[0]] * 5
+    assert sf.calls == 1
+    assert sf.coalesced == 4
+    assert not sf.in_flight('key')
+
+
+@pytest.mark.asyncio
+async def test_single_flight_different_keys():
+    """Calls for different keys are not coalesced."""
+    sf = utils.SingleFlight()
+
+    async def fn(val):
+        """Return the value after a delay."""
+        await asyncio.sleep(0.1)
+        return val
+
+    results = await asyncio.gather(sf.do('a', fn, 1), sf.do('b', fn, 2))
+
+    assert results == [1, 2]
+    assert sf.calls == 2
+    assert sf.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_error():
+    """An error in the in-flight call is raised to all callers."""
+    sf = utils.SingleFlight()
+
+    async def fn():
+        """Raise an error after a delay."""
+        await asyncio.sleep(0.1)
+        raise ValueError()
+
+    results = await asyncio.gather(
+        sf.do('key', fn), sf.do('key', fn), return_exceptions=True
+    )
+
+    assert len(results) == 2
+    for r in results:
+        assert isinstance(r, ValueError)
+    assert not sf.in_flight('key')
+
+
+def test_timer_wheel():
+    """Expire keys with a timer wheel."""
+
+    wheel = utils.TimerWheel(resolution=1, size=8)
+    start = wheel._start
+
+    wheel.schedule('a', 2, now=start)
+    wheel.schedule('b', 3.5, now=start)
+    wheel.schedule('c', 0.1, now=start)
+    assert len(wheel) == 3
+
+    assert wheel.advance(start + 0.5) == []
+    assert wheel.advance(start + 1) == ['c']
+    assert wheel.advance(start + 2.9) == ['a']
+    assert wheel.advance(start + 3.9) == []
+    assert wheel.advance(start + 4) == ['b']
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_rotations():
+    """Keys further out than a rotation of the wheel expire on time."""
+
+    wheel = utils.TimerWheel(resolution=1, size=4)
+    start = wheel._start
+
+    wheel.schedule('a', 6, now=start)
+    wheel.schedule('b', 2, now=start)
+
+    # 'a' shares a slot with 'b', but is a rotation further out
+    assert wheel.advance(start + 2) == ['b']
+    assert wheel.advance(start + 5) == []
+    assert wheel.advance(start + 6) == ['a']
+
+
+def test_timer_wheel_skip():
+    """Advancing past many rotations at once expires everything due."""
+
+    wheel = utils.TimerWheel(resolution=1, size=4)
+    start = wheel._start
+
+    for i in range(1, 10):
+        wheel.schedule(i, i, now=start)
+
+    assert sorted(wheel.advance(start + 7)) == list(range(1, 8))
+    assert sorted(wheel.advance(start + 100)) == [8, 9]
+
+
+def test_timer_wheel_cancel():
+    """Cancel and reschedule the expiry of keys."""
+
+    wheel = utils.TimerWheel(resolution=1, size=8)
+    start = wheel._start
+
+    wheel.schedule('a', 2, now=start)
+    wheel.schedule('b', 2, now=start)
+    wheel.cancel('a')
+    wheel.cancel('c')
+    wheel.schedule('b', 5, now=start)
+
+    assert wheel.advance(start + 4) == []
+    assert wheel.advance(start + 5) == ['b']
+
+    wheel.schedule('a', 2, now=start + 5)
+    wheel.clear()
+    assert wheel.advance(start + 10) == []
@@ -9,10 +9,8 @@ from synse import cache, errors, validate
 from tests import utils
 
 
-async def make_metainfo_response(rack, board, device):
+def make_metainfo_response(rack, board, device):
     """Helper method to make a new MetainfoResponse object."""
-    await cache._plugins_cache.set(cache.PLUGINS_CACHE_KEY, {device: 'test-plugin'})
-
     return api.MetainfoResponse(
         timestamp='october',
         uid=device,
@@ -45,18 +43,19 @@ async def make_metainfo_response(rack, board, device):
 # --- Mock Methods ---
 
 
-async def mock_get_metainfo_cache():
-    """Mock method for get_metainfo_cache - returns a single device."""
-    return {
-        'rack-1-vec-12345': await make_metainfo_response('rack-1', 'vec', '12345')
-    }
+def mock_build_metainfo_cache(names=None):
+    """Mock method for _build_metainfo_cache - returns a single device."""
+    return (
+        {'rack-1-vec-12345': make_metainfo_response('rack-1', 'vec', '12345')},
+        {'rack-1-vec-12345': 'test-plugin'}
+    )
 
 
 @pytest.fixture()
 def patch_metainfo(monkeypatch):
-    """Fixture to monkeypatch the get_metainfo_cache method."""
-    mock = asynctest.CoroutineMock(cache.get_metainfo_cache, side_effect=mock_get_metainfo_cache)
-    monkeypatch.setattr(cache, 'get_metainfo_cache', mock)
+    """Fixture to monkeypatch the _build_metainfo_cache method."""
+    mock = asynctest.CoroutineMock(cache._build_metainfo_cache, side_effect=mock_build_metainfo_cache)
+    monkeypatch.setattr(cache, '_build_metainfo_cache', mock)
     return patch_metainfo
 
 
@@ -71,7 +70,11 @@ def patch_metainfo(monkeypatch):
 )
 async def test_validate_device_type(patch_metainfo, clear_caches, device_type):
     """Test successfully validating a device."""
-    await validate.validate_device_type(device_type, 'rack-1', 'vec', '12345')
+    resolved = await validate.validate_device_type(device_type, 'rack-1', 'vec', '12345')
+
+    # the resolved device is returned, so it does not need to be resolved again
+    assert resolved.meta.uid == '12345'
+    assert resolved.plugin_name == 'test-plugin'
 
 
 @pytest.mark.asyncio
@@ -88,12 +91,70 @@ async def test_validate_device_type_no_match(patch_metainfo, clear_caches):
         await validate.validate_device_type('led', 'rack-1', 'vec', '12345')
 
 
+@pytest.mark.parametrize(
+    'item,expected', [
+        ({'rack': 'rack-1', 'board': 'vec', 'device': '12345'}, True),
+        ({'rack': 'rack-1', 'board': 'vec', 'device': '12345', 'action': 'on'}, True),
+        ({'rack': 'rack-1', 'board': 'vec'}, False),
+        ({'rack': 'rack-1', 'board': 'vec', 'device': 12345}, False),
+        ({'rack': ['rack-1'], 'board': 'vec', 'device': '12345'}, False),
+        ({'rack': 'rack-1', 'board': None, 'device': '12345'}, False),
+        (['rack-1', 'vec', '12345'], False),
+        ('rack-1', False),
+        (None, False),
+    ]
+)
+def test_is_device_location(item, expected):
+    """Test checking whether an item is a valid device location."""
+    assert validate.is_device_location(item) is expected
+
+
+@pytest.mark.parametrize(
+    'item,expected', [
+        ({'type': 'led'}, True),
+        ({'rack': 'rack-1', 'type': 'led'}, True),
+        ({}, False),
+        ({'type': ''}, False),
+        ({'rack': 'rack-1', 'type': ''}, False),
+        ({'type': 1}, False),
+        ({'type': ['led']}, False),
+        ({'type': None}, False),
+        (['led'], False),
+        ('led', False),
+    ]
+)
+def test_is_selectors(item, expected):
+    """Test checking whether an item is valid device selectors."""
+    assert validate.is_selectors(item) is expected
+
+
+@pytest.mark.parametrize(
+    'item,expected', [
+        ({'action': 'state'}, True),
+        ({'raw': 'on'}, True),
+        ({'action': 'state', 'raw': 'on'}, True),
+        ({'rack': 'rack-1', 'action': 'state'}, True),
+        ({}, False),
+        ({'rack': 'rack-1'}, False),
+        ({'action': 1}, False),
+        ({'action': 'state', 'raw': ['on']}, False),
+        ({'action': None}, False),
+        (['state'], False),
+        ('state', False),
+    ]
+)
+def test_is_write_data(item, expected):
+    """Test checking whether an item is valid data to write to a device."""
+    assert validate.is_write_data(item) is expected
+
+
 @pytest.mark.parametrize(
     'params,valid,expected', [
         ({}, ['test'], {}),
         ({'test': 'value'}, ['test'], {'test': 'value'}),
         ({'test': 'value'}, ['test', 'other'], {'test': 'value'}),
         ({'test': 'value', 'other': 1}, ['test', 'other'], {'test': 'value', 'other': 1}),
+        ({'test': 'value', 'pretty': 'true'}, ['test'], {'test': 'value'}),
     ]
 )
 def test_validate_query_params(params, valid, expected):
@@ -141,3 +202,17 @@ async def test_validate_no_query_params2():
 
     with pytest.raises(errors.InvalidArgumentsError):
         await test_fn(utils.make_request('/synse/endpoint?test=param'))
+
+
+@pytest.mark.asyncio
+async def test_validate_no_query_params_global():
+    """Test validating that an incoming request has no query params, when there
+    are only global query params.
+    """
+
+    @validate.no_query_params()
+    async def test_fn(request, *args, **kwargs):
+        """Dummy function for testing the decorator."""
+        return request
+
+    await test_fn(utils.make_request('/synse/endpoint?pretty=true'))
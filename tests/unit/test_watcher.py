@@ -0,0 +1,149 @@
+"""Test the 'synse.watcher' Synse Server module."""
+# pylint: disable=redefined-outer-name,unused-argument
+
+import asyncio
+
+import grpc
+import pytest
+from synse_plugin import api
+
+from synse import config, errors, watcher
+
+
+class MockClient(object):
+    """Mock plugin client, which returns the state set for each transaction."""
+
+    def __init__(self):
+        self.states = {}
+        self.calls = []
+
+    async def check_transaction(self, transaction_id):
+        """Check a transaction, returning (or failing with) the state set for it."""
+        self.calls.append(transaction_id)
+        state = self.states.get(transaction_id, 'pending')
+        if state == 'fail':
+            raise grpc.RpcError()
+        return api.WriteResponse(
+            created='october',
+            updated='november',
+            status=api.WriteResponse.DONE if state == 'done' else api.WriteResponse.PENDING,
+            state=api.WriteResponse.ERROR if state == 'error' else api.WriteResponse.OK,
+        )
+
+
+class MockPlugin(object):
+    """Mock plugin, with a mock client."""
+
+    def __init__(self, name='foo'):
+        self.name = name
+        self.client = MockClient()
+
+
+@pytest.fixture()
+def mock_plugin():
+    """Fixture to create a mock plugin, with a fast watch interval."""
+    config.options.set('transaction.watch_interval', 0.05)
+    yield MockPlugin()
+    watcher.watchers.clear()
+
+
+@pytest.mark.parametrize('status,state,expected', [
+    (api.WriteResponse.UNKNOWN, api.WriteResponse.OK, False),
+    (api.WriteResponse.PENDING, api.WriteResponse.OK, False),
+    (api.WriteResponse.WRITING, api.WriteResponse.OK, False),
+    (api.WriteResponse.DONE, api.WriteResponse.OK, True),
+    (api.WriteResponse.PENDING, api.WriteResponse.ERROR, True),
+])
+def test_is_done(status, state, expected):
+    """Check whether a transaction is in a terminal state."""
+    assert watcher.is_done(api.WriteResponse(status=status, state=state)) == expected
+
+
+@pytest.mark.asyncio
+async def test_wait_done(mock_plugin):
+    """Wait for a transaction which completes."""
+
+    w = watcher.TransactionWatcher(mock_plugin)
+
+    async def complete():
+        """Complete the transaction after the watcher has checked it."""
+        await asyncio.sleep(0.07)
+        mock_plugin.client.states['abc'] = 'done'
+
+    asyncio.ensure_future(complete())
+    resp = await w.wait('abc', 1)
+
+    assert resp.status == api.WriteResponse.DONE
+    assert w.waiters == {}
+    assert w.last == {}
+
+    await asyncio.sleep(0.01)
+    assert w.task is None
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout(mock_plugin):
+    """Wait for a transaction which does not complete in time."""
+
+    w = watcher.TransactionWatcher(mock_plugin)
+    resp = await w.wait('abc', 0.08)
+
+    # the last state seen is returned
+    assert resp.status == api.WriteResponse.PENDING
+    assert w.waiters == {}
+
+    # nothing was checked before the timeout
+    assert await w.wait('abc', 0) is None
+
+
+@pytest.mark.asyncio
+async def test_wait_shared(mock_plugin):
+    """Clients waiting on the same transactions share the checks."""
+
+    w = watcher.TransactionWatcher(mock_plugin)
+
+    waits = asyncio.gather(
+        w.wait('abc', 1),
+        w.wait('abc', 1),
+        w.wait('def', 1),
+    )
+    await asyncio.sleep(0.07)
+    mock_plugin.client.states['abc'] = 'done'
+    mock_plugin.client.states['def'] = 'error'
+
+    resp = await waits
+    assert [r.status for r in resp] == [api.WriteResponse.DONE] * 2 + [api.WriteResponse.PENDING]
+    assert resp[2].state == api.WriteResponse.ERROR
+
+    # each round checks each transaction once
+    assert mock_plugin.client.calls.count('abc') == mock_plugin.client.calls.count('def')
+    assert mock_plugin.client.calls.count('abc') <= 3
+
+
+@pytest.mark.asyncio
+async def test_wait_error(mock_plugin):
+    """Wait for a transaction which can not be checked."""
+
+    mock_plugin.client.states['abc'] = 'fail'
+
+    w = watcher.TransactionWatcher(mock_plugin)
+    with pytest.raises(errors.FailedTransactionCommandError):
+        await w.wait('abc', 1)
+
+
+@pytest.mark.asyncio
+async def test_wait_watchers(mock_plugin):
+    """There is one watcher for each plugin."""
+
+    mock_plugin.client.states['abc'] = 'done'
+    other = MockPlugin('bar')
+    other.client.states['def'] = 'done'
+
+    await watcher.wait(mock_plugin, 'abc', 1)
+    await watcher.wait(other, 'def', 1)
+    w = watcher.watchers['foo']
+    await watcher.wait(mock_plugin, 'abc', 1)
+
+    assert set(watcher.watchers) == {'foo', 'bar'}
+    assert watcher.watchers['foo'] is w
+    assert watcher.watchers['bar'].plugin is other